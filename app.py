@@ -3,15 +3,32 @@ import plotly.graph_objects as go
 import ccxt
 import sys
 import time
+import os
 import locale
 import socket
 import dash
 import json
 import random
+import threading
+import contextlib
+import gzip
+import struct
+import asyncio
+import functools
+import bisect
+import heapq
+import cProfile
+import websocket
+import requests
+import collections
+import queue
+import uuid
 import numpy as np
-from datetime import datetime, timedelta
-from dash import Dash, dcc, html, ctx, no_update
+from datetime import datetime
+from dash import Dash, dcc, html, ctx, no_update, Patch
 from dash.dependencies import Input, Output, State, ALL
+from dash.exceptions import PreventUpdate
+from flask import Response, g, request
 
 # --- CONFIGURATION ---
 EXCHANGE_ID = 'binance'
@@ -63,14 +80,490 @@ RWA_ASSETS = [
 TRACKER_SYMBOLS = list(SYMBOL_MAP.keys())
 DROPDOWN_OPTIONS = [{'label': SYMBOL_MAP[s], 'value': s} for s in TRACKER_SYMBOLS]
 DEFAULT_SYMBOL = 'BTC/USDT'
+TIMEFRAME_PRESETS = {'LIVE': {'tf': '1m', 'limit': 50}, '24H': {'tf': '15m', 'limit': 96}, '7D': {'tf': '1h', 'limit': 168}, '1M': {'tf': '4h', 'limit': 180}, '1Y': {'tf': '1d', 'limit': 365}, '5Y': {'tf': '1w', 'limit': 260}}
+ANALYTICS_HISTORY = 2000
+CANDLE_CACHE_DIR = os.environ.get('CANDLE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.candle_cache'))
+ALERTS_DIR = os.environ.get('ALERTS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.alerts'))
 USD_TO_INR_RATE = 89.98
 
+# --- METRICS ---
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # fraction of callback calls run under cProfile
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROFILE_KEEP = 20
+
+class Metrics:
+    """Process-local counters and histograms, rendered in the Prometheus text format on /metrics."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock: self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=METRIC_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None: hist = self.histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0]
+            hist[1][bisect.bisect_left(buckets, value)] += 1
+            hist[2] += value
+
+    def error(self, where, exc):
+        self.inc('errors_total', where=where, type=type(exc).__name__)
+
+    @contextlib.contextmanager
+    def timer(self, name, where, **labels):
+        started = time.perf_counter()
+        try: yield
+        except Exception as e:
+            self.error(where, e)
+            raise
+        finally: self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self):
+        def fmt(labels): return '{' + ','.join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels) + '}' if labels else ''
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (buckets, list(counts), total)) for key, (buckets, counts, total) in self.histograms.items())
+        lines = []; typed = set()
+        for (name, labels), value in counters:
+            if name not in typed: lines.append(f'# TYPE {name} counter'); typed.add(name)
+            lines.append(f'{name}{fmt(labels)} {value}')
+        for (name, labels), (buckets, counts, total) in histograms:
+            if name not in typed: lines.append(f'# TYPE {name} histogram'); typed.add(name)
+            cumulative = 0
+            for le, count in zip([*buckets, '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{fmt(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{fmt(labels)} {total}')
+            lines.append(f'{name}_count{fmt(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+class CallbackProfiler:
+    """Runs a sample of callback calls under cProfile and keeps .prof dumps of the slowest ones."""
+    def __init__(self, rate, directory, keep):
+        self.rate = rate; self.directory = directory; self.keep = keep
+        self.lock = threading.Lock()
+        self.active = threading.Lock()  # cProfile cannot run two profilers at once
+        self.slowest = []
+
+    @contextlib.contextmanager
+    def sample(self, name):
+        if not self.rate or random.random() >= self.rate or not self.active.acquire(blocking=False):
+            yield
+            return
+        profiler = cProfile.Profile(); started = time.perf_counter()
+        try:
+            profiler.enable()
+            yield
+        finally:
+            profiler.disable(); self.active.release()
+            self._keep(name, time.perf_counter() - started, profiler)
+
+    def _keep(self, name, elapsed, profiler):
+        with self.lock:
+            if len(self.slowest) >= self.keep and elapsed <= self.slowest[0][0]: return
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'{name}-{int(elapsed * 1000)}ms-{os.getpid()}-{int(time.time() * 1000)}.prof')
+            profiler.dump_stats(path)
+            heapq.heappush(self.slowest, (elapsed, path))
+            if len(self.slowest) > self.keep:
+                with contextlib.suppress(OSError): os.remove(heapq.heappop(self.slowest)[1])
+
+metrics = Metrics()
+callback_profiler = CallbackProfiler(PROFILE_SAMPLE_RATE, PROFILE_DIR, PROFILE_KEEP)
+
+def timed(func):
+    name = func.__name__
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        g.callback = name; started = time.perf_counter()
+        try:
+            with callback_profiler.sample(name): result = func(*args, **kwargs)
+        except PreventUpdate:
+            metrics.inc('dash_callback_prevented_total', callback=name)
+            raise
+        except Exception as e:
+            metrics.error(name, e)
+            raise
+        metrics.observe('dash_callback_seconds', time.perf_counter() - started, callback=name)
+        return result
+    return wrapper
+
+class InstrumentedExchange:
+    """Proxy around the ccxt client that times every fetch_*/load_* call."""
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr) or not name.startswith(('fetch', 'load')): return attr
+        def call(*args, **kwargs):
+            with metrics.timer('exchange_call_seconds', f'exchange.{name}', method=name): return attr(*args, **kwargs)
+        return call
+
+# --- EXCHANGE CLIENT ---
+# Binance's REQUEST_WEIGHT limit is per IP, so every worker on the host spends from one token bucket whose state lives
+# in a file under flock. The bucket holds at most a small burst: in any minute the host spends at most
+# EXCHANGE_WEIGHT_BURST + EXCHANGE_WEIGHT_PER_MINUTE, which stays under the 6000 limit.
+try: import fcntl
+except ImportError: fcntl = None  # no flock: each process keeps its own bucket
+
+EXCHANGE_TIMEOUT_MS = int(os.environ.get('EXCHANGE_TIMEOUT_MS', 5000))
+EXCHANGE_WEIGHT_PER_MINUTE = int(os.environ.get('EXCHANGE_WEIGHT_PER_MINUTE', 4800))  # 80% of Binance's 6000 REQUEST_WEIGHT per minute per IP
+EXCHANGE_WEIGHT_BURST = int(os.environ.get('EXCHANGE_WEIGHT_BURST', 300))  # at least the heaviest single request
+EXCHANGE_BUDGET_PATH = os.environ.get('EXCHANGE_BUDGET_PATH', os.path.join(CANDLE_CACHE_DIR, f'weight_{EXCHANGE_ID}.bin'))
+EXCHANGE_RETRIES = 2
+EXCHANGE_BACKOFF_SECONDS = 0.25
+EXCHANGE_QUEUE_SECONDS = 2  # longest a call waits for weight budget before falling back to stale data
+EXCHANGE_COOLDOWN_SECONDS = 10  # pause after a 429/418 from the exchange
+EXCHANGE_STALE_ENTRIES = 512
+EXCHANGE_POOL_SIZE = 32
+
+class ExchangeThrottled(Exception): pass
+
+def request_weight(method, args, kwargs):
+    # Binance REQUEST_WEIGHT for the endpoints behind each ccxt method
+    if method == 'fetch_ohlcv':
+        limit = kwargs.get('limit') or (args[3] if len(args) > 3 else None) or 500
+        return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+    if method == 'fetch_tickers':
+        symbols = kwargs.get('symbols') or (args[0] if args else None)
+        return 80 if not symbols else 2 if len(symbols) <= 20 else 40 if len(symbols) <= 100 else 80
+    if method == 'fetch_order_book':
+        limit = kwargs.get('limit') or (args[1] if len(args) > 1 else None) or 100
+        return 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+    return {'fetch_ticker': 2, 'load_markets': 20}.get(method, 1)
+
+class TokenBucket:
+    def __init__(self, rate, capacity, path=None):
+        self.lock = threading.Lock()
+        self.rate = rate
+        self.capacity = capacity
+        self.path = path if fcntl is not None else None  # shared state (tokens, stamp) as two doubles
+        self.tokens = capacity
+        self.stamp = time.time()
+
+    def _take(self, weight):
+        # spends weight and returns 0, or returns the seconds until it could be spent
+        now = time.time(); self.tokens = min(self.capacity, self.tokens + max(now - self.stamp, 0) * self.rate); self.stamp = now
+        if self.tokens >= weight:
+            self.tokens -= weight
+            return 0
+        return (weight - self.tokens) / self.rate
+
+    def _spend(self, weight):
+        with self.lock:
+            if self.path is None: return self._take(weight)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                state = os.pread(fd, 16, 0)
+                if len(state) == 16: self.tokens, self.stamp = struct.unpack('<dd', state)
+                wait = self._take(weight); os.pwrite(fd, struct.pack('<dd', self.tokens, self.stamp), 0)
+                return wait
+            finally: os.close(fd)  # releases the flock
+
+    def acquire(self, weight, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._spend(weight)
+            if not wait: return True
+            if time.monotonic() + wait > deadline: return False
+            time.sleep(wait)
+
+def pooled_session(size=EXCHANGE_POOL_SIZE):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=size, max_retries=0)
+    session.mount('https://', adapter); session.mount('http://', adapter)
+    return session
+
+class ExchangeClient:
+    """Shared front for the ccxt client: identical concurrent calls share one request, every call spends
+    from the host-wide weight budget, transient failures retry with jittered backoff, and when the exchange
+    throttles us the last good answer for the same call is served instead."""
+    def __init__(self, client, weight_per_minute=EXCHANGE_WEIGHT_PER_MINUTE, burst=EXCHANGE_WEIGHT_BURST, budget_path=EXCHANGE_BUDGET_PATH, retries=EXCHANGE_RETRIES, backoff=EXCHANGE_BACKOFF_SECONDS, queue_seconds=EXCHANGE_QUEUE_SECONDS, cooldown=EXCHANGE_COOLDOWN_SECONDS):
+        self.client = client
+        self.bucket = TokenBucket(weight_per_minute / 60, burst, budget_path)
+        self.retries = retries; self.backoff = backoff; self.queue_seconds = queue_seconds; self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.stale = collections.OrderedDict()
+        self.blocked_until = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr) or not name.startswith(('fetch', 'load')): return attr
+        return functools.partial(self.call, name)
+
+    def call(self, method, *args, **kwargs):
+        key = (method, repr(args), repr(sorted(kwargs.items())))
+        with self.lock:
+            flight = self.inflight.get(key); leader = flight is None
+            if leader: flight = self.inflight[key] = {'done': threading.Event(), 'result': None, 'error': None}
+        if not leader:
+            metrics.inc('exchange_coalesced_total', method=method)
+            flight['done'].wait()
+            if flight['error'] is not None: raise flight['error']
+            return flight['result']
+        try:
+            flight['result'] = self._fetch(key, method, args, kwargs)
+            return flight['result']
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self.lock: del self.inflight[key]
+            flight['done'].set()
+
+    def _fetch(self, key, method, args, kwargs):
+        if time.time() < self.blocked_until or not self.bucket.acquire(request_weight(method, args, kwargs), self.queue_seconds):
+            return self._stale(key, method, ExchangeThrottled(f'{method}: request weight budget exhausted'))
+        for attempt in range(self.retries + 1):
+            try:
+                result = getattr(self.client, method)(*args, **kwargs)
+                break
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:  # 429/418
+                self.blocked_until = time.time() + self.cooldown
+                return self._stale(key, method, e)
+            except ccxt.NetworkError as e:
+                if attempt == self.retries: return self._stale(key, method, e)
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        with self.lock:
+            self.stale[key] = result; self.stale.move_to_end(key)
+            while len(self.stale) > EXCHANGE_STALE_ENTRIES: self.stale.popitem(last=False)
+        return result
+
+    def _stale(self, key, method, error):
+        with self.lock: result = self.stale.get(key)
+        if result is None: raise error
+        metrics.inc('exchange_stale_total', method=method, reason=type(error).__name__)
+        return result
+
+# --- BACKGROUND THREADS ---
+# Pollers run on one daemon thread per process, started by the first caller. gunicorn --preload forks workers after
+# import and threads do not survive a fork, so a thread started in another pid counts as not running.
+class BackgroundThread:
+    thread_name = None
+
+    def _ensure_running(self):
+        # True when this call started the thread; the owner provides lock, thread, pid and _run
+        if self.thread is not None and self.thread.is_alive() and self.pid == os.getpid(): return False
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive() and self.pid == os.getpid(): return False
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self.thread.start()
+            return True
+
+# --- EXCHANGE ---
+# Nothing touches the network at import: market metadata comes from a disk copy when there is one, and
+# MarketsLoader fetches or refreshes it in the background once the process starts serving. Until a first
+# load succeeds `exchange` stays None (simulation), and it switches to the live client as soon as one does.
+EXCHANGE_OPTIONS = {'verify': False, 'defaultType': 'spot', 'fetchMarkets': {'types': ['spot']}}
+MARKETS_CACHE_PATH = os.environ.get('MARKETS_CACHE_PATH', os.path.join(CANDLE_CACHE_DIR, f'markets_{EXCHANGE_ID}.json'))
+MARKETS_CACHE_TTL = int(os.environ.get('MARKETS_CACHE_TTL', 6 * 3600))
+MARKETS_RETRY_SECONDS = 60
+
+class MarketsLoader(BackgroundThread):
+    thread_name = 'markets-loader'
+
+    def __init__(self, client, path, ttl):
+        self.client = client
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+        self.loaded_at = 0
+
+    def load_cached(self):
+        try:
+            with open(self.path) as f: cached = json.load(f)
+            self.client.set_markets(cached['markets'], cached.get('currencies'))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError): return False
+        self.loaded_at = cached.get('at', 0)
+        return True
+
+    def fetch(self):
+        markets = self.client.load_markets(True)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f: json.dump({'at': time.time(), 'markets': markets, 'currencies': self.client.currencies}, f)
+        os.replace(tmp, self.path)
+        self.loaded_at = time.time()
+
+    def ensure_fresh(self):
+        if time.time() - self.loaded_at >= self.ttl: self._ensure_running()
+
+    def _run(self):
+        global exchange
+        backoff = 1
+        while True:
+            try:
+                self.fetch()
+                break
+            except Exception as e:
+                metrics.error('exchange.load_markets', e)
+                time.sleep(backoff + random.uniform(0, 1))
+                backoff = min(backoff * 2, MARKETS_RETRY_SECONDS)
+        if exchange is None:
+            exchange = self.client
+            # drop everything the simulator produced so no series, ring or alert mixes it with the live market
+            for state in (candle_store, indicator_engine, spark_history, market_rollup, order_books, alert_book, market_hub): state.reset()
+            if WARMUP_ENABLED: warm_up()
+
 exchange = None
+markets_loader = None
 try:
-    exchange = getattr(ccxt, EXCHANGE_ID)({'options': {'verify': False}})
-    exchange.load_markets()
+    markets_loader = MarketsLoader(ExchangeClient(InstrumentedExchange(getattr(ccxt, EXCHANGE_ID)({'options': EXCHANGE_OPTIONS, 'timeout': EXCHANGE_TIMEOUT_MS, 'enableRateLimit': False, 'session': pooled_session()}))), MARKETS_CACHE_PATH, MARKETS_CACHE_TTL)
+    if markets_loader.load_cached(): exchange = markets_loader.client
 except Exception as e:
-    exchange = None
+    metrics.error('exchange.init', e)
+
+# --- SIMULATION ---
+# Stands in for the exchange until a real one loads (or for good with SIMULATE=1). Every pair follows a seeded
+# geometric Brownian motion built top-down: a daily walk from SIM_EPOCH_MS, then each day split into hours, each hour
+# into minutes and each minute into seconds by Brownian bridges between the coarser nodes. A block of nodes depends only
+# on (seed, level, pair group, index), so prices are continuous between calls, every timeframe agrees with the others
+# and all worker processes see the same market. Blocks are drawn for SIM_GROUP pairs at once and kept in an LRU.
+SIMULATE = os.environ.get('SIMULATE', '0') == '1'
+SIM_PAIRS = int(os.environ.get('SIM_PAIRS', 400))
+SIM_SEED = int(os.environ.get('SIM_SEED', 7))
+SIM_EPOCH_MS = 1_514_764_800_000  # 2018-01-01, the first simulated candle
+SIM_ANCHOR_MS = 1_767_225_600_000  # 2026-01-01, when every pair trades at its reference price
+SIM_LEVELS = (86_400_000, 3_600_000, 60_000, 1_000)  # node spacing: days, hours, minutes, seconds
+SIM_STEPS = (64, 24, 60, 60)  # nodes per block: 64 days, then one coarser interval per block
+SIM_GROUP = 64
+SIM_NODES_PER_CANDLE = 60  # candles are built from the finest level with at most this many steps per candle
+SIM_CACHE_BYTES = int(os.environ.get('SIM_CACHE_MB', 64)) << 20
+SIM_YEAR_MS = 365.25 * 86_400_000
+SIM_REFERENCE = {'BTC/USDT': (65000, 0.5), 'ETH/USDT': (3200, 0.65), 'BNB/USDT': (580, 0.6), 'SOL/USDT': (150, 0.9), 'XRP/USDT': (0.55, 0.8), 'DOGE/USDT': (0.12, 1.0), 'ADA/USDT': (0.45, 0.85), 'TRX/USDT': (0.12, 0.6), 'AVAX/USDT': (35, 0.95), 'SHIB/USDT': (0.000018, 1.1)}  # price, annual volatility
+
+class SimExchange:
+    """ccxt-shaped exchange over the simulated market: fetch_ohlcv, fetch_tickers, fetch_order_book, load_markets."""
+    id = 'sim'
+
+    def __init__(self, pairs=SIM_PAIRS, seed=SIM_SEED):
+        self.seed = seed
+        self.symbols = TRACKER_SYMBOLS + [f'SIM{i}/USDT' for i in range(max(pairs - len(TRACKER_SYMBOLS), 0))]
+        self.index = {s: i for i, s in enumerate(self.symbols)}; n = len(self.symbols)
+        rng = np.random.default_rng([seed, len(SIM_LEVELS)])
+        price = np.exp(rng.uniform(np.log(0.001), np.log(500), n)); sigma = rng.uniform(0.6, 1.5, n)
+        for s, (p, vol) in SIM_REFERENCE.items():
+            if s in self.index: price[self.index[s]], sigma[self.index[s]] = p, vol
+        self.log_price = np.log(price); self.sigma = sigma
+        self.volume = 2e10 / (1 + np.arange(n)) ** 1.2 * rng.lognormal(0, 0.3, n)  # USD per day, roughly Zipf by listing rank
+        self.markets = {s: {'id': s.replace('/', ''), 'symbol': s, 'base': s.split('/')[0], 'quote': 'USDT', 'spot': True, 'active': True} for s in self.symbols}
+        self.currencies = {}
+        self.lock = threading.Lock()
+        self.cache = collections.OrderedDict(); self.cached = 0
+        self.day_starts = {}  # group -> walk value at the start of each day block, before the anchor shift
+        self.shifts = {}
+
+    def _rows(self, group):
+        return slice(group * SIM_GROUP, min((group + 1) * SIM_GROUP, len(self.symbols)))
+
+    def _sigma(self, level, group):
+        return self.sigma[self._rows(group), None] * np.sqrt(SIM_LEVELS[level] / SIM_YEAR_MS)
+
+    def _day_steps(self, group, block):
+        sigma = self._sigma(0, group)
+        return np.random.default_rng([self.seed, 0, group, block]).standard_normal((len(sigma), SIM_STEPS[0])) * sigma - 0.5 * sigma ** 2
+
+    def _day_start(self, group, block):
+        with self.lock:
+            starts = self.day_starts.setdefault(group, [np.zeros(self._rows(group).stop - self._rows(group).start)])
+            while len(starts) <= block: starts.append(starts[-1] + self._day_steps(group, len(starts) - 1).sum(axis=1))
+            if group not in self.shifts:
+                day = (SIM_ANCHOR_MS - SIM_EPOCH_MS) // SIM_LEVELS[0]; b, off = divmod(day, SIM_STEPS[0])
+                while len(starts) <= b: starts.append(starts[-1] + self._day_steps(group, len(starts) - 1).sum(axis=1))
+                self.shifts[group] = self.log_price[self._rows(group)] - starts[b] - self._day_steps(group, b)[:, :off].sum(axis=1)
+            return starts[block] + self.shifts[group]
+
+    def _block(self, level, group, index):
+        # log prices of the group's pairs at SIM_STEPS[level] + 1 nodes: index is the day block for level 0, else the
+        # coarser node the block starts at (both ends of the block are that level's nodes)
+        key = (level, group, index)
+        with self.lock:
+            nodes = self.cache.get(key)
+            if nodes is not None: self.cache.move_to_end(key); return nodes
+        steps = SIM_STEPS[level]
+        if level == 0:
+            start = self._day_start(group, index); nodes = np.column_stack([start, start[:, None] + np.cumsum(self._day_steps(group, index), axis=1)])
+        else:
+            parent = SIM_STEPS[level - 1]; ends = self._block(level - 1, group, index // parent)[:, index % parent:index % parent + 2]
+            walk = np.cumsum(np.random.default_rng([self.seed, level, group, index]).standard_normal((len(ends), steps)) * self._sigma(level, group), axis=1); frac = np.arange(1, steps + 1) / steps
+            nodes = np.column_stack([ends[:, 0], ends[:, :1] + (ends[:, 1:] - ends[:, :1]) * frac + walk - walk[:, -1:] * frac])
+        with self.lock:
+            if key not in self.cache: self.cache[key] = nodes; self.cached += nodes.nbytes
+            while self.cached > SIM_CACHE_BYTES: self.cached -= self.cache.popitem(last=False)[1].nbytes
+        return nodes
+
+    def _path(self, level, group, first, last, row=None):
+        # (3, pairs, last - first + 1): the group's log prices at nodes first..last of a level, and the high and low of the
+        # step after each node, drawn from the Brownian-bridge extreme distribution; the last node's step is left flat.
+        # Extremes are not cached, only the requested row is computed
+        steps = SIM_STEPS[level]; rows = slice(None) if row is None else slice(row, row + 1); sigma = self._sigma(level, group)[rows]; parts = []
+        for b in range(first // steps, last // steps + 1):
+            lo, hi = max(first - b * steps, 0), min(last - b * steps, steps - 1) + 1; block = self._block(level, group, b)
+            a, z = block[rows, lo:hi], block[rows, lo + 1:hi + 1]; u = np.random.default_rng([self.seed, level, group, b, 1]).random((2, len(block), steps))[:, rows, lo:hi]
+            spread = np.sqrt((z - a) ** 2 - 2 * sigma ** 2 * np.log(u)); parts.append(np.stack([a, (a + z + spread[0]) / 2, (a + z - spread[1]) / 2]))
+        path = np.concatenate(parts, axis=2); path[1:, :, -1] = path[0, :, -1]
+        return path
+
+    def _at(self, group, ms):
+        # the group's log prices at a time, to the second
+        s = (ms - SIM_EPOCH_MS) // SIM_LEVELS[-1]
+        return self._block(len(SIM_LEVELS) - 1, group, s // SIM_STEPS[-1])[:, s % SIM_STEPS[-1]]
+
+    def load_markets(self, reload=False):
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        step = TIMEFRAME_MS[timeframe]; offset = BUCKET_OFFSET_MS.get(timeframe, 0); now = int(time.time() * 1000); limit = min(limit or 500, OHLCV_PAGE_LIMIT)
+        start = -(-(since - offset) // step) * step + offset if since is not None else (now - offset) // step * step + offset - (limit - 1) * step
+        start = max(start, -(-(SIM_EPOCH_MS - offset) // step) * step + offset)
+        ts = np.arange(start, min(now, start + (limit - 1) * step) + 1, step, dtype=np.int64)
+        if not len(ts) or symbol not in self.index: return []
+        level = next(l for l in range(len(SIM_LEVELS) - 1, -1, -1) if step // SIM_LEVELS[l] <= SIM_NODES_PER_CANDLE); spacing = SIM_LEVELS[level]
+        group, row = divmod(self.index[symbol], SIM_GROUP); end = min(int(ts[-1]) + step, now)
+        nodes, highs, lows = self._path(level, group, (int(ts[0]) - SIM_EPOCH_MS) // spacing, (end - SIM_EPOCH_MS) // spacing, row)[:, 0]
+        if end == now and (now - SIM_EPOCH_MS) % spacing:  # the open candle closes at the current price, across a step that is still open
+            nodes = np.r_[nodes, self._at(group, now)[row]]; highs, lows = np.r_[highs, nodes[-1]], np.r_[lows, nodes[-1]]
+        opens = np.arange(len(ts)) * (step // spacing); closes = np.minimum(opens + step // spacing, len(nodes) - 1)
+        high = np.maximum(np.maximum.reduceat(highs, opens), nodes[closes]); low = np.minimum(np.minimum.reduceat(lows, opens), nodes[closes])
+        moves = np.abs(np.diff(nodes)) / self._sigma(level, group)[row, 0]; price = np.exp(nodes)
+        volume = np.add.reduceat(np.r_[self.volume[self.index[symbol]] * spacing / SIM_LEVELS[0] * (0.5 + moves) / price[:-1], 0.0], opens)
+        rows = np.column_stack([ts, price[opens], np.exp(high), np.exp(low), price[closes], volume]).tolist()
+        for r in rows: r[0] = int(r[0])
+        return rows
+
+    def fetch_tickers(self, symbols=None, params=None):
+        now = int(time.time() * 1000); day = SIM_LEVELS[0]; hour = SIM_LEVELS[1]; symbols = [s for s in (symbols or self.symbols) if s in self.index]; tickers = {}
+        for group in sorted({self.index[s] // SIM_GROUP for s in symbols}):
+            rows = self._rows(group); last, opened = np.exp(self._at(group, now)), np.exp(self._at(group, now - day))
+            hours, highs, lows = self._path(1, group, (now - day - SIM_EPOCH_MS) // hour + 1, (now - SIM_EPOCH_MS) // hour); high, low = np.maximum(np.exp(highs.max(axis=1)), last), np.minimum(np.exp(lows.min(axis=1)), last)
+            quote = self.volume[rows] * (0.5 + (np.abs(np.diff(hours, axis=1)) / self._sigma(1, group)).mean(axis=1)); change = (last / opened - 1) * 100
+            for s in symbols:
+                i = self.index[s] - rows.start
+                if 0 <= i < len(last): tickers[s] = {'symbol': s, 'timestamp': now, 'last': float(last[i]), 'close': float(last[i]), 'open': float(opened[i]), 'high': float(high[i]), 'low': float(low[i]), 'change': float(last[i] - opened[i]), 'percentage': float(change[i]), 'baseVolume': float(quote[i] / last[i]), 'quoteVolume': float(quote[i])}
+        return tickers
+
+    def fetch_ticker(self, symbol, params=None):
+        return self.fetch_tickers([symbol])[symbol]
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        now = int(time.time() * 1000); group, row = divmod(self.index[symbol], SIM_GROUP)
+        return dict(simulate_order_book(float(np.exp(self._at(group, now)[row])), limit or 100, np.random.default_rng([self.seed, len(SIM_LEVELS) + 1, self.index[symbol], now // 1000])), symbol=symbol)
+
+sim_exchange = SimExchange()
+if SIMULATE: exchange, markets_loader = ExchangeClient(InstrumentedExchange(sim_exchange), budget_path=None), None  # not Binance's budget
 
 try: locale.setlocale(locale.LC_ALL, 'en_IN.UTF-8')
 except: pass
@@ -104,74 +597,80 @@ def generate_crypto_news():
         news_items.append(item)
     return news_items
 
+TIMEFRAME_MS = {'1m': 60_000, '15m': 900_000, '1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000, '1w': 604_800_000}
+TIMEFRAME_REFRESH_SECONDS = {'1m': 2, '15m': 10, '1h': 30, '4h': 60, '1d': 60, '1w': 300}
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+OHLCV_PAGE_LIMIT = 1000  # Binance spot klines return at most 1000 candles per request
+# Coarse timeframes are aggregated from a finer stored series as long as the window fits in that series' retention
+RESAMPLE_SOURCES = {'15m': '1m', '4h': '1h', '1w': '1d'}
+RESAMPLE_BASE_RETENTION = {'1m': 1500, '1h': 750, '1d': ANALYTICS_HISTORY}
+BUCKET_OFFSET_MS = {'1w': 4 * 86_400_000}  # weekly candles open on Monday, the epoch was a Thursday
+
+def resample_source(timeframe, limit):
+    # (base timeframe, base candles needed) when the window can be derived locally, else None for a native fetch
+    source = RESAMPLE_SOURCES.get(timeframe)
+    if source is None: return None
+    needed = (limit + 1) * (TIMEFRAME_MS[timeframe] // TIMEFRAME_MS[source])
+    return (source, needed) if needed <= RESAMPLE_BASE_RETENTION[source] else None
+
+# every base series is backfilled from the start to the deepest window a preset derives from it, so switching to a
+# derived preset only resamples what is already in memory
+def resample_base_limits():
+    limits = {}
+    for preset in TIMEFRAME_PRESETS.values():
+        plan = resample_source(preset['tf'], preset['limit'])
+        if plan: limits[plan[0]] = max(limits.get(plan[0], 0), plan[1])
+    return limits
+
+RESAMPLE_BASE_LIMITS = resample_base_limits()
+
+def resample_ohlcv(ts, values, step, offset=0):
+    # ts: int64 ms, values: (n, 5) open/high/low/close/volume sorted by ts -> one row per bucket
+    buckets = (ts - offset) // step * step + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    out = np.empty((len(starts), 5))
+    out[:, 0] = values[starts, 0]
+    out[:, 1] = np.maximum.reduceat(values[:, 1], starts)
+    out[:, 2] = np.minimum.reduceat(values[:, 2], starts)
+    out[:, 3] = values[ends, 3]
+    out[:, 4] = np.add.reduceat(values[:, 4], starts)
+    return buckets[starts], out
+
+def ohlcv_pages(timeframe, limit, since=None):
+    # (since, limit) requests covering `limit` candles; pages are independent so they can be fetched concurrently
+    if limit <= OHLCV_PAGE_LIMIT: return [(since, limit)]
+    step = TIMEFRAME_MS[timeframe]
+    start = since if since is not None else (int(time.time() * 1000) // step - limit + 1) * step
+    return [(start + i * step, min(OHLCV_PAGE_LIMIT, limit - i)) for i in range(0, limit, OHLCV_PAGE_LIMIT)]
+
+def fetch_ohlcv_rows(selected_symbol, timeframe, limit, since=None):
+    # Raw exchange rows: [ms, open, high, low, close, volume] in USD
+    client = exchange or sim_exchange
+    return [row for page_since, page_limit in ohlcv_pages(timeframe, limit, since) for row in client.fetch_ohlcv(selected_symbol, timeframe, since=page_since, limit=page_limit)]
+
 def fetch_chart_data(selected_symbol, timeframe, limit):
-    if exchange is None:
-        base_price = 5000000 if 'BTC' in selected_symbol else (250000 if 'ETH' in selected_symbol else 10000)
-        dates = [datetime.now() - timedelta(minutes=i) for i in range(limit)]
-        dates.reverse()
-        data = []
-        price = base_price
-        for d in dates:
-            change = random.uniform(-0.005, 0.005)
-            open_p = price
-            close_p = price * (1 + change)
-            high_p = max(open_p, close_p) * (1 + random.uniform(0, 0.002))
-            low_p = min(open_p, close_p) * (1 - random.uniform(0, 0.002))
-            vol = random.randint(100, 1000)
-            data.append([d, open_p, high_p, low_p, close_p, vol])
-            price = close_p
-        df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp']).dt.tz_localize('UTC').dt.tz_convert('Asia/Kolkata')
-        return df
     try:
-        ohlcv = exchange.fetch_ohlcv(selected_symbol, timeframe, limit=limit)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df = pd.DataFrame(fetch_ohlcv_rows(selected_symbol, timeframe, limit), columns=OHLCV_COLUMNS)
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.tz_localize('UTC').dt.tz_convert('Asia/Kolkata')
         for col in ['open', 'high', 'low', 'close']: df[col] = df[col] * USD_TO_INR_RATE
         return df
-    except: 
+    except Exception as e:
+        metrics.error('fetch_chart_data', e)
         return None
 
-def fetch_market_data():
-    data = []
-    if exchange is None:
-        for i, (sym, name) in enumerate(SYMBOL_MAP.items()):
-            base_price = 5000000 if 'BTC' in sym else (250000 if 'ETH' in sym else random.randint(10, 5000))
-            price = base_price * (1 + random.uniform(-0.05, 0.05))
-            change_24h = random.uniform(-5, 5)
-            volume = random.randint(1000000, 1000000000)
-            supply = COIN_PARAMS.get(sym, {}).get('supply', 0)
-            mkt_cap = price * supply if supply > 0 else volume * 10
-            history = []
-            val = price
-            for _ in range(15):
-                val = val * (1 + random.uniform(-0.02, 0.02))
-                history.append(val)
-            history.append(price)
-            data.append({'rank': i + 1, 'symbol': sym, 'name': name, 'price': price, 'mkt_cap': mkt_cap, 'volume': volume, 'change_24h': change_24h, 'change_7d': change_24h * 1.2, 'history': history})
-        return data
+def fetch_market_data(tickers=None):
     try:
-        tickers = exchange.fetch_tickers()
-        all_pairs = [s for s in tickers.keys() if s.endswith('/USDT')]
-        top_pairs = sorted(all_pairs, key=lambda x: tickers[x]['quoteVolume'], reverse=True)[:100]
-        for i, symbol in enumerate(top_pairs):
-            t = tickers[symbol]
-            base_coin = symbol.split('/')[0]
-            price = t['last'] * USD_TO_INR_RATE
-            volume = t['quoteVolume'] * USD_TO_INR_RATE
-            change_24h = t['percentage']
-            supply = COIN_PARAMS.get(symbol, {}).get('supply', 0)
-            mkt_cap = price * supply if supply > 0 else volume * 10
-            history = []
-            val = price
-            trend = 1 if change_24h >= 0 else -1
-            for _ in range(15):
-                val = val * (1 + random.uniform(-0.02, 0.02) * trend)
-                history.append(val)
-            history.append(price)
-            data.append({'rank': i + 1, 'symbol': symbol, 'name': base_coin, 'price': price, 'mkt_cap': mkt_cap, 'volume': volume, 'change_24h': change_24h, 'change_7d': change_24h * 3.2, 'history': history})
-    except: pass
-    return data
+        if tickers is None: tickers = (exchange or sim_exchange).fetch_tickers()
+        pairs = [s for s in tickers if s.endswith('/USDT')]
+        if not pairs: return None
+        cols = pd.DataFrame([tickers[s] for s in pairs], columns=['last', 'quoteVolume', 'percentage']).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        top = np.argsort(-np.nan_to_num(cols[:, 1], nan=-1), kind='stable')[:MARKET_SIZE]; cols = cols[top]; symbols = [pairs[i] for i in top]
+        change_24h = np.nan_to_num(cols[:, 2])
+        return build_market_snapshot(symbols, [s.split('/')[0] for s in symbols], cols[:, 0] * USD_TO_INR_RATE, np.nan_to_num(cols[:, 1]) * USD_TO_INR_RATE, change_24h, change_24h * 3.2)
+    except Exception as e:
+        metrics.error('fetch_market_data', e)
+        return None
 
 def calculate_cycle_indicators(df):
     if df is None or len(df) < 20: return None, 0, 0, 0 
@@ -195,19 +694,1473 @@ def calculate_cycle_indicators(df):
     top_score = min(top_score, 100)
     return df, current_puell, puell_meter_val, top_score
 
-def generate_global_market_data():
-    btc_df = fetch_chart_data('BTC/USDT', '1d', 365)
-    if btc_df is None: return None
-    btc_supply = 19_600_000
-    btc_df = btc_df.bfill().ffill()
-    total_mkt_cap = btc_df['close'] * btc_supply * 2.0
-    total_volume = btc_df['volume'] * 10000 * 5
-    return btc_df['timestamp'], total_mkt_cap, total_volume
+# --- CANDLE CACHE ---
+# Raw exchange candles persisted per (symbol, timeframe) as fixed-width records that workers memory-map, so a
+# restarted worker starts from a file read and history survives the exchange being unreachable. An flock per
+# file lets one worker fetch the gap while the others pick the new rows up from disk.
+CANDLE_RECORD = np.dtype([('ts', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')])
+
+class CandleCache:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, symbol, timeframe):
+        return os.path.join(self.directory, f"{symbol.replace('/', '_')}_{timeframe}.bin")
+
+    @contextlib.contextmanager
+    def locked(self, symbol, timeframe):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(symbol, timeframe) + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try: yield
+            finally: fcntl.flock(f, fcntl.LOCK_UN)
+
+    def records(self, symbol, timeframe):
+        try: return np.memmap(self.path(symbol, timeframe), dtype=CANDLE_RECORD, mode='r')
+        except (OSError, ValueError): return np.empty(0, dtype=CANDLE_RECORD)
+
+    def read(self, symbol, timeframe, since=None, tail=None):
+        records = self.records(symbol, timeframe)
+        if since is not None: records = records[int(np.searchsorted(records['ts'], since)):]
+        if tail is not None: records = records[-tail:]
+        return np.column_stack([records[name] for name in CANDLE_RECORD.names]).astype('float64') if len(records) else np.empty((0, 6))
+
+    def age(self, symbol, timeframe):
+        try: return time.time() - os.path.getmtime(self.path(symbol, timeframe))
+        except OSError: return float('inf')
+
+    def backfilled(self, symbol, timeframe):
+        try:
+            with open(self.path(symbol, timeframe)[:-4] + '.json') as f: return json.load(f)['backfilled']
+        except (OSError, ValueError, KeyError): return 0
+
+    def write(self, symbol, timeframe, rows, backfilled=None):
+        if not len(rows): return
+        rows = np.asarray(rows, dtype='float64')
+        records = np.empty(len(rows), dtype=CANDLE_RECORD)
+        for i, name in enumerate(CANDLE_RECORD.names): records[name] = rows[:, i]
+        path = self.path(symbol, timeframe)
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.records(symbol, timeframe)
+        if backfilled is not None or not len(existing) or records['ts'][0] < existing['ts'][0]:
+            tmp = f'{path}.{os.getpid()}.tmp'
+            records.tofile(tmp)
+            os.replace(tmp, path)  # readers holding the old mapping keep their inode
+        else:
+            position = int(np.searchsorted(existing['ts'], records['ts'][0]))
+            del existing
+            with open(path, 'r+b') as f:
+                f.seek(position * CANDLE_RECORD.itemsize)
+                f.write(records.tobytes())
+                f.truncate()
+        if backfilled is not None:
+            with open(path[:-4] + '.json', 'w') as f: json.dump({'backfilled': backfilled}, f)
+
+candle_cache = CandleCache(CANDLE_CACHE_DIR)
+
+# --- CANDLE STORE ---
+# One append-only series per (symbol, timeframe): backfilled once to the deepest limit any chart asked for, then
+# topped up with only the candles at/after the last stored open time. Prices are converted to INR on ingest and
+# frames are handed out as views over the backing arrays; arrays are reallocated (never compacted in place) so a
+# frame a callback is still reading keeps its data.
+class CandleSeries:
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.lock = threading.RLock()
+        self.ts = np.empty(0, dtype='int64')
+        self.values = np.empty((0, 5))
+        self.size = 0
+        self.limit = 0
+        self.backfilled = 0
+        self.version = 0
+        self.rewrites = 0
+        self.base = None
+
+    def want(self, limit):
+        self.limit = max(self.limit, limit)
+
+    def reset(self):
+        # empty until the next refresh backfills it; derived series and indicator states rebuild from scratch
+        with self.lock:
+            self.size = self.backfilled = 0
+            self.version += 1; self.rewrites += 1
+
+    def _write(self, rows):
+        if not len(rows): return
+        rows = np.array(rows, dtype='float64')
+        rows[:, 1:5] *= USD_TO_INR_RATE
+        self._put(rows)
+
+    def _put(self, rows):
+        # rows: [ms, open, high, low, close, volume] with prices already in INR
+        start = int(np.searchsorted(self.ts[:self.size], int(rows[0, 0])))
+        end = start + len(rows)
+        if end > len(self.ts):
+            keep = min(start, max(self.limit - len(rows), 0))
+            capacity = 2 * max(self.limit, keep + len(rows))
+            ts, values = np.empty(capacity, dtype='int64'), np.empty((capacity, 5))
+            ts[:keep], values[:keep] = self.ts[start - keep:start], self.values[start - keep:start]
+            self.ts, self.values = ts, values
+            start, end = keep, keep + len(rows)
+        if start < self.size - 1: self.rewrites += 1  # anything before the open candle changed, derived state must rebuild
+        self.ts[start:end] = rows[:, 0]
+        self.values[start:end] = rows[:, 1:]
+        self.size = end
+        self.version += 1
+
+    def _sync_cache(self, limit):
+        if self.size == 0:
+            self._write(candle_cache.read(self.symbol, self.timeframe, tail=limit))
+            if self.size: self.backfilled = min(limit, max(self.size, candle_cache.backfilled(self.symbol, self.timeframe)))
+        else:
+            self._write(candle_cache.read(self.symbol, self.timeframe, since=int(self.ts[self.size - 1])))
+
+    def _fresh(self, limit):
+        return bool(self.size) and self.backfilled >= limit and candle_cache.age(self.symbol, self.timeframe) < 0.9 * TIMEFRAME_REFRESH_SECONDS.get(self.timeframe, 60)
+
+    def load_cached(self):
+        # pull in what the on-disk cache holds; True when it already covers the wanted window and is fresh
+        with self.lock, candle_cache.locked(self.symbol, self.timeframe):
+            limit = max(self.limit, 1)
+            self._sync_cache(limit)
+            return self._fresh(limit)
+
+    def backfill(self, rows, limit):
+        # a full window fetched outside refresh(), e.g. by the async warm-up
+        with self.lock, candle_cache.locked(self.symbol, self.timeframe):
+            self._write(rows)
+            self.backfilled = max(self.backfilled, limit)
+            candle_cache.write(self.symbol, self.timeframe, rows, backfilled=self.backfilled)
+
+    def refresh(self):
+        persist = exchange is not None and not SIMULATE
+        with self.lock, (candle_cache.locked(self.symbol, self.timeframe) if persist else contextlib.nullcontext()):
+            limit = max(self.limit, 1)
+            if persist:
+                self._sync_cache(limit)
+                fresh = self._fresh(limit)
+                metrics.inc('cache_requests_total', cache='candle_disk', result='hit' if fresh else 'miss')
+                if fresh: return True
+            if self.size == 0 or self.backfilled < limit:
+                rows = fetch_ohlcv_rows(self.symbol, self.timeframe, limit)
+                self._write(rows)
+                self.backfilled = limit
+                if persist: candle_cache.write(self.symbol, self.timeframe, rows, backfilled=limit)
+                return self.size > 0
+            last = int(self.ts[self.size - 1])
+            gap = int((time.time() * 1000 - last) // TIMEFRAME_MS.get(self.timeframe, 60_000)) + 1
+            if gap >= limit:
+                self.backfilled = 0
+                return self.refresh()
+            rows = fetch_ohlcv_rows(self.symbol, self.timeframe, gap + 1, since=last)
+            self._write(rows)
+            if persist: candle_cache.write(self.symbol, self.timeframe, rows)
+            return True
+
+    def apply_live(self, kline):
+        # kline is a raw [ms, open, high, low, close, volume] in USD from the stream
+        with self.lock:
+            if not self.backfilled or kline[0] < self.ts[self.size - 1]: return
+            self._write([kline])
+
+    def frame(self, limit, extra=None):
+        # extra maps column name -> array aligned with the series rows (e.g. indicator output), sliced like the candles
+        with self.lock: size, ts, values = self.size, self.ts, self.values
+        if size == 0: return None
+        start = max(size - limit, 0)
+        columns = {'timestamp': pd.DatetimeIndex(ts[start:size].view('datetime64[ms]')).tz_localize('UTC').tz_convert('Asia/Kolkata')}  # a third of to_datetime's cost
+        columns.update((name, values[start:size, i]) for i, name in enumerate(OHLCV_COLUMNS[1:]))
+        columns.update((name, array[start:size]) for name, array in (extra or {}).items())
+        return pd.DataFrame(columns, copy=False)
+
+class ResampledSeries(CandleSeries):
+    """A coarser timeframe aggregated from a finer stored series. Each pass only rebuilds buckets from the
+    open one onwards, unless the base rewrote history."""
+    def __init__(self, symbol, timeframe, base):
+        super().__init__(symbol, timeframe)
+        self.base = base
+        self.step = TIMEFRAME_MS[timeframe]
+        self.ratio = self.step // TIMEFRAME_MS[base.timeframe]
+        self.offset = BUCKET_OFFSET_MS.get(timeframe, 0)
+        self.base_version = -1
+        self.base_rewrites = -1
+
+    def want(self, limit):
+        super().want(limit)
+        self.base.want((limit + 1) * self.ratio)
+
+    def refresh(self):
+        base = self.base
+        fetched = True if base._fresh(max(base.limit, 1)) else base.refresh()  # a base its own job keeps current needs no disk or exchange round trip
+        self.resample()
+        return fetched and self.size > 0
+
+    def resample(self):
+        with self.lock, self.base.lock:
+            base = self.base
+            if base.version == self.base_version: return
+            ts, values = base.ts[:base.size], base.values[:base.size]
+            start = int(np.searchsorted(ts, self.ts[self.size - 1])) if self.size and base.rewrites == self.base_rewrites else 0
+            buckets, rows = resample_ohlcv(ts[start:], values[start:], self.step, self.offset)
+            if start == 0 and len(buckets) > 1 and buckets[0] != ts[0]: buckets, rows = buckets[1:], rows[1:]  # the base starts mid-bucket
+            self.base_version, self.base_rewrites = base.version, base.rewrites
+            self.backfilled = base.backfilled // self.ratio
+            if len(buckets): self._put(np.column_stack([buckets, rows]))
+
+    def apply_live(self, kline):
+        pass  # live klines land on the base series
+
+class CandleStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series_map = {}
+
+    def get(self, symbol, timeframe):
+        return self.series_map.get((symbol, timeframe, None))
+
+    def series(self, symbol, timeframe, source=None):
+        base = self.series(symbol, source) if source is not None else None
+        with self.lock:
+            series = self.series_map.get((symbol, timeframe, source))
+            if series is None:
+                series = self.series_map[(symbol, timeframe, source)] = CandleSeries(symbol, timeframe) if base is None else ResampledSeries(symbol, timeframe, base)
+                if base is None: series.want(RESAMPLE_BASE_LIMITS.get(timeframe, 0))
+            return series
+
+    def reset(self):
+        with self.lock: series_list = list(self.series_map.values())
+        for series in series_list: series.reset()
+
+candle_store = CandleStore()
+
+# --- INDICATOR ENGINE ---
+# Incremental twin of calculate_cycle_indicators for store-backed series. Prefix sums of close/gain/loss make every
+# rolling value O(1); a tick on the open candle recomputes one row, a new candle recomputes the rows whose window
+# now starts at the sliding view edge, and only a backfill/rewrite of history triggers the full-length pass.
+RSI_WINDOW = 14
+
+def cycle_windows(length):
+    return {'111DMA': min(111, length // 2), '350DMA': min(350, length), 'Rainbow_Base': min(100, length // 2), '365DMA': min(365, length), '200DMA': 200}
+
+class CycleIndicatorState:
+    def __init__(self):
+        self.ts_ref = None
+        self.rewrites = -1
+        self.windows = None
+        self.size = 0
+        self.start = 0
+
+    def _reset(self, series, windows):
+        capacity = len(series.ts)
+        self.ts_ref, self.rewrites, self.windows = series.ts, series.rewrites, windows
+        self.prefix = {k: np.zeros(capacity + 1) for k in ('close', 'gain', 'loss')}
+        self.gain, self.loss = np.zeros(capacity), np.zeros(capacity)
+        self.out = {k: np.full(capacity, np.nan) for k in list(windows) + ['log_price', 'Puell', 'RSI']}
+        self.size = 0
+
+    def _extend(self, close, lo, hi):
+        delta = close[lo:hi] - close[max(lo - 1, 0):hi - 1] if lo > 0 else np.concatenate([[0.0], np.diff(close[:hi])])
+        self.gain[lo:hi], self.loss[lo:hi] = np.maximum(delta, 0), np.maximum(-delta, 0)
+        for key, values in (('close', close), ('gain', self.gain), ('loss', self.loss)): self.prefix[key][lo + 1:hi + 1] = self.prefix[key][lo] + np.cumsum(values[lo:hi])
+
+    def _compute(self, close, lo, hi, start):
+        if lo >= hi: return
+        idx = np.arange(lo, hi)
+        for name, w in self.windows.items():
+            first = idx - w + 1
+            mean = (self.prefix['close'][idx + 1] - self.prefix['close'][np.maximum(first, 0)]) / w
+            mean[first < start] = np.nan  # the pandas reference only sees the view, so windows cannot reach past its start
+            self.out[name][lo:hi] = mean * 2 if name == '350DMA' else mean
+        self.out['log_price'][lo:hi] = np.log(close[lo:hi])
+        dma_365 = self.out['365DMA'][lo:hi]
+        self.out['Puell'][lo:hi] = close[lo:hi] / np.where(dma_365 == 0, np.nan, dma_365)
+        first = idx - RSI_WINDOW + 1
+        sums = {}
+        for key in ('gain', 'loss'):
+            total = self.prefix[key][idx + 1] - self.prefix[key][np.maximum(first, 0)]
+            sums[key] = total - np.where(first <= start, getattr(self, key)[start], 0)  # the view's first diff is NaN, counted as 0
+        with np.errstate(divide='ignore', invalid='ignore'): rsi = 100 - (100 / (1 + sums['gain'] / sums['loss']))
+        rsi[first < start] = np.nan
+        self.out['RSI'][lo:hi] = rsi
+
+    def update(self, series, limit):
+        size = series.size
+        length = min(size, limit)
+        start = size - length
+        close = series.values[:, 3]
+        windows = cycle_windows(length)
+        if series.ts is not self.ts_ref or series.rewrites != self.rewrites or windows != self.windows or size < self.size:
+            self._reset(series, windows)
+            self._extend(close, 0, size)
+            self._compute(close, start, size, start)
+        else:
+            changed = max(self.size - 1, 0)
+            self._extend(close, changed, size)
+            if start != self.start: self._compute(close, start, min(start + max(windows.values()) + RSI_WINDOW, size), start)
+            self._compute(close, changed, size, start)
+        self.size, self.start = size, start
+
+class IndicatorEngine:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states = {}
+
+    def reset(self):
+        with self.lock: self.states.clear()
+
+    def cycle(self, series, limit):
+        with self.lock:
+            state = self.states.get((series.symbol, series.timeframe, limit))
+            if state is None: state = self.states[(series.symbol, series.timeframe, limit)] = CycleIndicatorState()
+        with series.lock:
+            if min(series.size, limit) < 20: return None, 0, 0, 0, 0
+            state.update(series, limit)
+            size = state.size
+            df = series.frame(limit, {name: state.out[name] for name in ('111DMA', '350DMA', 'log_price', 'Rainbow_Base', '365DMA', 'Puell', 'RSI')})
+            last = {name: values[size - 1] for name, values in state.out.items()}
+            last_close = series.values[size - 1, 3]
+        current_puell = last['Puell'] if not pd.isna(last['Puell']) else 1.0
+        puell_meter_val = min(max((current_puell - 0.5) / (3.0 - 0.5) * 100, 0), 100)
+        current_rsi = last['RSI'] if not pd.isna(last['RSI']) else 50
+        pi_denom = last['350DMA'] if not pd.isna(last['350DMA']) else last_close
+        top_score = min((last_close / pi_denom * 0.6 + (current_rsi / 100) * 0.4) * 100, 100)
+        dma_200 = last['200DMA'] if not pd.isna(last['200DMA']) else 0
+        return df, current_puell, puell_meter_val, top_score, dma_200
+
+indicator_engine = IndicatorEngine()
+
+# --- MARKET SNAPSHOT ---
+MARKET_SIZE = int(os.environ.get('MARKET_SIZE', 100))
+SPARK_POINTS = 16
+SPARK_STEP_SECONDS = 86400 // (SPARK_POINTS - 1)  # the sparkline spans the last 24h
+SPARK_WIDTH, SPARK_HEIGHT = 120, 40
+PAGE_SIZES = [10, 25, 50, 100]
+
+class SparkHistory:
+    """Ring of sampled prices per symbol; one column per SPARK_STEP_SECONDS, the newest column tracks the last price."""
+    def __init__(self, points=SPARK_POINTS, step=SPARK_STEP_SECONDS):
+        self.lock = threading.Lock(); self.points = points; self.step = step
+        self.symbols = pd.Index([]); self.values = np.empty((0, points)); self.slot = None
+
+    def reset(self):
+        with self.lock: self.symbols = pd.Index([]); self.values = np.empty((0, self.points)); self.slot = None
+
+    def update(self, symbols, price, open_24h):
+        with self.lock:
+            idx = self.symbols.get_indexer(symbols); known = idx >= 0
+            # symbols seen for the first time start as a straight line from their 24h open
+            values = np.linspace(open_24h, price, self.points, axis=1)
+            values[known] = self.values[idx[known]]
+            slot = int(time.time() // self.step); gap = slot - self.slot if self.slot is not None else 0
+            if gap > 0:
+                # one column per elapsed step; the ones no update saw are drawn straight from the last price to this one
+                shift = min(gap, self.points); last = values[known, -1:]
+                values[known] = np.roll(values[known], -shift, axis=1)
+                values[known, -shift:] = last + (np.asarray(price, dtype='float64')[known, None] - last) * np.arange(gap - shift + 1, gap + 1) / gap
+            values[:, -1] = price
+            self.symbols, self.values, self.slot = pd.Index(symbols), values, max(slot, self.slot or slot)
+            return values.copy()
+
+class MarketSnapshot:
+    """Ranked market table held column-wise, indexed by symbol, with one sparkline row per symbol."""
+    def __init__(self, frame, history):
+        self.frame = frame; self.history = history
+
+    def __len__(self):
+        return len(self.frame)
+
+    def rows(self, positions):
+        records = self.frame.iloc[positions].reset_index().to_dict('records')
+        for record, history in zip(records, self.history[positions]): record['history'] = history.tolist()
+        return records
+
+    def page(self, start, stop):
+        return self.rows(np.arange(start, min(stop, len(self))))
+
+    def sparklines(self, start, stop):
+        return sparkline_svgs(self.history[start:stop], self.frame['change_7d'].to_numpy()[start:stop] >= 0)
+
+    def movers(self, k=5):
+        change = self.frame['change_24h'].to_numpy(); k = min(k, len(change))
+        if not k: return [], []
+        top = np.argpartition(-change, k - 1)[:k]; bottom = np.argpartition(change, k - 1)[:k]
+        return self.rows(top[np.argsort(-change[top], kind='stable')]), self.rows(bottom[np.argsort(change[bottom], kind='stable')])
+
+    def lookup(self, symbols):
+        positions = self.frame.index.get_indexer(symbols); found = self.rows(positions[positions >= 0]); it = iter(found)
+        return [next(it) if p >= 0 else None for p in positions]
+
+def sparkline_svgs(history, rising, width=SPARK_WIDTH, height=SPARK_HEIGHT):
+    """Inline SVG data URIs for a (rows, points) price matrix; every row is scaled in one array pass."""
+    if not len(history): return []
+    lo = history.min(axis=1, keepdims=True); span = history.max(axis=1, keepdims=True) - lo
+    y = np.round(height - 2 - np.divide(history - lo, span, out=np.full_like(history, 0.5), where=span > 0) * (height - 4), 1)
+    xs = [f'{v:g}' for v in np.round(np.linspace(0, width, history.shape[1]), 1)]; uris = []
+    for row, up in zip(y.tolist(), rising):
+        line = ' '.join(f'{a},{b:g}' for a, b in zip(xs, row)); color = '%2300CC96' if up else '%23FF4136'
+        uris.append(f"data:image/svg+xml;utf8,<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}'><polygon points='0,{height} {line} {width},{height}' fill='{color}' fill-opacity='0.1'/><polyline points='{line}' fill='none' stroke='{color}' stroke-width='2'/></svg>")
+    return uris
+
+def build_market_snapshot(symbols, names, price, volume, change_24h, change_7d):
+    index = pd.Index(symbols, name='symbol')
+    supply = pd.Series({s: p['supply'] for s, p in COIN_PARAMS.items()}, dtype=float).reindex(index).fillna(0).to_numpy()
+    frame = pd.DataFrame({'rank': np.arange(1, len(index) + 1), 'name': names, 'price': price, 'mkt_cap': np.where(supply > 0, price * supply, volume * 10), 'volume': volume, 'change_24h': change_24h, 'change_7d': change_7d}, index=index)
+    return MarketSnapshot(frame, spark_history.update(index, price, price / (1 + change_24h / 100)))
+
+spark_history = SparkHistory()
+
+# --- STREAMING INGEST ---
+# STREAM_MODE=ws keeps tickers and the open candle live from Binance combined streams; REST polling then only
+# ranks the top-100 universe and resyncs candle history. Point MARKET_STREAM_URL at stream_replay.py to run offline.
+STREAM_MODE = os.environ.get('STREAM_MODE', 'rest')
+MARKET_STREAM_URL = os.environ.get('MARKET_STREAM_URL', 'wss://stream.binance.com:9443/stream')
+STREAM_STALE_SECONDS = 10
+STREAM_RESYNC_SECONDS = 60
+MARKET_RERANK_SECONDS = 600
+
+def to_stream_id(symbol):
+    return symbol.replace('/', '').lower()
+
+class MarketStream(BackgroundThread):
+    thread_name = 'market-stream'
+
+    def __init__(self, url):
+        self.url = url
+        self.lock = threading.Lock()
+        self.streams = set()
+        self.subscribed = set()
+        self.symbols = {}
+        self.tickers = {}
+        self.ws = None
+        self.thread = None
+        self.pid = None
+        self.last_message = 0
+        self.ranked_at = 0
+        self.request_id = 0
+
+    def _run(self):
+        backoff = 1
+        while True:
+            with self.lock: streams = sorted(self.streams)
+            if not streams:
+                time.sleep(0.5)
+                continue
+            opened_at = time.time()
+            self.ws = websocket.WebSocketApp(f"{self.url}?streams={'/'.join(streams)}", on_open=lambda ws: self._on_open(streams), on_message=self._on_message)
+            try: self.ws.run_forever(ping_interval=60, ping_timeout=20)
+            except Exception as e: metrics.error('stream', e)
+            with self.lock: self.subscribed = set()
+            if time.time() - opened_at > 60: backoff = 1
+            time.sleep(backoff + random.uniform(0, 1))
+            backoff = min(backoff * 2, 30)
+
+    def _on_open(self, streams):
+        with self.lock: self.subscribed = set(streams)
+        self._subscribe()
+
+    def _subscribe(self):
+        with self.lock:
+            missing = sorted(self.streams - self.subscribed)
+            if not missing or self.ws is None or not self.subscribed: return
+            self.subscribed.update(missing)
+            self.request_id += 1
+            message = json.dumps({'method': 'SUBSCRIBE', 'params': missing, 'id': self.request_id})
+        try: self.ws.send(message)
+        except Exception as e: metrics.error('stream.subscribe', e)
+
+    def _on_message(self, ws, message):
+        try: payload = json.loads(message)
+        except ValueError: return
+        data = payload.get('data') if isinstance(payload, dict) else None
+        if not isinstance(data, dict): return
+        self.last_message = time.time()
+        symbol = self.symbols.get(str(data.get('s', '')).lower())
+        if symbol is None: return
+        if data.get('e') == '24hrTicker':
+            self.tickers[symbol] = {'symbol': symbol, 'timestamp': data['E'], 'last': float(data['c']), 'open': float(data['o']), 'high': float(data['h']), 'low': float(data['l']), 'percentage': float(data['P']), 'baseVolume': float(data['v']), 'quoteVolume': float(data['q'])}
+        elif data.get('e') == 'kline':
+            k = data['k']
+            series = candle_store.get(symbol, k['i'])
+            if series is not None: series.apply_live([k['t'], float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])])
+        elif data.get('e') == 'depthUpdate':
+            order_books.on_diff(symbol, data)
+
+    def watch(self, streams, symbols):
+        with self.lock:
+            for s in symbols: self.symbols[to_stream_id(s)] = s
+            new = set(streams) - self.streams
+            self.streams.update(new)
+        self._ensure_running()
+        if new: self._subscribe()
+
+    def healthy(self):
+        return time.time() - self.last_message < STREAM_STALE_SECONDS
+
+    def ticker_snapshot(self, symbols=None):
+        if not self.healthy(): return None
+        tickers = dict(self.tickers)
+        return tickers if symbols is None else {s: tickers[s] for s in symbols if s in tickers}
+
+market_stream = MarketStream(MARKET_STREAM_URL) if STREAM_MODE == 'ws' else None
+
+# --- MARKET DATA HUB ---
+# One poller per process: callbacks read the latest snapshot instead of hitting the exchange,
+# so exchange load scales with the number of symbols/timeframes rather than with open sessions.
+HUB_TICK_SECONDS = 0.25
+HUB_SUBSCRIPTION_TTL = 120
+TICKER_REFRESH_SECONDS = 2
+MARKET_REFRESH_SECONDS = 10
+
+class MarketDataHub(BackgroundThread):
+    thread_name = 'market-data-hub'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.thread = None
+        self.pid = None
+
+    def _ensure_running(self):
+        # each worker's first reader also starts the warm-up and the other pollers
+        if not super()._ensure_running(): return False
+        if WARMUP_ENABLED and exchange is not None: threading.Thread(target=warm_up, name='market-warm-up', daemon=True).start()
+        alert_book._ensure_running()
+        market_rollup._ensure_running()
+        return True
+
+    def _refresh(self, job):
+        with job['lock']:
+            if job['due'] > time.time(): return  # another reader refreshed (or failed) while we waited
+            try: value = job['loader']()
+            except Exception as e:
+                metrics.error(f"hub.{job['name']}", e)
+                value = None
+            if value is not None: job['value'] = value
+            job['due'] = time.time() + job['interval']
+
+    def _run(self):
+        while True:
+            now = time.time()
+            with self.lock:
+                for key in [k for k, j in self.jobs.items() if now - j['seen'] > HUB_SUBSCRIPTION_TTL]: del self.jobs[key]
+                due = [j for j in self.jobs.values() if j['due'] <= now]
+            for job in due: self._refresh(job)
+            if markets_loader is not None: markets_loader.ensure_fresh()  # refetched in the background once past its TTL
+            time.sleep(HUB_TICK_SECONDS)
+
+    def _job(self, key, loader, interval):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None: job = self.jobs[key] = {'name': key[0], 'loader': loader, 'interval': interval, 'value': None, 'due': 0, 'seen': 0, 'lock': threading.Lock()}
+            job['seen'] = time.time()
+        return job
+
+    def seed(self, key, loader, interval, value):
+        # a value fetched elsewhere (the async warm-up) becomes the snapshot readers get
+        if value is None: return
+        job = self._job(key, loader, interval)
+        with job['lock']: job['value'], job['due'] = value, time.time() + interval
+
+    def reset(self):
+        # readers fetch afresh; loaders close over the objects they refresh, so the jobs go too
+        with self.lock: self.jobs.clear()
+
+    def peek(self, key):
+        # the current snapshot of a job some reader keeps subscribed, without subscribing
+        with self.lock: job = self.jobs.get(key)
+        return job['value'] if job is not None else None
+
+    def read(self, key, loader, interval):
+        self._ensure_running()
+        job = self._job(key, loader, interval)
+        metrics.inc('cache_requests_total', cache=f"hub.{job['name']}", result='miss' if job['value'] is None else 'hit')
+        if job['value'] is None: self._refresh(job)  # first reader pays for the initial fetch, everyone after reads the snapshot
+        return job['value']
+
+    def tickers(self):
+        if market_stream is not None:
+            market_stream.watch([f"{to_stream_id(s)}@ticker" for s in TRACKER_SYMBOLS], TRACKER_SYMBOLS)
+            live = market_stream.ticker_snapshot(TRACKER_SYMBOLS)
+            if live: return live
+        return self.read(('tickers',), fetch_tracker_tickers, TICKER_REFRESH_SECONDS) or {}
+
+    def market(self):
+        return self.read(('market',), load_market_data, MARKET_REFRESH_SECONDS)
+
+    def series(self, symbol, timeframe, limit):
+        plan = resample_source(timeframe, limit); source = plan[0] if plan else None
+        series = candle_store.series(symbol, timeframe, source)
+        series.want(limit)
+        interval = STREAM_RESYNC_SECONDS if market_stream is not None else TIMEFRAME_REFRESH_SECONDS.get(timeframe, 60)
+        self.read(('ohlcv', symbol, timeframe, source), lambda: series if series.refresh() else None, interval)
+        if 0 < series.backfilled < limit:
+            try: series.refresh()  # a chart asked for deeper history than this series was backfilled with
+            except Exception as e: metrics.error('hub.backfill', e)
+        if series.base is not None: series.resample()  # folds in live base candles between refreshes
+        if market_stream is not None: market_stream.watch([f"{to_stream_id(symbol)}@kline_{source or timeframe}"], [symbol])
+        return series
+
+    def chart(self, symbol, timeframe, limit):
+        return self.series(symbol, timeframe, limit).frame(limit)
+
+    def cycle_indicators(self, symbol, timeframe, limit):
+        return indicator_engine.cycle(self.series(symbol, timeframe, limit), limit)
+
+market_hub = MarketDataHub()
+
+def fetch_tracker_tickers():
+    return (exchange or sim_exchange).fetch_tickers(TRACKER_SYMBOLS)
+
+def load_market_data():
+    live = market_stream.ticker_snapshot() if market_stream is not None else None
+    if live and (exchange is None or time.time() - market_stream.ranked_at < MARKET_RERANK_SECONDS): return fetch_market_data(live) or None
+    data = fetch_market_data()
+    if market_stream is not None and data:
+        symbols = list(data.frame.index)
+        market_stream.watch([f"{to_stream_id(s)}@ticker" for s in symbols], symbols)
+        market_stream.ranked_at = time.time()
+    return data or None
+
+# --- MARKET ROLLUPS ---
+# Total market cap, 24h volume and dominance of the top-MARKET_SIZE universe (the snapshot's price x COIN_PARAMS
+# supply), sampled every ROLLUP_SAMPLE_SECONDS into one ring per resolution. A ring is direct-mapped: bucket b lives in
+# slot b % capacity next to the bucket number it holds, so a value some time ago is one index and an overwritten or
+# never-sampled slot just misses. The hour and day rings start from the tracked coins' candles, with the rest of the
+# universe scaled by the tracked coins' move since.
+ROLLUP_SAMPLE_SECONDS = 60
+ROLLUP_RESOLUTIONS = {'1m': (60, 1500), '1h': (3600, 750), '1d': (86400, 400)}  # seconds per bucket, buckets kept
+ROLLUP_GROUPS = ['Bitcoin', 'Ethereum', 'Other majors', f'Rest of top {MARKET_SIZE}']  # market cap columns, then volume
+ROLLUP_GROUP_OF = {'BTC/USDT': 0, 'ETH/USDT': 1}
+
+class RollupRing:
+    def __init__(self, resolution, capacity, width):
+        self.resolution, self.capacity = resolution, capacity
+        self.buckets = np.full(capacity, -1, dtype='int64')
+        self.values = np.full((capacity, width), np.nan)
+
+    def put(self, t, rows):
+        # rows for times t (seconds); the last row put in a bucket is its value
+        buckets = np.asarray(t, dtype='int64') // self.resolution; slots = buckets % self.capacity
+        self.buckets[slots] = buckets; self.values[slots] = rows
+
+    def missing(self, t):
+        buckets = np.asarray(t, dtype='int64') // self.resolution
+        return self.buckets[buckets % self.capacity] != buckets
+
+    def get(self, t):
+        bucket = int(t) // self.resolution; slot = bucket % self.capacity
+        return self.values[slot] if self.buckets[slot] == bucket else None
+
+    def series(self, now):
+        # (bucket start times, rows) of the filled buckets, oldest first
+        last = int(now) // self.resolution; buckets = np.arange(last - self.capacity + 1, last + 1); slots = buckets % self.capacity
+        keep = self.buckets[slots] == buckets
+        return buckets[keep] * self.resolution, self.values[slots[keep]]
+
+class MarketRollup(BackgroundThread):
+    thread_name = 'market-rollup'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sampling = threading.Lock()
+        self.reset()
+        self.thread = None
+        self.pid = None
+
+    def reset(self):
+        with self.sampling, self.lock:
+            self.rings = {name: RollupRing(resolution, capacity, len(ROLLUP_GROUPS) + 1) for name, (resolution, capacity) in ROLLUP_RESOLUTIONS.items()}
+            self.latest = None
+            self.backfilled = False
+
+    def _run(self):
+        while True:
+            try: self.sample()
+            except Exception as e: metrics.error('rollup', e)
+            time.sleep(ROLLUP_SAMPLE_SECONDS - time.time() % ROLLUP_SAMPLE_SECONDS)
+
+    @staticmethod
+    def row(frame):
+        groups = np.array([ROLLUP_GROUP_OF.get(s, 2 if s in COIN_PARAMS else 3) for s in frame.index], dtype='int64')
+        return np.r_[np.bincount(groups, frame['mkt_cap'].to_numpy(dtype='float64'), minlength=len(ROLLUP_GROUPS)), frame['volume'].sum()]
+
+    def sample(self, snapshot=None, now=None):
+        # reuses the screeners' snapshot while someone watches them, else polls the universe itself
+        with self.sampling:
+            snapshot = snapshot or market_hub.peek(('market',)) or load_market_data()
+            if snapshot is None: return
+            now = time.time() if now is None else now; row = self.row(snapshot.frame)
+            if not self.backfilled: self.backfilled = self.backfill(snapshot.frame, row, now)
+            with self.lock:
+                for ring in self.rings.values(): ring.put([now], row[None])
+                self.latest = (now, row)
+
+    def backfill(self, frame, row, now):
+        tracked = [s for s in COIN_PARAMS if s in frame.index]
+        if not tracked: return True
+        tracked_cap, tracked_volume = row[:3].sum(), frame.loc[tracked, 'volume'].sum()
+        for name in ('1h', '1d'):
+            ring = self.rings[name]; caps, volumes = {}, {}
+            for s in tracked:
+                df = market_hub.chart(s, name, ring.capacity)
+                if df is None or df.empty: return False
+                t = timestamps_ms(df['timestamp']) // 1000; caps[s] = pd.Series(df['close'].to_numpy() * COIN_PARAMS[s]['supply'], index=t); volumes[s] = pd.Series((df['close'] * df['volume']).to_numpy(), index=t)
+            caps, volumes = pd.DataFrame(caps).sort_index().ffill().fillna(0), pd.DataFrame(volumes).sort_index().fillna(0)
+            if name == '1h': volumes = volumes.rolling(24).sum()  # hourly candles -> trailing 24h volume
+            t = caps.index.to_numpy(dtype='int64'); groups = np.array([ROLLUP_GROUP_OF.get(s, 2) for s in caps.columns])
+            rows = np.zeros((len(t), len(ROLLUP_GROUPS) + 1))
+            for group in range(3): rows[:, group] = caps.to_numpy()[:, groups == group].sum(axis=1)
+            rows[:, 3] = row[3] * rows[:, :3].sum(axis=1) / tracked_cap if tracked_cap else 0; rows[:, 4] = volumes.to_numpy().sum(axis=1) * (row[4] / tracked_volume if tracked_volume else 1)
+            keep = ring.missing(t) & (t // ring.resolution < int(now) // ring.resolution)  # never over a sampled bucket
+            with self.lock: ring.put(t[keep], rows[keep])
+        return True
+
+    def read(self):
+        # (now, latest row) after the first sample, which the first reader of a fresh worker takes itself
+        self._ensure_running()
+        if self.latest is None: self.sample()
+        return self.latest
+
+    def at(self, seconds_ago, now):
+        # the row seconds_ago before now from the finest ring that still holds it, else None
+        with self.lock:
+            for ring in self.rings.values():
+                if seconds_ago < (ring.capacity - 1) * ring.resolution:
+                    found = ring.get(now - seconds_ago)
+                    if found is not None: return found
+        return None
+
+    def series(self, name, now):
+        with self.lock: return self.rings[name].series(now)
+
+market_rollup = MarketRollup()
+
+# --- ORDER BOOK ---
+# Local L2 books for the depth panels. With STREAM_MODE=ws a book is a fetch_order_book snapshot kept current by the
+# <symbol>@depth@100ms diff stream: diffs that arrive before the snapshot are buffered, diffs the snapshot already
+# covers (u <= lastUpdateId) are dropped, and a diff whose first id U skips past the book's last id means updates
+# were lost, so the book waits for a new snapshot. Without the stream the hub re-polls a small snapshot instead.
+# Each side is a pair of arrays sorted best-first; the cumulative size is kept for a prefix that an update only
+# invalidates from the first level it touches, so far-from-mid churn does not redo the visible band.
+DEPTH_SNAPSHOT_LIMIT = 1000
+DEPTH_POLL_LIMIT = 100  # REST-only books re-poll this many levels every DEPTH_REFRESH_SECONDS (weight 5)
+DEPTH_REFRESH_SECONDS = 2
+DEPTH_RESYNC_SECONDS = 5  # least time between snapshot requests for one book
+DEPTH_PENDING_LIMIT = 500
+DEPTH_BAND_PCT = 1.0  # the panels show this far either side of mid
+DEPTH_BINS = 50  # price bins per side of mid, for the depth curve and each heatmap column
+DEPTH_SAMPLE_SECONDS = 1
+DEPTH_HEATMAP_COLUMNS = 120
+
+def price_step(price):
+    # 1, 2 or 5 times a power of ten, the first at least price
+    magnitude = 10 ** np.floor(np.log10(price))
+    return float(next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= price))
+
+def book_levels(levels):
+    # [[price, size, ...], ...] as numbers or exchange strings -> (n, 2) float array
+    levels = np.array(levels, dtype='float64') if len(levels) else np.empty((0, 2))
+    return levels.reshape(len(levels), -1)[:, :2]
+
+class BookSide:
+    def __init__(self, sign):
+        self.sign = sign  # 1 for asks, -1 for bids: keys = sign * price ascend from the best level
+        self.keys = np.empty(0)
+        self.sizes = np.empty(0)
+        self.cum = np.empty(0)
+        self.valid = 0  # self.cum[:valid] is current
+
+    def load(self, levels):
+        keys = self.sign * levels[:, 0]; order = np.argsort(keys, kind='stable'); keep = levels[order, 1] > 0
+        self.keys, self.sizes = keys[order][keep], levels[order, 1][keep]
+        self.cum = np.empty(len(self.sizes)); self.valid = 0
+
+    def apply(self, levels):
+        # size 0 removes a level; within one diff the last entry for a price wins
+        if not len(levels): return
+        keys, last = np.unique(self.sign * levels[::-1, 0], return_index=True); sizes = levels[::-1, 1][last]
+        pos = np.searchsorted(self.keys, keys); hit = pos < len(self.keys); hit[hit] = self.keys[pos[hit]] == keys[hit]
+        self.valid = min(self.valid, int(pos[0]))
+        self.sizes[pos[hit]] = sizes[hit]
+        new = ~hit & (sizes > 0)
+        if new.any(): self.keys, self.sizes = np.insert(self.keys, pos[new], keys[new]), np.insert(self.sizes, pos[new], sizes[new])
+        if (sizes[hit] == 0).any(): keep = self.sizes > 0; self.keys, self.sizes = self.keys[keep], self.sizes[keep]
+        if len(self.cum) != len(self.sizes): cum = np.empty(len(self.sizes)); cum[:self.valid] = self.cum[:self.valid]; self.cum = cum
+
+    def cumulative(self, n):
+        n = min(n, len(self.sizes))
+        if n > self.valid:
+            self.cum[self.valid:n] = (self.cum[self.valid - 1] if self.valid else 0.0) + np.cumsum(self.sizes[self.valid:n]); self.valid = n
+        return self.cum[:n]
+
+    def within(self, prices, through=False):
+        # size resting between the best level and each price: bids at or above it, asks below it (or at it, through)
+        keys = self.sign * np.asarray(prices, dtype='float64')
+        idx = np.searchsorted(self.keys, keys, side='right' if self.sign < 0 or through else 'left')
+        return np.r_[0.0, self.cumulative(int(idx.max()) if len(idx) else 0)][idx]
+
+    def best(self):
+        return self.sign * self.keys[0] if len(self.keys) else np.nan
+
+    def worst(self):
+        return self.sign * self.keys[-1] if len(self.keys) else np.nan
+
+class OrderBook:
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.lock = threading.Lock()
+        self.bids, self.asks = BookSide(-1), BookSide(1)
+        self.update_id = None  # lastUpdateId of the snapshot, then the u of every diff applied
+        self.loaded = False
+        self.pending = []
+        self.step = None  # price bin width, fixed at the first load so heatmap columns line up
+        self.samples = collections.deque(maxlen=DEPTH_HEATMAP_COLUMNS)  # (ms, first bin index, sizes per bin)
+        self.sampled_at = 0
+        self.version = 0
+        self.syncing = False
+        self.synced_at = 0
+
+    def load(self, snapshot):
+        with self.lock:
+            self.bids.load(book_levels(snapshot['bids'])); self.asks.load(book_levels(snapshot['asks']))
+            self.update_id = snapshot.get('nonce'); self.loaded = True
+            pending, self.pending = self.pending, []
+            for diff in pending:
+                if not self._apply(diff): self._reset(diff); break
+            if self.step is None and self.loaded: mid = self.mid(); self.step = price_step(mid * DEPTH_BAND_PCT / 100 / DEPTH_BINS) if mid > 0 else None
+            self._touch()
+        return self.loaded
+
+    def apply(self, diff):
+        # a Binance depthUpdate; False when the book lost its sequence and needs a new snapshot
+        with self.lock:
+            if not self.loaded:
+                if len(self.pending) < DEPTH_PENDING_LIMIT: self.pending.append(diff)
+                return False
+            if not self._apply(diff): self._reset(diff); return False
+            self._touch()
+        return True
+
+    def _apply(self, diff):
+        if self.update_id is None: return False  # a polled snapshot carries no id to continue from
+        if diff['u'] <= self.update_id: return True
+        if diff['U'] > self.update_id + 1: return False
+        self.bids.apply(book_levels(diff['b'])); self.asks.apply(book_levels(diff['a'])); self.update_id = diff['u']
+        return True
+
+    def _reset(self, diff):
+        metrics.inc('order_book_resyncs_total', symbol=self.symbol)
+        self.loaded = False; self.update_id = None; self.pending = [diff]
+
+    def _touch(self):
+        self.version += 1
+        now = time.time()
+        if self.step is not None and len(self.bids.keys) and len(self.asks.keys) and now - self.sampled_at >= DEPTH_SAMPLE_SECONDS:
+            self.sampled_at = now; first, edges = self._grid(); self.samples.append((int(now * 1000), first, self._bins(edges)))
+
+    def mid(self):
+        return (self.bids.best() + self.asks.best()) / 2
+
+    def _grid(self):
+        first = int(np.floor(self.mid() / self.step)) - DEPTH_BINS
+        return first, (first + np.arange(2 * DEPTH_BINS + 1)) * self.step
+
+    def _bins(self, edges):
+        # size per [edges[j], edges[j + 1]) bin, NaN where the book holds no levels that far out
+        bid, ask = self.bids.within(edges), self.asks.within(edges)
+        sizes = (bid[:-1] - bid[1:]) + (ask[1:] - ask[:-1])
+        sizes[(edges[1:] <= self.bids.worst()) | (edges[:-1] >= self.asks.worst())] = np.nan
+        return sizes.astype('float32')
+
+    def view(self, first=None):
+        # the depth curves over the band, and the heatmap columns realigned to the current grid or to `first` (the grid
+        # a chart already shows) while mid stays within half a band of it
+        with self.lock:
+            if not self.loaded or self.step is None or not len(self.bids.keys) or not len(self.asks.keys): return None
+            current, edges = self._grid(); mid = self.mid()
+            if first is None or abs(first - current) > DEPTH_BINS // 2: first = current
+            bid_x = edges[(edges <= mid) & (edges >= self.bids.worst())][::-1]; ask_x = edges[(edges >= mid) & (edges <= self.asks.worst())]
+            bid_x, ask_x = np.r_[self.bids.best(), bid_x], np.r_[self.asks.best(), ask_x]
+            heat = np.full((len(self.samples), 2 * DEPTH_BINS), np.nan, dtype='float32')
+            for i, (_, base, sizes) in enumerate(self.samples):
+                lo, hi = max(base - first, 0), min(base - first + len(sizes), len(sizes))
+                if lo < hi: heat[i, lo:hi] = sizes[lo - (base - first):hi - (base - first)]
+            return {'version': self.version, 'first': first, 'step': self.step, 'mid': mid, 'bids': (bid_x, self.bids.within(bid_x)), 'asks': (ask_x, self.asks.within(ask_x, through=True)),
+                    'times': np.array([t for t, _, _ in self.samples], dtype='int64'), 'heat': heat}
+
+def simulate_order_book(mid, limit, rng=np.random):
+    # levels spread over about 1.5% either side of mid, thicker further out
+    gaps = rng.exponential(mid * 0.015 / limit, (2, limit)); gaps[:, 0] = mid * 5e-5
+    sizes = rng.lognormal(0, 1, (2, limit)) * np.linspace(1, 4, limit) * 50_000 / mid
+    bids, asks = mid - np.cumsum(gaps[0]), mid + np.cumsum(gaps[1])
+    return {'bids': np.column_stack([bids, sizes[0]]).tolist(), 'asks': np.column_stack([asks, sizes[1]]).tolist(), 'nonce': None, 'timestamp': int(time.time() * 1000)}
+
+def fetch_order_book_snapshot(symbol, limit):
+    return (exchange or sim_exchange).fetch_order_book(symbol, limit)
+
+class OrderBooks:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.books = {}
+
+    def reset(self):
+        with self.lock: self.books.clear()
+
+    def get(self, symbol):
+        with self.lock: book = self.books.get(symbol) or self.books.setdefault(symbol, OrderBook(symbol))
+        if market_stream is not None and exchange is not None and not SIMULATE:
+            market_stream.watch([f"{to_stream_id(symbol)}@depth@100ms"], [symbol])
+            if not book.loaded: self.resync(book)
+        else:
+            market_hub.read(('depth', symbol), lambda: book if book.load(fetch_order_book_snapshot(symbol, DEPTH_POLL_LIMIT) or {'bids': [], 'asks': []}) else None, DEPTH_REFRESH_SECONDS)
+        return book
+
+    def on_diff(self, symbol, diff):
+        book = self.books.get(symbol)
+        if book is not None and not book.apply(diff): self.resync(book)
+
+    def resync(self, book):
+        with self.lock:
+            if book.syncing or time.time() - book.synced_at < DEPTH_RESYNC_SECONDS: return
+            book.syncing = True; book.synced_at = time.time()
+        def run():
+            try: book.load(exchange.fetch_order_book(book.symbol, DEPTH_SNAPSHOT_LIMIT))
+            except Exception as e: metrics.error('order_book.snapshot', e)
+            finally: book.syncing = False
+        threading.Thread(target=run, name='order-book-snapshot', daemon=True).start()
+
+order_books = OrderBooks()
+
+# --- ASYNC WARM-UP ---
+# Fans the first fetch for every tracked symbol and chart window out over ccxt.async_support, so a cold
+# worker is ready after the slowest request instead of after the sum of ~60 sequential round trips.
+WARMUP_ENABLED = os.environ.get('WARMUP', '0' if SIMULATE else '1') == '1'  # the warm-up fetches through ccxt.async_support
+WARMUP_CONCURRENCY = int(os.environ.get('WARMUP_CONCURRENCY', 8))
+
+def warmup_windows():
+    # native series to fetch: derived timeframes are covered by their base
+    windows = dict(RESAMPLE_BASE_LIMITS)
+    for preset in TIMEFRAME_PRESETS.values():
+        if resample_source(preset['tf'], preset['limit']) is None: windows[preset['tf']] = max(windows.get(preset['tf'], 0), preset['limit'])
+    for timeframe, limit in (('1d', ANALYTICS_HISTORY), *((name, capacity) for name, (_, capacity) in ROLLUP_RESOLUTIONS.items() if name != '1m')):
+        windows[timeframe] = max(windows.get(timeframe, 0), limit)  # the analysis tab and the market rollup backfill
+    return windows
+
+def async_exchange():
+    import ccxt.async_support as ccxt_async
+    client = getattr(ccxt_async, EXCHANGE_ID)({'options': EXCHANGE_OPTIONS, 'timeout': EXCHANGE_TIMEOUT_MS, 'enableRateLimit': False})
+    if getattr(exchange, 'markets', None): client.set_markets(exchange.markets, exchange.currencies)
+    return client
+
+async def warm_up_async(client, symbols, windows, concurrency):
+    semaphore = asyncio.Semaphore(concurrency); bucket = getattr(exchange, 'bucket', None)
+
+    async def limited(method, *args, **kwargs):
+        async with semaphore:
+            while bucket is not None and not bucket.acquire(request_weight(method, args, kwargs), 0): await asyncio.sleep(0.05)
+            with metrics.timer('exchange_call_seconds', f'exchange.{method}', method=method): return await getattr(client, method)(*args, **kwargs)
+
+    async def ohlcv(symbol, timeframe, limit):
+        series = candle_store.series(symbol, timeframe); series.want(limit)
+        if series.load_cached(): return
+        pages = await asyncio.gather(*[limited('fetch_ohlcv', symbol, timeframe, since=since, limit=page) for since, page in ohlcv_pages(timeframe, limit)])
+        series.backfill([row for page in pages for row in page], limit)
+
+    async def tickers():
+        all_tickers = await limited('fetch_tickers')
+        market_hub.seed(('market',), load_market_data, MARKET_REFRESH_SECONDS, fetch_market_data(all_tickers))
+        market_hub.seed(('tickers',), fetch_tracker_tickers, TICKER_REFRESH_SECONDS, {s: all_tickers[s] for s in TRACKER_SYMBOLS if s in all_tickers} or None)
+
+    try: results = await asyncio.gather(tickers(), *[ohlcv(s, tf, limit) for s in symbols for tf, limit in windows.items()], return_exceptions=True)
+    finally: await client.close()
+    for result in results:
+        if isinstance(result, Exception): metrics.error('warm_up', result)
+    return results
+
+def warm_up(symbols=TRACKER_SYMBOLS, windows=None, client=None, concurrency=WARMUP_CONCURRENCY):
+    started = time.perf_counter()
+    try: asyncio.run(warm_up_async(client or async_exchange(), symbols, windows or warmup_windows(), concurrency))
+    except Exception as e: metrics.error('warm_up', e)
+    metrics.observe('warm_up_seconds', time.perf_counter() - started, buckets=(0.5, 1, 2.5, 5, 10, 30, 60))
+
+# --- ALERTS ---
+# An alert fires when its metric crosses the threshold between two consecutive updates of a symbol. Thresholds live in
+# one sorted array per (symbol, metric, direction), so an update finds everything it crossed with two binary searches
+# however many alerts exist. Workers share alerts through an append-only log of add/remove/fire records that each one
+# tails; a crossing is written under the log's flock, so only the first worker to see it fires the alert.
+ALERT_METRICS = {'price': 'Price (₹)', 'change_24h': 'Change 24h (%)', 'RSI': 'RSI 14 (1d)', 'Puell': 'Puell Multiple (1d)'}
+ALERT_INDICATORS = ('RSI', 'Puell')
+ALERT_TICK_SECONDS = 1
+ALERT_INDICATOR_SECONDS = 60
+ALERT_FIRED_KEEP = 200
+
+class AlertBook(BackgroundThread):
+    thread_name = 'alerts'
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, 'alerts.log')
+        self.lock = threading.RLock()
+        self.alerts = {}  # id -> add record
+        self.thresholds = collections.defaultdict(dict)  # (symbol, metric, direction) -> {id: threshold}
+        self.index = {}  # (symbol, metric, direction) -> (sorted thresholds, ids in the same order)
+        self.dirty = set()
+        self.last = {}  # (symbol, metric) -> value at the previous update
+        self.fired = collections.deque(maxlen=ALERT_FIRED_KEEP)
+        self.offset = 0
+        self.snapshot = None
+        self.indicators_at = 0
+        self.thread = None
+        self.pid = None
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock, open(self.path, 'a') as f:
+            if fcntl is not None: fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._sync()
+                yield f
+            finally:
+                if fcntl is not None: fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self):
+        # apply what other workers appended since the last read
+        with self.lock:
+            try: size = os.path.getsize(self.path)
+            except OSError: return
+            if size <= self.offset: return
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset); data = f.read(size - self.offset)
+            end = data.rfind(b'\n') + 1  # a record still being written is picked up next time
+            for line in data[:end].splitlines():
+                try: self._apply(json.loads(line))
+                except (ValueError, KeyError): continue
+            self.offset += end
+
+    def _apply(self, record):
+        alert = record if record['op'] == 'add' else self.alerts.pop(record['id'], None)
+        if alert is None: return
+        key = (alert['symbol'], alert['metric'], alert['direction'])
+        if record['op'] == 'add':
+            self.alerts[alert['id']] = alert; self.thresholds[key][alert['id']] = alert['threshold']; self.dirty.add(key)
+            return
+        self.thresholds[key].pop(alert['id'], None)  # the sorted index keeps the id until the next add re-sorts; crossed() skips it
+        if record['op'] == 'fire': self.fired.appendleft(dict(alert, value=record['value'], fired_at=record['at']))
+
+    def reset(self):
+        # the next update of each symbol starts a new baseline instead of crossing from the previous market's value
+        with self.lock: self.last.clear(); self.snapshot = None; self.indicators_at = 0
+
+    def _write(self, f, records):
+        f.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records)); f.flush()
+        for record in records: self._apply(record)
+        self.offset = os.fstat(f.fileno()).st_size
+
+    def add(self, specs):
+        # specs: dicts with symbol, metric, direction ('above' or 'below') and threshold
+        records = [{'op': 'add', 'id': uuid.uuid4().hex[:12], 'symbol': s['symbol'], 'metric': s['metric'], 'direction': s['direction'], 'threshold': float(s['threshold']), 'at': time.time()} for s in specs]
+        with self._locked() as f: self._write(f, records)
+        self._ensure_running()
+        return [r['id'] for r in records]
+
+    def remove(self, ids):
+        with self._locked() as f: self._write(f, [{'op': 'remove', 'id': i, 'at': time.time()} for i in ids if i in self.alerts])
+
+    def _sorted(self, key):
+        if key in self.dirty:
+            entries = self.thresholds.get(key, {}); thresholds = np.fromiter(entries.values(), dtype='float64', count=len(entries)); order = np.argsort(thresholds, kind='stable')
+            self.index[key] = (thresholds[order], np.array(list(entries), dtype=object)[order]); self.dirty.discard(key)
+        return self.index.get(key)
+
+    def crossed(self, symbol, metric, value):
+        # ids of the alerts between the previous value and this one; the first value seen only sets the baseline
+        previous = self.last.get((symbol, metric)); self.last[(symbol, metric)] = value
+        if previous is None or value == previous or np.isnan(value) or np.isnan(previous): return ()
+        entry = self._sorted((symbol, metric, 'above' if value > previous else 'below'))
+        if entry is None or not len(entry[0]): return ()
+        if value > previous: lo, hi = np.searchsorted(entry[0], [previous, value], side='right')  # previous < t <= value
+        else: lo, hi = np.searchsorted(entry[0], [value, previous], side='left')  # value <= t < previous
+        return [i for i in entry[1][lo:hi] if i in self.alerts]
+
+    def update(self, metric, symbols, values):
+        with self.lock:
+            hits = {alert_id: float(value) for symbol, value in zip(symbols, values) for alert_id in self.crossed(symbol, metric, float(value))}
+        if not hits: return []
+        with self._locked() as f:
+            records = [{'op': 'fire', 'id': i, 'value': v, 'at': time.time()} for i, v in hits.items() if i in self.alerts]  # another worker may have fired it first
+            for record in records: metrics.inc('alerts_fired_total', metric=self.alerts[record['id']]['metric'])
+            if records: self._write(f, records)
+        return records
+
+    def _run(self):
+        while True:
+            started = time.time()
+            try:
+                with metrics.timer('alert_pass_seconds', 'alerts'): self._pass()
+            except Exception: pass  # counted by the timer; the next pass retries
+            time.sleep(max(ALERT_TICK_SECONDS - (time.time() - started), 0))
+
+    def _pass(self):
+        with self.lock:
+            self._sync()
+            watched = {key[0] for key, entries in self.thresholds.items() if entries}
+            indicator_symbols = {key[0] for key, entries in self.thresholds.items() if entries and key[1] in ALERT_INDICATORS}
+        if not watched: return
+        tickers = {s: t for s, t in market_hub.tickers().items() if s in watched}  # tracked pairs tick faster than the top-100 table
+        if tickers:
+            self.update('price', list(tickers), [t['last'] * USD_TO_INR_RATE for t in tickers.values()]); self.update('change_24h', list(tickers), [t['percentage'] for t in tickers.values()])
+        snapshot = market_hub.market()
+        if snapshot is not None and snapshot is not self.snapshot:
+            self.snapshot = snapshot; frame = snapshot.frame[~snapshot.frame.index.isin(list(tickers))]
+            for metric in ('price', 'change_24h'): self.update(metric, frame.index, frame[metric].to_numpy())
+        if indicator_symbols and time.time() - self.indicators_at > ALERT_INDICATOR_SECONDS:
+            self.indicators_at = time.time()
+            for symbol in indicator_symbols:
+                df = market_hub.cycle_indicators(symbol, '1d', ANALYTICS_HISTORY)[0]
+                if df is not None:
+                    for metric in ALERT_INDICATORS: self.update(metric, [symbol], [df[metric].iloc[-1]])
+
+    def view(self, limit=50):
+        with self.lock:
+            self._sync()
+            return list(self.alerts.values())[-limit:][::-1], list(self.fired)[:limit], len(self.alerts)
+
+alert_book = AlertBook(ALERTS_DIR)
+
+# --- FIGURE DELTAS ---
+# Each chart's browser-side state (data key, first/last timestamp, point count, last-row values) lives in a dcc.Store.
+# Unchanged charts get no_update; a ticking or newly closed candle becomes a Patch that rewrites the previous last
+# point, appends the new ones and trims the front, so a tick ships a handful of numbers instead of the whole figure.
+DELTA_MAX_ROWS = 50
+
+def timestamps_ms(ts):
+    return pd.DatetimeIndex(ts).as_unit('ms').asi8
+
+def plot_values(values):
+    if isinstance(values.dtype, pd.DatetimeTZDtype): return values.dt.strftime('%Y-%m-%dT%H:%M:%S').tolist()  # same wall-clock form plotly emits
+    values = values.to_numpy(dtype='float64')
+    return np.where(np.isnan(values), None, values).tolist()
+
+def figure_update(previous, key, ts, traces, build):
+    # traces: one {plotly attribute: Series aligned with ts} per figure trace, in figure order. Full figures carry the
+    # data as plain lists (numpy-backed figures serialize as typed arrays, which a Patch cannot extend), filled in after
+    # build() so plotly does not validate thousands of list items.
+    ts = timestamps_ms(ts)
+    def full():
+        metrics.inc('figure_updates_total', kind='full')
+        fig = build([{attr: [] for attr in trace} for trace in traces]).to_dict()
+        converted = {}
+        for i, trace in enumerate(traces):
+            for attr, col in trace.items():
+                if id(col) not in converted: converted[id(col)] = plot_values(col)
+                fig['data'][i][attr] = converted[id(col)]
+        return fig
+    if not len(ts): return full(), None
+    tail = [plot_values(col.iloc[-1:])[0] for trace in traces for attr, col in trace.items() if attr != 'x']
+    state = {'key': key, 'first': int(ts[0]), 'last': int(ts[-1]), 'n': len(ts), 'tail': tail}
+    if not previous or previous.get('key') != key: return full(), state
+    j = int(np.searchsorted(ts, previous['last']))
+    dropped, added = previous['n'] - 1 - j, len(ts) - 1 - j
+    if j >= len(ts) or ts[j] != previous['last'] or not 0 <= dropped <= DELTA_MAX_ROWS or added > DELTA_MAX_ROWS: return full(), state
+    if not dropped and not added and previous['tail'] == tail:
+        metrics.inc('figure_updates_total', kind='unchanged')
+        return no_update, state
+    patch = Patch()
+    for i, trace in enumerate(traces):
+        for attr, col in trace.items():
+            values = plot_values(col.iloc[j:])
+            target = patch['data'][i][attr]
+            if attr != 'x': target[previous['n'] - 1] = values[0]
+            if added: target.extend(values[1:])
+            for _ in range(dropped): del target[0]
+            if dropped and attr != 'x':
+                # rolling columns keep a fixed NaN head; blank the points that slid into it
+                lead = int(col.notna().to_numpy().argmax()) if col.notna().any() else 0
+                for p in range(max(lead - dropped, 0), lead): target[p] = None
+    metrics.inc('figure_updates_total', kind='patch')
+    return patch, state
+
+# --- DOWNSAMPLING ---
+# Long series are cut to what a chart can show: one point per DOWNSAMPLE_PX pixels of the graph width the browser
+# reports into chart-widths. Lines keep the point of each bucket that spans the largest triangle with its neighbour
+# buckets' means (LTTB anchored on means, so a pick depends only on adjacent buckets); bars and candles keep each
+# bucket's low and high. Buckets are anchored to absolute time and a partial leading bucket is skipped, so a tick only
+# changes the last buckets and figure_update can keep patching while their picks stay put. A zoom (relayoutData) re-samples just the visible window.
+DOWNSAMPLE_PX = 2
+DOWNSAMPLE_DEFAULT_WIDTH = 1000
+DOWNSAMPLE_MIN_POINTS = 100
+
+def point_budget(widths, graph_id):
+    width = (widths or {}).get(graph_id) or DOWNSAMPLE_DEFAULT_WIDTH
+    return max(int(width // DOWNSAMPLE_PX) // 50 * 50, DOWNSAMPLE_MIN_POINTS)  # rounded so small resizes keep the bucketing
+
+def view_window(relayout):
+    # the x range of the last zoom/pan as ms, or None when the chart shows everything
+    relayout = relayout or {}
+    bounds = relayout.get('xaxis.range') or [relayout.get('xaxis.range[0]'), relayout.get('xaxis.range[1]')]
+    if relayout.get('xaxis.autorange') or None in bounds: return None
+    try: return tuple(int(pd.Timestamp(b).tz_localize('Asia/Kolkata').value // 1_000_000) for b in bounds)  # axes show IST wall-clock time
+    except (ValueError, TypeError): return None
+
+def segment_argmax(values, starts, stop):
+    # absolute position of the first maximum of values[starts[i]:starts[i + 1]] for each bucket, NaN never wins
+    offset = starts[0]; values = np.where(np.isnan(values[offset:stop]), -np.inf, values[offset:stop]); rel = starts - offset
+    seg = np.repeat(np.arange(len(rel)), np.diff(np.r_[rel, len(values)]))
+    hits = np.flatnonzero(values == np.maximum.reduceat(values, rel)[seg])
+    return offset + hits[np.unique(seg[hits], return_index=True)[1]]
+
+def downsample(ts, budget, view=None, line=None, low=None, high=None):
+    """Row positions to plot out of ts (ascending ms) and the part of the chart key that names the bucketing. Pass
+    line for an LTTB pick, or low/high for a min/max pick. Global extremes are always kept."""
+    lo, hi = 0, len(ts)
+    if view is not None:
+        margin = (view[1] - view[0]) // 2  # half a screen either side so a pan has data before the re-sample lands
+        lo, hi = (int(i) for i in np.searchsorted(ts, [view[0] - margin, view[1] + margin], side='right')); lo = max(lo - 1, 0); budget *= 2
+    key = list(view or ())
+    ratio = -(-(hi - lo) // budget)
+    if ratio <= 1 or hi - lo < 3: return np.arange(lo, hi), [0, *key]
+    step = int(np.min(np.diff(ts[lo:hi]))); width = ratio * max(step, 1); bucket = ts[lo:hi] // width
+    starts = lo + np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    if view is None and ts[lo] % width and len(starts) > 2: starts = starts[1:]  # trimming old rows drops whole buckets
+    if line is not None:
+        x = ts.astype('float64'); y = np.asarray(line, dtype='float64'); y_filled = np.where(np.isnan(y), np.nanmean(y[lo:hi]) if np.isfinite(y[lo:hi]).any() else 0, y)
+        counts = np.diff(np.r_[starts, hi]); mx = np.add.reduceat(x[starts[0]:hi], starts - starts[0]) / counts; my = np.add.reduceat(y_filled[starts[0]:hi], starts - starts[0]) / counts
+        ax, ay = np.r_[x[starts[0]], mx[:-1]], np.r_[y_filled[starts[0]], my[:-1]]; cx, cy = np.r_[mx[1:], x[hi - 1]], np.r_[my[1:], y_filled[hi - 1]]
+        seg = np.repeat(np.arange(len(starts)), counts); area = np.full(len(ts), np.nan)
+        area[starts[0]:hi] = np.abs((ax[seg] - cx[seg]) * (y[starts[0]:hi] - ay[seg]) - (ax[seg] - x[starts[0]:hi]) * (cy[seg] - ay[seg]))
+        picks = [segment_argmax(area, starts, hi)]; extremes = [lo + int(np.nanargmax(y[lo:hi])), lo + int(np.nanargmin(y[lo:hi]))] if np.isfinite(y[lo:hi]).any() else []
+    else:
+        low, high = np.asarray(low, dtype='float64'), np.asarray(high, dtype='float64')
+        picks = [segment_argmax(-low, starts, hi), segment_argmax(high, starts, hi)]; extremes = [lo + int(np.nanargmin(low[lo:hi])), lo + int(np.nanargmax(high[lo:hi]))]
+    rows = np.unique(np.r_[np.concatenate(picks), extremes, hi - 1]).astype('int64')
+    # a tick moves the picks of the last bucket (and, through its mean, the one before for lines), which a patch of the
+    # last point cannot follow; with their times in the key a moved pick sends a full figure
+    trailing = [int(ts[i]) for p in picks for i in p[-2 if line is not None else -1:] if i != hi - 1]
+    return rows, [int(width), *key, *(int(ts[i]) for i in extremes), *trailing]  # a new extreme, pick or bucketing means a full figure
+
+# --- PANEL SCHEDULING ---
+# each panel polls on its own interval, and only while its tab is the one on screen; with live push on, the live
+# candle, price and screener prices arrive over /push and polling only resyncs those panels
+PUSH_ENABLED = os.environ.get('LIVE_PUSH', '1') == '1'  # needs threaded workers (gunicorn.conf.py): each viewer holds a /push request open
+PANEL_INTERVALS = {'interval-component': 30000 if PUSH_ENABLED else 2000, 'analytics-interval': 30000, 'rwa-interval': 30000, 'global-interval': 300000, 'market-interval': 60000 if PUSH_ENABLED else 10000, 'news-interval': 120000, 'alerts-interval': 5000, 'depth-interval': 1000}
+TAB_INTERVALS = {'overview': ['interval-component', 'depth-interval'], 'analysis': ['analytics-interval'], 'rwa': ['rwa-interval'], 'global': ['global-interval'], 'screeners': ['market-interval'], 'dexscan': ['market-interval'], 'trending': ['market-interval'], 'news': ['news-interval'], 'alerts': ['alerts-interval']}
+
+def require_tab(active_tab, *tabs):
+    if active_tab not in tabs: raise PreventUpdate
+
+# pure UI state lives in the browser: shipped once with the dashboard layout and read by the clientside callbacks
+CHART_INTERVALS = {label: PANEL_INTERVALS['interval-component'] if label == 'LIVE' else 60000 for label in TIMEFRAME_PRESETS}
+UI_CONFIG = {'presets': TIMEFRAME_PRESETS, 'chart_intervals': CHART_INTERVALS, 'tabs': TAB_INTERVALS, 'intervals': list(PANEL_INTERVALS), 'push': PUSH_ENABLED}
 
 # --- APP INITIALIZATION ---
 app = Dash(__name__, title="Crypto Master", suppress_callback_exceptions=True)
 server = app.server  # REQUIRED FOR CLOUD DEPLOYMENT
 
+@server.after_request
+def record_response_bytes(response):
+    if response.is_streamed: return response  # measuring would drain the stream
+    size = response.calculate_content_length()
+    if size is not None: metrics.observe('http_response_bytes', size, buckets=BYTE_BUCKETS, endpoint=g.get('callback') or request.endpoint or 'unknown')
+    return response
+
+# --- RESPONSE ENCODING ---
+# Callback responses are encoded with orjson straight from the component tree: plotly's orjson path first fails on the
+# components, then walks the whole tree in Python to clean it. Text responses are gzip/brotli compressed when the
+# client accepts it; the component bundles are immutable per release, so each is compressed once per worker.
+try: import orjson
+except ImportError: orjson = None
+try: import brotli
+except ImportError: brotli = None
+
+COMPRESS_MIN_BYTES = 500
+COMPRESS_MIMETYPES = {'application/json', 'text/html', 'application/javascript', 'text/javascript', 'text/css'}
+COMPRESS_LEVELS = {'br': 5, 'gzip': 6}  # per request
+COMPRESS_STATIC_LEVELS = {'br': 9, 'gzip': 9}  # once per bundle
+COMPRESS_STATIC_ENTRIES = 64
+compressed_static = collections.OrderedDict()
+
+def json_default(value):
+    # what orjson cannot encode natively, as plotly's encoder would convert it
+    if hasattr(value, 'to_plotly_json'): return value.to_plotly_json()
+    if isinstance(value, (pd.Series, pd.Index)): value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'biuf': return np.ascontiguousarray(value)
+        return np.datetime_as_string(value).tolist() if value.dtype.kind == 'M' else value.tolist()
+    if isinstance(value, pd.Timestamp): return value.to_pydatetime()
+    if value is pd.NaT or value is pd.NA: return None
+    if hasattr(value, 'tolist'): return value.tolist()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def encode_json(value):
+    return orjson.dumps(value, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+if orjson is not None:
+    import dash._callback
+    dash._callback.to_json = encode_json  # Dash has no serializer hook; responses go through this name
+
+def compress(data, encoding, levels):
+    return brotli.compress(data, quality=levels['br']) if encoding == 'br' else gzip.compress(data, compresslevel=levels['gzip'])
+
+@server.after_request
+def compress_response(response):
+    # registered after record_response_bytes, so it runs first and the metric sees the bytes on the wire
+    if response.is_streamed or response.direct_passthrough or response.status_code != 200 or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESS_MIMETYPES: return response
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+    response.vary.add('Accept-Encoding')
+    if encoding is None or response.calculate_content_length() < COMPRESS_MIN_BYTES: return response
+    if request.path.startswith('/_dash-component-suites/'):
+        key = (request.full_path, encoding); data = compressed_static.get(key)
+        if data is None:
+            data = compressed_static[key] = compress(response.get_data(), encoding, COMPRESS_STATIC_LEVELS)
+            while len(compressed_static) > COMPRESS_STATIC_ENTRIES: compressed_static.popitem(last=False)
+    else: data = compress(response.get_data(), encoding, COMPRESS_LEVELS)
+    response.set_data(data); response.headers['Content-Encoding'] = encoding
+    return response
+
+@server.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# --- LIVE PUSH ---
+# /push is a server-sent event stream. A browser subscribes to the topics it has on screen: 'ticker:<symbol>',
+# 'candles:<symbol>:<timeframe>' and 'market'. One publisher per process watches the hub snapshots, encodes each
+# change once and hands the same bytes to every subscriber of the topic, so work follows market updates, not viewers.
+PUSH_TICK_SECONDS = 0.5
+PUSH_HEARTBEAT_SECONDS = 15
+PUSH_QUEUE_SIZE = 32  # a subscriber this far behind is dropped; its EventSource reconnects and gets the latest state
+PUSH_MAX_SUBSCRIBERS = int(os.environ.get('PUSH_MAX_SUBSCRIBERS', 1000))
+PUSH_CANDLE_LIMITS = {preset['tf']: preset['limit'] for preset in TIMEFRAME_PRESETS.values()}
+CHART_SMA_WINDOW = 5
+
+def push_event(kind, payload):
+    return f"event: {kind}\ndata: {json.dumps(payload, separators=(',', ':'), ensure_ascii=False)}\n\n".encode()
+
+class PushSubscriber:
+    def __init__(self, topics):
+        self.topics = topics
+        self.queue = queue.Queue(PUSH_QUEUE_SIZE)
+        self.closed = False
+
+    def send(self, event):
+        try: self.queue.put_nowait(event)
+        except queue.Full: self.closed = True
+
+class PushBroker(BackgroundThread):
+    thread_name = 'live-push'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}  # topic -> set of PushSubscriber
+        self.state = {}  # topic -> what was last published and the event a new subscriber starts from
+        self.count = 0
+        self.thread = None
+        self.pid = None
+
+    @staticmethod
+    def valid(topic):
+        kind, _, rest = topic.partition(':')
+        if kind == 'ticker': return rest in SYMBOL_MAP
+        if kind == 'candles': symbol, _, timeframe = rest.rpartition(':'); return symbol in SYMBOL_MAP and timeframe in PUSH_CANDLE_LIMITS
+        return topic == 'market'
+
+    def subscribe(self, topics):
+        self._ensure_running()
+        subscriber = PushSubscriber(topics)
+        with self.lock:
+            if self.count >= PUSH_MAX_SUBSCRIBERS: return None
+            self.count += 1
+            for topic in topics:
+                self.subscribers.setdefault(topic, set()).add(subscriber)
+                replay = self.state.get(topic, {}).get('replay')
+                if replay: subscriber.send(replay)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.count -= 1
+            for topic in subscriber.topics:
+                subscribers = self.subscribers.get(topic, set()); subscribers.discard(subscriber)
+                if not subscribers: self.subscribers.pop(topic, None); self.state.pop(topic, None)
+
+    def _run(self):
+        while True:
+            started = time.time()
+            with self.lock: topics = list(self.subscribers)
+            tickers = None
+            for topic in topics:
+                kind, _, rest = topic.partition(':'); state = self.state.get(topic, {})
+                try:
+                    if kind == 'ticker':
+                        if tickers is None: tickers = market_hub.tickers()
+                        update = self._ticker(topic, rest, tickers, state)
+                    elif kind == 'candles': update = self._candles(topic, *rest.rsplit(':', 1), state)
+                    else: update = self._market(topic, state)
+                except Exception as e:
+                    metrics.error('push', e)
+                    continue
+                if update is not None: self._publish(topic, kind, *update)
+            time.sleep(max(PUSH_TICK_SECONDS - (time.time() - started), 0))
+
+    def _publish(self, topic, kind, event, state):
+        with self.lock:
+            subscribers = self.subscribers.get(topic)
+            if not subscribers: return
+            self.state[topic] = state
+            for subscriber in subscribers: subscriber.send(event)
+        metrics.inc('push_events_total', kind=kind); metrics.inc('push_deliveries_total', len(subscribers), kind=kind)
+
+    def _ticker(self, topic, symbol, tickers, state):
+        ticker = tickers.get(symbol)
+        if not ticker or state.get('seen') == (ticker['last'], ticker['percentage']): return None
+        color = '#00CC96' if ticker['percentage'] >= 0 else '#FF4136'
+        event = push_event('ticker', {'topic': topic, 'price': format_currency(ticker['last'] * USD_TO_INR_RATE), 'color': color})
+        return event, {'seen': (ticker['last'], ticker['percentage']), 'replay': event}
+
+    def _candles(self, topic, symbol, timeframe, state):
+        # ships the candles from the last published open one onwards, with the chart's trend line at those points
+        limit = PUSH_CANDLE_LIMITS[timeframe]; series = market_hub.series(symbol, timeframe, limit)
+        with series.lock:
+            if not series.size or state.get('seen') == series.version: return None
+            size, version = series.size, series.version
+            start = int(np.searchsorted(series.ts[:size], state.get('since', series.ts[size - 1])))
+            lead = max(start - CHART_SMA_WINDOW + 1, 0); ts = series.ts[start:size].copy(); values = series.values[lead:size].copy()
+        close = values[:, 3]; sma = np.convolve(close, np.ones(CHART_SMA_WINDOW) / CHART_SMA_WINDOW, mode='full')[:len(close)]
+        sma[:CHART_SMA_WINDOW - 1] = np.nan; values, sma = values[start - lead:], sma[start - lead:]
+        x = pd.to_datetime(ts, unit='ms', utc=True).tz_convert('Asia/Kolkata').strftime('%Y-%m-%dT%H:%M:%S').tolist()
+        payload = {'topic': topic, 'limit': limit, 'x': x, **{name: values[:, i].tolist() for i, name in enumerate(OHLCV_COLUMNS[1:5])}, 'sma': np.where(np.isnan(sma), None, sma).tolist()}
+        event = push_event('candles', payload)
+        return event, {'seen': version, 'since': int(ts[-1]), 'replay': event}
+
+    def _market(self, topic, state):
+        # screener price and 24h change cells, sent only for the symbols whose text changed
+        snapshot = market_hub.market()
+        if snapshot is None or snapshot is state.get('seen'): return None
+        frame = snapshot.frame; change = frame['change_24h'].to_numpy()
+        cells = {s: [format_currency(p), f'{c:.2f}%', bool(c >= 0)] for s, p, c in zip(frame.index, frame['price'].to_numpy(), change)}
+        previous = state.get('cells', {}); changed = {s: v for s, v in cells.items() if previous.get(s) != v}
+        return push_event('market', {'topic': topic, 'cells': changed}), {'seen': snapshot, 'cells': cells, 'replay': push_event('market', {'topic': topic, 'cells': cells})}
+
+push_broker = PushBroker()
+
+@server.route('/push')
+def push_stream():
+    topics = sorted({t for t in request.args.getlist('topic') if PushBroker.valid(t)})
+    if not PUSH_ENABLED or not topics: return Response('no valid topics\n', status=400, mimetype='text/plain')
+    subscriber = push_broker.subscribe(topics)
+    if subscriber is None: return Response('too many subscribers\n', status=503, mimetype='text/plain', headers={'Retry-After': '30'})
+    def stream():
+        try:
+            yield f'retry: {3000 + random.randint(0, 2000)}\n\n'.encode()
+            while not subscriber.closed:
+                try: yield subscriber.queue.get(timeout=PUSH_HEARTBEAT_SECONDS)
+                except queue.Empty: yield b': ping\n\n'
+        finally: push_broker.unsubscribe(subscriber)
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # --- CSS ---
 app.index_string = '''
 <!DOCTYPE html>
@@ -270,6 +2223,10 @@ app.index_string = '''
             .custom-tab--selected { color: var(--accent-gold) !important; border-bottom: 2px solid var(--accent-gold) !important; font-weight: 600; background: linear-gradient(180deg, rgba(255, 215, 0, 0) 0%, rgba(255, 215, 0, 0.05) 100%) !important; }
             .chart-wrapper, .metrics-container, .bottom-bar-chart, .analytics-card, .trending-card, .news-card, .spot-card, .rwa-card, .presale-card, .dex-card { background: var(--glass-bg); backdrop-filter: blur(10px); border: 1px solid var(--glass-border); border-radius: 12px; box-shadow: 0 4px 24px -1px rgba(0,0,0,0.2); transition: transform 0.2s ease, box-shadow 0.2s ease, border-color 0.2s ease; }
             .news-card:hover, .presale-card:hover, .dex-card:hover { transform: translateY(-4px); box-shadow: 0 10px 30px -5px rgba(0,0,0,0.4); border-color: var(--accent-gold); }
+            .card-title { display: flex; justify-content: space-between; margin-bottom: 15px; font-weight: bold; }
+            .card-subtitle, .stat-label { color: #888; font-size: 0.8rem; }
+            .big-stat { font-size: 2.5rem; font-weight: bold; margin: 10px 0; }
+            .meter-labels { display: flex; justify-content: space-between; color: #888; font-size: 0.8rem; }
             .control-panel { margin: 0 auto 20px auto; text-align: center; width: 100%; max-width: 400px; }
             .control-bar-container { display: flex; justify-content: space-between; align-items: center; background-color: rgba(255,255,255,0.02); padding: 12px 20px; border-radius: 12px 12px 0 0; border-bottom: 1px solid var(--glass-border); }
             .btn-group { display: flex; background-color: #0b0e11; border-radius: 8px; padding: 4px; gap: 4px; border: 1px solid #222; }
@@ -289,6 +2246,14 @@ app.index_string = '''
             .crypto-table tr:hover td { background-color: rgba(255,255,255,0.03); }
             .coin-cell { display: flex; align-items: center; gap: 12px; }
             .coin-icon { width: 32px; height: 32px; border-radius: 50%; box-shadow: 0 2px 5px rgba(0,0,0,0.3); }
+            .coin-name { font-weight: 600; }
+            .coin-symbol { font-size: 0.75rem; color: #888; }
+            .crypto-table .rank-cell { color: #666; }
+            .crypto-table .type-cell { color: #aaa; font-size: 0.85rem; }
+            .crypto-table .price-cell { font-weight: 600; font-family: monospace; }
+            .crypto-table .cap-cell { color: #ccc; }
+            .crypto-table .spark-cell { padding: 0; }
+            .spark-cell img { display: block; }
             .positive { color: var(--accent-green); font-weight: 600; text-shadow: 0 0 10px rgba(0, 204, 150, 0.2); }
             .negative { color: var(--accent-red); font-weight: 600; text-shadow: 0 0 10px rgba(255, 65, 54, 0.2); }
             .flex-container { display: flex; gap: 24px; padding: 0 24px; }
@@ -302,8 +2267,9 @@ app.index_string = '''
             .page-btn:hover:not(:disabled) { background: #e6c200; transform: translateY(-2px); }
             .page-btn:disabled { background: #333; color: #666; box-shadow: none; cursor: default; }
             .metric-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 12px; }
-            .analytics-grid, .spot-grid, .rwa-grid { display: grid; gap: 24px; padding: 24px; }
+            .analytics-grid, .spot-grid, .rwa-grid, .depth-grid { display: grid; gap: 24px; padding: 24px; }
             .analytics-grid { grid-template-columns: 2fr 1fr; }
+            .depth-grid { grid-template-columns: 1fr 1fr; padding-top: 0; }
             .spot-grid { grid-template-columns: 2fr 1fr; }
             .rwa-grid { grid-template-columns: 2fr 1fr 1fr; }
             .news-grid, .presale-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 24px; padding: 24px; }
@@ -314,11 +2280,25 @@ app.index_string = '''
             .dex-scroll-container { display: flex; gap: 20px; overflow-x: auto; padding: 10px 20px 20px 20px; }
             .dex-card { min-width: 340px; background: #151a1e; padding: 20px; }
             .dex-row { padding: 10px 0; border-bottom: 1px solid rgba(255,255,255,0.05); }
+            .dex-header { display: flex; justify-content: space-between; margin-bottom: 15px; color: #fff; font-weight: bold; }
+            .dex-more { color: #666; font-size: 0.9rem; }
             .trending-wrapper { display: flex; gap: 24px; padding: 24px; flex-wrap: wrap; }
             .trending-card { flex: 1; min-width: 350px; padding: 24px; }
+            .trending-header { font-weight: bold; margin-bottom: 20px; }
+            .trending-row { display: flex; justify-content: space-between; padding: 12px 0; border-bottom: 1px solid #222; }
+            .trending-rank { color: #666; width: 20px; }
+            .trending-name, .trending-change-up, .trending-change-down { font-weight: bold; }
+            .trending-price { font-size: 0.85rem; }
+            .trending-change-up { color: #00CC96; }
+            .trending-change-down { color: #FF4136; }
             .news-img { width: 100%; height: 180px; object-fit: cover; opacity: 0.9; transition: opacity 0.3s; }
             .news-card:hover .news-img { opacity: 1; }
             .news-content { padding: 20px; }
+            .news-source { background-color: #2962ff; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.7rem; }
+            .news-title { font-size: 1.1rem; font-weight: bold; margin: 10px 0; line-height: 1.4; }
+            .news-desc { color: #aaa; font-size: 0.9rem; }
+            .news-footer { display: flex; justify-content: space-between; color: #666; font-size: 0.8rem; margin-top: 15px; }
+            .news-footer a { color: #00CC96; text-decoration: none; }
             .presale-btn { width: 100%; background: linear-gradient(90deg, #FFD700, #FFA500); border: none; color: #000; padding: 12px; border-radius: 8px; font-weight: 700; cursor: pointer; transition: 0.3s; margin-top: 10px; text-transform: uppercase; letter-spacing: 1px; }
             .presale-btn:hover { opacity: 0.9; box-shadow: 0 0 15px rgba(255, 215, 0, 0.5); }
             footer { padding: 20px; text-align: center; color: #444; font-size: 0.8rem; }
@@ -330,6 +2310,60 @@ app.index_string = '''
             {%config%}
             {%scripts%}
             {%renderer%}
+            <script>
+                // one EventSource for the /push topics on screen; updates are applied straight to the page
+                window.livePush = (() => {
+                    let source = null, key = '';
+                    const state = {topics: []};
+                    const prefix = () => { const el = document.getElementById('_dash-config'); return (el && JSON.parse(el.textContent).requests_pathname_prefix) || '/'; };
+                    const copy = (trace, attrs) => { const t = Object.assign({}, trace); attrs.forEach(a => { t[a] = Array.from(trace[a]); }); return t; };
+                    const candles = d => {
+                        const el = document.getElementById('live-candlestick-chart'), gd = el && el.querySelector('.js-plotly-plot');
+                        if (!window.Plotly || !gd || !gd.data || gd.data.length < 2 || !gd.layout.meta || gd.layout.meta.topic !== d.topic) return;
+                        // new arrays, so the figure Dash holds (and later patches) stays what the server last sent
+                        const ohlc = ['x', 'open', 'high', 'low', 'close'], c = copy(gd.data[0], ohlc), t = copy(gd.data[1], ['x', 'y']);
+                        d.x.forEach((x, i) => {
+                            const n = c.x.length;
+                            if (n && x < c.x[n - 1]) return;
+                            const at = n && x === c.x[n - 1] ? n - 1 : n;
+                            c.x[at] = t.x[at] = x; c.open[at] = d.open[i]; c.high[at] = d.high[i]; c.low[at] = d.low[i]; c.close[at] = d.close[i]; t.y[at] = d.sma[i];
+                        });
+                        while (c.x.length > d.limit) { ohlc.forEach(a => c[a].shift()); t.x.shift(); t.y.shift(); }
+                        Plotly.react(gd, [c, t, ...gd.data.slice(2)], gd.layout);
+                    };
+                    const ticker = d => {
+                        const el = document.getElementById('live-price-display'), span = el && el.firstElementChild;
+                        if (!span || !state.topics.includes(d.topic)) return;
+                        span.textContent = d.price; span.style.color = d.color; span.style.textShadow = `0 0 15px ${d.color}80`;
+                    };
+                    const market = d => document.querySelectorAll('#markets-table-content tr[data-symbol]').forEach(row => {
+                        const cell = d.cells[row.dataset.symbol];
+                        if (cell) { row.cells[2].textContent = cell[0]; row.cells[5].textContent = cell[1]; row.cells[5].className = cell[2] ? 'positive' : 'negative'; }
+                    });
+                    state.subscribe = topics => {
+                        if (topics.join('&') === key) return;
+                        key = topics.join('&'); state.topics = topics;
+                        if (source) { source.close(); source = null; }
+                        if (!topics.length) return;
+                        source = new EventSource(prefix() + 'push?' + topics.map(t => 'topic=' + encodeURIComponent(t)).join('&'));
+                        [['candles', candles], ['ticker', ticker], ['market', market]].forEach(([kind, apply]) => source.addEventListener(kind, e => apply(JSON.parse(e.data))));
+                    };
+                    return state;
+                })();
+                // graph widths for server-side downsampling, re-measured after resizes and tab switches
+                window.chartWidths = (() => {
+                    let last = '', timer = null;
+                    const report = () => {
+                        if (!window.dash_clientside || !dash_clientside.set_props || !document.getElementById('main-tabs')) return;
+                        const widths = {};
+                        document.querySelectorAll('.dash-graph[id]').forEach(el => { if (el.clientWidth) widths[el.id] = el.clientWidth; });
+                        if (JSON.stringify(widths) !== last) { last = JSON.stringify(widths); dash_clientside.set_props('chart-widths', {data: widths}); }
+                    };
+                    const later = () => { clearTimeout(timer); timer = setTimeout(report, 500); };
+                    window.addEventListener('resize', later);
+                    return {later};
+                })();
+            </script>
         </footer>
     </body>
 </html>
@@ -369,11 +2403,12 @@ login_layout = html.Div(className='login-container', children=[
 ])
 
 dashboard_layout = html.Div([
-    dcc.Store(id='timeframe-store', data={'tf': '1m', 'limit': 50}), 
+    dcc.Store(id='timeframe-store', data=TIMEFRAME_PRESETS['LIVE']), dcc.Store(id='ui-config', data=UI_CONFIG), dcc.Store(id='push-topics'), dcc.Store(id='chart-widths'),
     dcc.Store(id='current-page-store', data=1),
+    dcc.Store(id='overview-chart-state'), dcc.Store(id='depth-chart-state'), dcc.Store(id='analytics-chart-state'), dcc.Store(id='spot-chart-state'), dcc.Store(id='rwa-chart-state'),
     html.Div("⚡CRYPTO MASTER", className='header-title'),
-    dcc.Tabs(parent_className='custom-tabs', className='custom-tabs-container', children=[
-        dcc.Tab(label='Overview', className='custom-tab', selected_className='custom-tab--selected', children=[
+    dcc.Tabs(id='main-tabs', value='overview', parent_className='custom-tabs', className='custom-tabs-container', children=[
+        dcc.Tab(label='Overview', value='overview', className='custom-tab', selected_className='custom-tab--selected', children=[
             html.Div(className='control-panel', children=[html.P("SELECT ASSET", style={'marginBottom': '8px', 'color': '#888', 'fontSize': '0.75rem', 'letterSpacing': '1px'}), dcc.Dropdown(id='coin-select-dropdown', options=DROPDOWN_OPTIONS, value=DEFAULT_SYMBOL, clearable=False, style={'color': '#000'})]),
             html.H2(id='live-price-display', className='live-price-big'),
             html.Div(className='flex-container', children=[
@@ -383,24 +2418,28 @@ dashboard_layout = html.Div([
                 ]),
                 html.Div(className='metrics-container', children=[html.Div(id='key-metrics-panel')]),
             ]),
-            html.Div(className='bottom-bar-chart', style={'margin': '24px'}, children=[html.H4("MARKET PERFORMANCE (24H)", style={'color': '#888', 'marginBottom': '15px', 'letterSpacing': '1px'}), dcc.Graph(id='bar-chart-24h', style={'height': '300px'})])
+            html.Div(className='bottom-bar-chart', style={'margin': '24px'}, children=[html.H4("MARKET PERFORMANCE (24H)", style={'color': '#888', 'marginBottom': '15px', 'letterSpacing': '1px'}), dcc.Graph(id='bar-chart-24h', style={'height': '300px'})]),
+            html.Div(className='depth-grid', children=[
+                html.Div(className='analytics-card', style={'padding': '20px'}, children=[html.Div([html.Span("Market Depth"), html.Span(f"±{DEPTH_BAND_PCT:g}% of mid", className='card-subtitle')], className='card-title'), dcc.Graph(id='depth-chart', style={'height': '320px'})]),
+                html.Div(className='analytics-card', style={'padding': '20px'}, children=[html.Div([html.Span("Order Book Heatmap"), html.Span("Resting size per price band", className='card-subtitle')], className='card-title'), dcc.Graph(id='depth-heatmap', style={'height': '320px'})])
+            ])
         ]),
-        dcc.Tab(label='Technical Analysis', className='custom-tab', selected_className='custom-tab--selected', children=[
+        dcc.Tab(label='Technical Analysis', value='analysis', className='custom-tab', selected_className='custom-tab--selected', children=[
             html.Div(className='control-panel', style={'marginTop': '20px'}, children=[html.P("SELECT ASSET FOR ANALYSIS", style={'marginBottom': '8px', 'color': '#888', 'fontSize': '0.75rem'}), dcc.Dropdown(id='analysis-coin-dropdown', options=DROPDOWN_OPTIONS, value=DEFAULT_SYMBOL, clearable=False, style={'color': '#000'})]),
             html.Div(className='analytics-grid', children=[
                 html.Div([
-                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '20px'}, children=[html.Div([html.Span("Pi Cycle Top Indicator"), html.Span("111DMA vs 350DMA x2", style={'color': '#888', 'fontSize': '0.8rem'})], className='card-title', style={'display':'flex','justifyContent':'space-between','marginBottom':'15px','fontWeight':'bold'}), dcc.Graph(id='pi-cycle-chart', style={'height': '320px'})]),
-                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '20px'}, children=[html.Div([html.Span("Rainbow Price Chart"), html.Span("Long Term Trend", style={'color': '#888', 'fontSize': '0.8rem'})], className='card-title', style={'display':'flex','justifyContent':'space-between','marginBottom':'15px','fontWeight':'bold'}), dcc.Graph(id='rainbow-chart', style={'height': '320px'})]),
-                    html.Div(className='analytics-card', style={'padding': '20px'}, children=[html.Div([html.Span("Puell Multiple Chart"), html.Span("Buy/Sell Zones", style={'color': '#888', 'fontSize': '0.8rem'})], className='card-title', style={'display':'flex','justifyContent':'space-between','marginBottom':'15px','fontWeight':'bold'}), dcc.Graph(id='puell-chart', style={'height': '320px'})])
+                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '20px'}, children=[html.Div([html.Span("Pi Cycle Top Indicator"), html.Span("111DMA vs 350DMA x2", className='card-subtitle')], className='card-title'), dcc.Graph(id='pi-cycle-chart', style={'height': '320px'})]),
+                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '20px'}, children=[html.Div([html.Span("Rainbow Price Chart"), html.Span("Long Term Trend", className='card-subtitle')], className='card-title'), dcc.Graph(id='rainbow-chart', style={'height': '320px'})]),
+                    html.Div(className='analytics-card', style={'padding': '20px'}, children=[html.Div([html.Span("Puell Multiple Chart"), html.Span("Buy/Sell Zones", className='card-subtitle')], className='card-title'), dcc.Graph(id='puell-chart', style={'height': '320px'})])
                 ]),
                 html.Div([
-                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '25px', 'textAlign': 'center'}, children=[html.Div("PUELL MULTIPLE STATUS", style={'color':'#888','fontSize':'0.8rem'}), html.Div(id='puell-val-text', className='big-stat', style={'fontSize':'2.5rem','fontWeight':'bold','margin':'10px 0'}), html.Div(className='meter-bar-container', children=[html.Div(className='meter-bar-puell'), html.Div(id='puell-knob', className='meter-knob')]), html.Div(className='meter-labels', style={'display':'flex','justifyContent':'space-between','color':'#888','fontSize':'0.8rem'}, children=[html.Span("Undervalued"), html.Span("Overvalued")])]),
-                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '25px', 'textAlign': 'center'}, children=[html.Div("CYCLE TOP INDICATOR", style={'color':'#888','fontSize':'0.8rem'}), html.Div(id='top-val-text', className='big-stat', style={'fontSize':'2.5rem','fontWeight':'bold','margin':'10px 0'}), html.Div(className='meter-bar-container', children=[html.Div(className='meter-bar-top'), html.Div(id='top-knob', className='meter-knob')]), html.Div(className='meter-labels', style={'display':'flex','justifyContent':'space-between','color':'#888','fontSize':'0.8rem'}, children=[html.Span("Hold"), html.Span("Sell")])]),
-                    html.Div(className='analytics-card', style={'textAlign': 'center', 'padding': '25px'}, children=[html.Div("MARKET REGIME", style={'color':'#888','fontSize':'0.8rem'}), html.H2(id='cycle-status-text', style={'color': '#fff', 'margin': '15px 0', 'fontSize': '1.8rem'}), html.Div(id='cycle-desc', style={'color': '#888', 'fontSize': '0.9rem', 'lineHeight': '1.5'})]),
+                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '25px', 'textAlign': 'center'}, children=[html.Div("PUELL MULTIPLE STATUS", className='stat-label'), html.Div(id='puell-val-text', className='big-stat'), html.Div(className='meter-bar-container', children=[html.Div(className='meter-bar-puell'), html.Div(id='puell-knob', className='meter-knob')]), html.Div(className='meter-labels', children=[html.Span("Undervalued"), html.Span("Overvalued")])]),
+                    html.Div(className='analytics-card', style={'marginBottom': '20px', 'padding': '25px', 'textAlign': 'center'}, children=[html.Div("CYCLE TOP INDICATOR", className='stat-label'), html.Div(id='top-val-text', className='big-stat'), html.Div(className='meter-bar-container', children=[html.Div(className='meter-bar-top'), html.Div(id='top-knob', className='meter-knob')]), html.Div(className='meter-labels', children=[html.Span("Hold"), html.Span("Sell")])]),
+                    html.Div(className='analytics-card', style={'textAlign': 'center', 'padding': '25px'}, children=[html.Div("MARKET REGIME", className='stat-label'), html.H2(id='cycle-status-text', style={'color': '#fff', 'margin': '15px 0', 'fontSize': '1.8rem'}), html.Div(id='cycle-desc', style={'color': '#888', 'fontSize': '0.9rem', 'lineHeight': '1.5'})]),
                 ])
             ])
         ]),
-        dcc.Tab(label='RWA Assets', className='custom-tab', selected_className='custom-tab--selected', children=[
+        dcc.Tab(label='RWA Assets', value='rwa', className='custom-tab', selected_className='custom-tab--selected', children=[
             html.Div(className='rwa-grid', children=[
                 html.Div(className='rwa-card', children=[html.Div([html.H3("Total Tokenized Market Cap", style={'color':'#aaa', 'fontSize':'0.9rem'}), html.Div([html.Span("$16.24B", style={'fontSize':'2.2rem', 'fontWeight':'bold'}), html.Span(" +1.12%", style={'color':'#FF4136', 'fontSize':'1rem', 'marginLeft':'10px'})])], style={'paddingBottom':'15px', 'borderBottom':'1px solid #333', 'marginBottom':'15px'}), dcc.Graph(id='rwa-mkt-chart', style={'height': '220px'})]),
                 html.Div(className='rwa-card', children=[html.H4("TOP ISSUERS", style={'color':'#fff', 'textAlign':'center', 'marginBottom':'20px'}), dcc.Graph(id='rwa-issuer-chart', style={'height': '250px'})]),
@@ -408,28 +2447,50 @@ dashboard_layout = html.Div([
             ]),
             html.Div(className='rwa-table-container', style={'padding':'0 24px 24px 24px'}, children=[html.H3("RWA TOKEN LIST", style={'color':'white', 'marginBottom':'20px', 'fontSize':'1.2rem'}), html.Div(id='rwa-table-content')])
         ]),
-        dcc.Tab(label='Global Market', className='custom-tab', selected_className='custom-tab--selected', children=[
+        dcc.Tab(label='Global Market', value='global', className='custom-tab', selected_className='custom-tab--selected', children=[
             html.Div(className='spot-grid', children=[
                 html.Div([html.Div(className='analytics-card', style={'marginBottom': '24px', 'padding': '24px'}, children=[html.Div([html.Div([html.H3("TOTAL CRYPTO MARKET CAP", style={'color':'#888', 'marginBottom':'10px', 'fontSize':'0.8rem'}), html.Div([html.Span(id='global-mkt-cap', className='mkt-cap-main', style={'fontSize':'3rem','fontWeight':'bold'}), html.Span(id='global-mkt-change', className='mkt-cap-change')])])], style={'display':'flex', 'justifyContent':'space-between'}), dcc.Graph(id='global-mkt-chart', style={'height': '320px'})]), html.Div(className='analytics-card', style={'padding': '24px'}, children=[html.H4("SPOT VOLUME (24H)", style={'color':'#fff', 'marginBottom':'20px'}), dcc.Graph(id='global-vol-chart', style={'height': '300px'})])]),
-                html.Div([html.Div(className='analytics-card', style={'marginBottom': '24px', 'padding': '24px'}, children=[html.H4("HISTORICAL SNAPSHOTS", style={'color':'#fff', 'marginBottom':'20px'}), html.Div(className='stat-grid', children=[html.Div(className='stat-card', children=[html.Div("Yesterday", className='stat-label'), html.Div(id='hist-1d', className='stat-val')]), html.Div(className='stat-card', children=[html.Div("Last Week", className='stat-label'), html.Div(id='hist-7d', className='stat-val')]), html.Div(className='stat-card', children=[html.Div("Last Month", className='stat-label'), html.Div(id='hist-30d', className='stat-val')]), html.Div(className='stat-card', children=[html.Div("Last Year", className='stat-label'), html.Div(id='hist-1y', className='stat-val')])]), html.H4("YEARLY RANGE", style={'color':'#fff', 'marginTop':'30px', 'marginBottom':'15px'}), html.Div(className='stat-grid', children=[html.Div(className='stat-card', children=[html.Div("Yearly High", className='stat-label'), html.Div(id='year-high', className='stat-val', style={'color':'#00CC96'})]), html.Div(className='stat-card', children=[html.Div("Yearly Low", className='stat-label'), html.Div(id='year-low', className='stat-val', style={'color':'#FF4136'})])])]), html.Div(className='analytics-card', style={'padding': '24px'}, children=[html.H4("EXCHANGE DOMINANCE", style={'color':'#fff', 'marginBottom':'20px'}), dcc.Graph(id='cex-dominance-chart', style={'height': '300px'})])])
+                html.Div([html.Div(className='analytics-card', style={'marginBottom': '24px', 'padding': '24px'}, children=[html.H4("HISTORICAL SNAPSHOTS", style={'color':'#fff', 'marginBottom':'20px'}), html.Div(className='stat-grid', children=[html.Div(className='stat-card', children=[html.Div("Yesterday", className='stat-label'), html.Div(id='hist-1d', className='stat-val')]), html.Div(className='stat-card', children=[html.Div("Last Week", className='stat-label'), html.Div(id='hist-7d', className='stat-val')]), html.Div(className='stat-card', children=[html.Div("Last Month", className='stat-label'), html.Div(id='hist-30d', className='stat-val')]), html.Div(className='stat-card', children=[html.Div("Last Year", className='stat-label'), html.Div(id='hist-1y', className='stat-val')])]), html.H4("YEARLY RANGE", style={'color':'#fff', 'marginTop':'30px', 'marginBottom':'15px'}), html.Div(className='stat-grid', children=[html.Div(className='stat-card', children=[html.Div("Yearly High", className='stat-label'), html.Div(id='year-high', className='stat-val', style={'color':'#00CC96'})]), html.Div(className='stat-card', children=[html.Div("Yearly Low", className='stat-label'), html.Div(id='year-low', className='stat-val', style={'color':'#FF4136'})])])]), html.Div(className='analytics-card', style={'padding': '24px'}, children=[html.H4("MARKET DOMINANCE", style={'color':'#fff', 'marginBottom':'20px'}), dcc.Graph(id='cex-dominance-chart', style={'height': '300px'})])])
             ])
         ]),
-        dcc.Tab(label='TradingView', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(style={'height': '800px', 'padding': '24px'}, children=[html.Div(style={'width': '100%', 'height': '100%', 'borderRadius': '12px', 'overflow': 'hidden', 'boxShadow': '0 10px 30px rgba(0,0,0,0.5)'}, children=[html.Iframe(id='tradingview-iframe', style={'width': '100%', 'height': '100%', 'border': 'none'})])])]),
-        dcc.Tab(label='Screeners', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(className='market-table-container', style={'padding': '24px'}, children=[html.H2("TOP 100 CRYPTOCURRENCIES", style={'color': 'white', 'marginBottom': '25px', 'fontSize': '1.5rem'}), html.Div(id='markets-table-content', style={'overflowX': 'auto', 'borderRadius': '12px', 'border': '1px solid #2a2e39'}, children="Loading Market Data..."), html.Div(className='pagination-container', children=[html.Button("< Prev", id='prev-btn', className='page-btn'), html.Span(id='page-display', className='page-text', children="Page 1 of 10"), html.Button("Next >", id='next-btn', className='page-btn')])])]),
-        dcc.Tab(label='DexScan', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(style={'padding': '24px'}, children=[html.H2("LIVE DEX PAIRS (SIMULATED)", style={'color': 'white', 'marginBottom': '25px'}), html.Div(id='dexscan-content', className='dex-scroll-container', children="Loading DexScan...")])]),
-        dcc.Tab(label='Upcoming Sales', className='custom-tab', selected_className='custom-tab--selected', children=[
+        dcc.Tab(label='TradingView', value='tradingview', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(style={'height': '800px', 'padding': '24px'}, children=[html.Div(style={'width': '100%', 'height': '100%', 'borderRadius': '12px', 'overflow': 'hidden', 'boxShadow': '0 10px 30px rgba(0,0,0,0.5)'}, children=[html.Iframe(id='tradingview-iframe', style={'width': '100%', 'height': '100%', 'border': 'none'})])])]),
+        dcc.Tab(label='Screeners', value='screeners', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(className='market-table-container', style={'padding': '24px'}, children=[html.H2("TOP 100 CRYPTOCURRENCIES", style={'color': 'white', 'marginBottom': '25px', 'fontSize': '1.5rem'}), html.Div(id='markets-table-content', style={'overflowX': 'auto', 'borderRadius': '12px', 'border': '1px solid #2a2e39'}, children="Loading Market Data..."), html.Div(className='pagination-container', children=[html.Button("< Prev", id='prev-btn', className='page-btn'), html.Span(id='page-display', className='page-text', children="Page 1 of 10"), html.Button("Next >", id='next-btn', className='page-btn'), dcc.Dropdown(id='page-size-dropdown', options=[{'label': f'{n} / page', 'value': n} for n in PAGE_SIZES], value=PAGE_SIZES[0], clearable=False, searchable=False, style={'color': '#000', 'width': '130px'})])])]),
+        dcc.Tab(label='DexScan', value='dexscan', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(style={'padding': '24px'}, children=[html.H2("LIVE DEX PAIRS (SIMULATED)", style={'color': 'white', 'marginBottom': '25px'}), html.Div(id='dexscan-content', className='dex-scroll-container', children="Loading DexScan...")])]),
+        dcc.Tab(label='Upcoming Sales', value='presales', className='custom-tab', selected_className='custom-tab--selected', children=[
             html.Div(style={'padding': '24px'}, children=[
                 html.H2("🚀 HIGH POTENTIAL PRESALES", style={'color': '#00CC96', 'marginBottom': '30px', 'textAlign': 'center', 'letterSpacing': '2px'}),
                 html.Div(className='presale-grid', children=[html.Div(className='presale-card', children=[html.Div(p['category'], className='presale-badge'), html.Div(className='presale-header', children=[html.Div(p['symbol'][:2], className='presale-icon'), html.Div([html.Div(p['name'], className='presale-title'), html.Div(p['symbol'], className='presale-symbol')])]), html.P(p['desc'], className='presale-desc'), html.Div(className='progress-container', children=[html.Div(className='progress-labels', children=[html.Span(f"Raised: {p['raised']}"), html.Span(f"Target: {p['target']}")]) , html.Div(className='progress-bar-bg', children=[html.Div(className='progress-bar-fill', style={'width': p['raised']})])]), html.Div(f"Entry Price: {p['price']}", className='countdown'), html.Button("VIEW DETAILS", className='presale-btn')]) for p in UPCOMING_PROJECTS])
             ])
         ]),
-        dcc.Tab(label='Trending', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(id='trending-content', className='trending-wrapper', children="Loading Trending Data...")]),
-        dcc.Tab(label='News Feed', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(id='news-content', className='news-grid', children="Loading Latest Crypto News...")])
+        dcc.Tab(label='Trending', value='trending', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(id='trending-content', className='trending-wrapper', children="Loading Trending Data...")]),
+        dcc.Tab(label='News Feed', value='news', className='custom-tab', selected_className='custom-tab--selected', children=[html.Div(id='news-content', className='news-grid', children="Loading Latest Crypto News...")]),
+        dcc.Tab(label='Alerts', value='alerts', className='custom-tab', selected_className='custom-tab--selected', children=[
+            html.Div(style={'padding': '24px'}, children=[
+                html.H2("PRICE & INDICATOR ALERTS", style={'color': 'white', 'marginBottom': '25px', 'fontSize': '1.5rem'}),
+                html.Div(className='control-panel', style={'display': 'flex', 'flexWrap': 'wrap', 'gap': '12px', 'alignItems': 'center'}, children=[
+                    dcc.Dropdown(id='alert-symbol', options=DROPDOWN_OPTIONS, value=DEFAULT_SYMBOL, clearable=False, style={'color': '#000', 'width': '200px'}),
+                    dcc.Dropdown(id='alert-metric', options=[{'label': label, 'value': metric} for metric, label in ALERT_METRICS.items()], value='price', clearable=False, style={'color': '#000', 'width': '200px'}),
+                    dcc.Dropdown(id='alert-direction', options=[{'label': 'crosses above', 'value': 'above'}, {'label': 'crosses below', 'value': 'below'}], value='above', clearable=False, style={'color': '#000', 'width': '160px'}),
+                    dcc.Input(id='alert-threshold', type='number', placeholder='Threshold', className='login-input', style={'width': '160px', 'marginBottom': '0'}),
+                    html.Button("ADD ALERT", id='alert-add-btn', className='control-btn active'),
+                    html.Span(id='alert-form-msg', style={'color': '#888', 'fontSize': '0.85rem'})
+                ]),
+                html.Div(className='analytics-grid', children=[
+                    html.Div(className='analytics-card', style={'padding': '20px'}, children=[html.Div("FIRED", className='card-title'), html.Div(id='alerts-fired', children="No alerts fired yet")]),
+                    html.Div(className='analytics-card', style={'padding': '20px'}, children=[html.Div(id='alerts-active-title', children="ACTIVE", className='card-title'), html.Div(id='alerts-active')])
+                ])
+            ])
+        ])
     ]),
-    dcc.Interval(id='interval-component', interval=2000, n_intervals=0),
-    dcc.Interval(id='market-interval', interval=10000, n_intervals=0)
+    dcc.Interval(id='interval-component', interval=PANEL_INTERVALS['interval-component'], n_intervals=0),
+    *[dcc.Interval(id=i, interval=ms, n_intervals=0, disabled=True) for i, ms in PANEL_INTERVALS.items() if i != 'interval-component']
 ])
 
+@functools.lru_cache(maxsize=None)
+def dashboard_payload():
+    # the dashboard tree is static: serialized on the first login, then embedded in every login response as is
+    return orjson.Fragment(encode_json(dashboard_layout)) if orjson is not None else dashboard_layout
+
 # --- FIX: INITIAL LAYOUT MUST CONTAIN LOGIN PAGE CONTENT TO RENDER ---
 app.layout = html.Div([
     dcc.Store(id='login-state', data=False),
@@ -444,138 +2505,269 @@ app.layout = html.Div([
     [State('username-box', 'value'), State('password-box', 'value'), State('login-state', 'data')],
     prevent_initial_call=False
 )
+@timed
 def manage_login(n_clicks, username, password, is_logged_in):
     if n_clicks is None: return no_update, no_update
-    if username == "admin" and password == "admin": return dashboard_layout, ""
+    if username == "admin" and password == "admin": return dashboard_payload(), ""
     return login_layout, "Invalid Credentials (Try: admin/admin)"
 
-@app.callback(Output('contact-modal', 'className'), [Input('contact-btn', 'n_clicks'), Input('close-contact', 'n_clicks')], [State('contact-modal', 'className')])
-def toggle_contact_modal(open_click, close_click, current_class):
-    if not ctx.triggered: return "modal-overlay"
-    return "modal-overlay modal-active" if 'contact-btn' in ctx.triggered_id else "modal-overlay"
-
-@app.callback(Output('about-modal', 'className'), [Input('about-btn', 'n_clicks'), Input('close-about', 'n_clicks')], [State('about-modal', 'className')])
-def toggle_about_modal(open_click, close_click, current_class):
-    if not ctx.triggered: return "modal-overlay"
-    return "modal-overlay modal-active" if 'about-btn' in ctx.triggered_id else "modal-overlay"
+# the first input opens the modal, the second closes it
+TOGGLE_MODAL_JS = '''function(openClicks, closeClicks) {
+    const c = dash_clientside.callback_context, opener = c.inputs_list[0].id;
+    return c.triggered.some(t => t.value && t.prop_id === opener + '.n_clicks') ? 'modal-overlay modal-active' : 'modal-overlay';
+}'''
+app.clientside_callback(TOGGLE_MODAL_JS, Output('contact-modal', 'className'), [Input('contact-btn', 'n_clicks'), Input('close-contact', 'n_clicks')])
+app.clientside_callback(TOGGLE_MODAL_JS, Output('about-modal', 'className'), [Input('about-btn', 'n_clicks'), Input('close-about', 'n_clicks')])
 
 # --- ALL DASHBOARD CALLBACKS (KEPT UNCHANGED) ---
-@app.callback([Output('rwa-mkt-chart', 'figure'), Output('rwa-issuer-chart', 'figure'), Output('rwa-network-chart', 'figure'), Output('rwa-table-content', 'children')], Input('interval-component', 'n_intervals'))
-def update_rwa(n):
+@app.callback([Output('rwa-mkt-chart', 'figure'), Output('rwa-issuer-chart', 'figure'), Output('rwa-network-chart', 'figure'), Output('rwa-table-content', 'children'), Output('rwa-chart-state', 'data')], [Input('rwa-interval', 'n_intervals'), Input('main-tabs', 'value')], State('rwa-chart-state', 'data'))
+@timed
+def update_rwa(n, active_tab, chart_state):
+    require_tab(active_tab, 'rwa')
+    if chart_state: return no_update, no_update, no_update, build_rwa_table(), chart_state  # the charts are static once drawn
     x_vals = list(range(30)); y_vals = [3.2 + (i*0.01 + random.uniform(-0.05, 0.05)) for i in x_vals]
     fig_mkt = go.Figure(go.Scatter(x=x_vals, y=y_vals, mode='lines', fill='tozeroy', line=dict(color='#00CC96', width=3), fillcolor='rgba(0, 204, 150, 0.1)')); fig_mkt.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=0, r=0, t=0, b=0), xaxis=dict(visible=False), yaxis=dict(visible=False))
     fig_issuer = go.Figure(go.Pie(labels=['Tether', 'Paxos', 'Ondo', 'Backed'], values=[43, 38, 10, 9], hole=0.7, textinfo='none', marker=dict(colors=['#2962ff', '#00CC96', '#F5B97F', '#FF4136']))); fig_issuer.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', margin=dict(l=20, r=20, t=0, b=20), showlegend=True, legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
     fig_net = go.Figure(go.Pie(labels=['Ethereum', 'Solana', 'Arbitrum'], values=[93, 6, 1], hole=0.7, textinfo='none', marker=dict(colors=['#2962ff', '#00CC96', '#F5B97F']))); fig_net.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', margin=dict(l=20, r=20, t=0, b=20), showlegend=True, legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5))
+    return fig_mkt, fig_issuer, fig_net, build_rwa_table(), {'rendered': True}
+
+def build_rwa_table():
     header = html.Tr([html.Th("#"), html.Th("NAME"), html.Th("TYPE"), html.Th("PRICE"), html.Th("CHANGE (24H)"), html.Th("MARKET CAP")]); rows = []
     for i, asset in enumerate(RWA_ASSETS):
         price = asset['price'] * (1 + random.uniform(-0.001, 0.001)); change = random.uniform(-1.5, 2.5); col = 'positive' if change >= 0 else 'negative'
-        rows.append(html.Tr([html.Td(i+1, style={'color':'#666'}), html.Td(html.Div(className='coin-cell', children=[html.Img(src=asset['icon'], className='coin-icon'), html.Div([html.Div(asset['name'], style={'fontWeight': '600'}), html.Div(asset['ticker'], className='coin-symbol', style={'fontSize':'0.75rem', 'color':'#888'})])])), html.Td(asset['type'], style={'color':'#aaa', 'fontSize':'0.85rem'}), html.Td(format_currency(price), style={'fontWeight': '600', 'fontFamily':'monospace'}), html.Td(f"{change:+.2f}%", className=col), html.Td(format_compact(asset['mkt_cap']), style={'color':'#ccc'})]))
-    return fig_mkt, fig_issuer, fig_net, html.Table([html.Thead(header), html.Tbody(rows)], className='crypto-table')
-
-@app.callback([Output('global-mkt-cap', 'children'), Output('global-mkt-change', 'children'), Output('global-mkt-chart', 'figure'), Output('global-vol-chart', 'figure'), Output('cex-dominance-chart', 'figure'), Output('hist-1d', 'children'), Output('hist-7d', 'children'), Output('hist-30d', 'children'), Output('hist-1y', 'children'), Output('year-high', 'children'), Output('year-low', 'children')], Input('interval-component', 'n_intervals'))
-def update_spot_market(n):
-    data = generate_global_market_data(); 
-    if not data: return "Loading...", "", go.Figure(), go.Figure(), go.Figure(), "-", "-", "-", "-", "-", "-"
-    times, mkt_caps, volumes = data; current_cap = mkt_caps.iloc[-1]; prev_cap = mkt_caps.iloc[-2]; change = ((current_cap - prev_cap) / prev_cap) * 100; color = '#00CC96' if change >= 0 else '#FF4136'
-    fig_cap = go.Figure(go.Scatter(x=times, y=mkt_caps, mode='lines', fill='tozeroy', line=dict(color='#2962ff', width=3), fillcolor='rgba(41, 98, 255, 0.1)')); fig_cap.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=10, t=10, b=30), height=320, xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'))
-    fig_vol = go.Figure(go.Bar(x=times, y=volumes, marker_color='#00CC96')); fig_vol.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=10, t=10, b=30), height=300, xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'))
-    x_vals = times[-90:]; y_binance = np.random.normal(50, 2, 90); y_coinbase = np.random.normal(15, 1, 90); y_dex = np.random.normal(20, 3, 90); y_others = 100 - (y_binance + y_coinbase + y_dex); fig_dom = go.Figure(); fig_dom.add_trace(go.Scatter(x=x_vals, y=y_binance, stackgroup='one', name='Binance', line=dict(width=0))); fig_dom.add_trace(go.Scatter(x=x_vals, y=y_coinbase, stackgroup='one', name='Coinbase', line=dict(width=0))); fig_dom.add_trace(go.Scatter(x=x_vals, y=y_dex, stackgroup='one', name='DEXs', line=dict(width=0))); fig_dom.add_trace(go.Scatter(x=x_vals, y=y_others, stackgroup='one', name='Others', line=dict(width=0))); fig_dom.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=10, t=10, b=30), height=300, legend=dict(orientation="h", y=1.1))
-    return format_compact(current_cap), html.Span(f"{change:+.2f}% (24h)", style={'color': color, 'fontSize': '1.2rem'}), fig_cap, fig_vol, fig_dom, format_compact(mkt_caps.iloc[-2]), format_compact(mkt_caps.iloc[-8]), format_compact(mkt_caps.iloc[-31]), format_compact(mkt_caps.iloc[0]), format_compact(mkt_caps.max()), format_compact(mkt_caps.min())
-
-@app.callback([Output('pi-cycle-chart', 'figure'), Output('rainbow-chart', 'figure'), Output('puell-chart', 'figure'), Output('puell-val-text', 'children'), Output('puell-knob', 'style'), Output('top-val-text', 'children'), Output('top-knob', 'style'), Output('cycle-status-text', 'children'), Output('cycle-desc', 'children')], [Input('interval-component', 'n_intervals'), Input('analysis-coin-dropdown', 'value')])
-def update_analytics(n, selected_symbol):
-    if not selected_symbol: return go.Figure(), go.Figure(), go.Figure(), "", {}, "", {}, "", ""
-    df = fetch_chart_data(selected_symbol, '1d', 2000); df, current_puell, puell_meter_val, top_score = calculate_cycle_indicators(df)
-    if df is None: return go.Figure(), go.Figure(), go.Figure(), "N/A", {}, "N/A", {}, "No Data", "Select BTC/ETH"
-    fig_pi = go.Figure(); fig_pi.add_trace(go.Scatter(x=df['timestamp'], y=df['close'], mode='lines', name='Price', line=dict(color='rgba(255,255,255,0.8)', width=1))); fig_pi.add_trace(go.Scatter(x=df['timestamp'], y=df['111DMA'], mode='lines', name='111 DMA', line=dict(color='#00CC96', width=2))); fig_pi.add_trace(go.Scatter(x=df['timestamp'], y=df['350DMA'], mode='lines', name='350 DMA x2', line=dict(color='#FF4136', width=2))); fig_pi.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=30, r=10, t=10, b=30), legend=dict(orientation="h", y=1.1), yaxis=dict(gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
-    fig_rain = go.Figure(); base = df['Rainbow_Base']; colors = ['#6a0dad', '#2962ff', '#00CC96', '#FFD700', '#FF8C00', '#FF4136']; multipliers = [0.5, 0.75, 1.0, 1.25, 1.5, 1.75]
-    for i, mult in enumerate(multipliers): fig_rain.add_trace(go.Scatter(x=df['timestamp'], y=base*mult, mode='lines', line=dict(width=0), showlegend=False, fill='tonexty' if i>0 else 'none', fillcolor=colors[i], opacity=0.3))
-    fig_rain.add_trace(go.Scatter(x=df['timestamp'], y=df['close'], mode='lines', name='Price', line=dict(color='white', width=2))); fig_rain.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=30, r=10, t=10, b=30), showlegend=False, yaxis_type="log", yaxis=dict(gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
-    fig_puell = go.Figure(); fig_puell.add_hrect(y0=4, y1=10, fillcolor="rgba(255, 65, 54, 0.2)", line_width=0); fig_puell.add_hrect(y0=0, y1=0.5, fillcolor="rgba(0, 204, 150, 0.2)", line_width=0); fig_puell.add_trace(go.Scatter(x=df['timestamp'], y=df['Puell'], mode='lines', name='Puell Multiple', line=dict(color='#2962ff', width=2))); fig_puell.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=30, r=10, t=10, b=30), yaxis_title="Multiple", yaxis=dict(gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
-    puell_text = f"{current_puell:.2f}"; puell_style = {'left': f'{puell_meter_val}%'}; top_text = f"{top_score:.1f}%"; top_style = {'left': f'{top_score}%'}; dma_200 = df['close'].rolling(window=200).mean().iloc[-1] if not pd.isna(df['close'].rolling(window=200).mean().iloc[-1]) else 0; val_score = 50; 
+        rows.append(html.Tr([html.Td(i+1, className='rank-cell'), html.Td(html.Div(className='coin-cell', children=[html.Img(src=asset['icon'], className='coin-icon'), html.Div([html.Div(asset['name'], className='coin-name'), html.Div(asset['ticker'], className='coin-symbol')])])), html.Td(asset['type'], className='type-cell'), html.Td(format_currency(price), className='price-cell'), html.Td(f"{change:+.2f}%", className=col), html.Td(format_compact(asset['mkt_cap']), className='cap-cell')]))
+    return html.Table([html.Thead(header), html.Tbody(rows)], className='crypto-table')
+
+@app.callback([Output('global-mkt-cap', 'children'), Output('global-mkt-change', 'children'), Output('global-mkt-chart', 'figure'), Output('global-vol-chart', 'figure'), Output('cex-dominance-chart', 'figure'), Output('hist-1d', 'children'), Output('hist-7d', 'children'), Output('hist-30d', 'children'), Output('hist-1y', 'children'), Output('year-high', 'children'), Output('year-low', 'children'), Output('spot-chart-state', 'data')], [Input('global-interval', 'n_intervals'), Input('main-tabs', 'value'), Input('global-mkt-chart', 'relayoutData'), Input('global-vol-chart', 'relayoutData')], [State('spot-chart-state', 'data'), State('chart-widths', 'data')])
+@timed
+def update_spot_market(n, active_tab, cap_view, vol_view, chart_state, widths):
+    require_tab(active_tab, 'global')
+    latest = market_rollup.read(); chart_state = chart_state or {}
+    if latest is None: return "Loading...", "", go.Figure(), go.Figure(), go.Figure(), "-", "-", "-", "-", "-", "-", None
+    now, current = latest; days, rows = market_rollup.series('1d', now)
+    times = pd.Series(pd.to_datetime(days, unit='s', utc=True).tz_convert('Asia/Kolkata')); mkt_caps = pd.Series(rows[:, :len(ROLLUP_GROUPS)].sum(axis=1)); volumes = pd.Series(rows[:, len(ROLLUP_GROUPS)])
+    def cap_ago(seconds):
+        row = market_rollup.at(seconds, now)
+        return row[:len(ROLLUP_GROUPS)].sum() if row is not None else None
+    current_cap = current[:len(ROLLUP_GROUPS)].sum()
+    prev_cap = cap_ago(86400); change = (current_cap - prev_cap) / prev_cap * 100 if prev_cap else 0.0; color = '#00CC96' if change >= 0 else '#FF4136'
+    def build_cap(v):
+        fig_cap = go.Figure(go.Scatter(x=v[0]['x'], y=v[0]['y'], mode='lines', fill='tozeroy', line=dict(color='#2962ff', width=3), fillcolor='rgba(41, 98, 255, 0.1)')); fig_cap.update_layout(template='plotly_dark', uirevision='zoom', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=10, t=10, b=30), height=320, xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'))
+        return fig_cap
+    def build_vol(v):
+        fig_vol = go.Figure(go.Bar(x=v[0]['x'], y=v[0]['y'], marker_color='#00CC96')); fig_vol.update_layout(template='plotly_dark', uirevision='zoom', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=10, t=10, b=30), height=300, xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'))
+        return fig_vol
+    def build_dom(v):
+        fig_dom = go.Figure([go.Scatter(x=trace['x'], y=trace['y'], stackgroup='one', name=name, line=dict(width=0)) for trace, name in zip(v, ROLLUP_GROUPS)]); fig_dom.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=10, t=10, b=30), height=300, legend=dict(orientation="h", y=1.1), yaxis=dict(ticksuffix='%', range=[0, 100]))
+        return fig_dom
+    ts = timestamps_ms(times)
+    cap_rows, cap_key = downsample(ts, point_budget(widths, 'global-mkt-chart'), view_window(cap_view), line=mkt_caps.to_numpy()); cap_x = times.iloc[cap_rows]
+    vol_rows, vol_key = downsample(ts, point_budget(widths, 'global-vol-chart'), view_window(vol_view), low=volumes.to_numpy(), high=volumes.to_numpy()); vol_x = times.iloc[vol_rows]
+    fig_cap, cap_state = figure_update(chart_state.get('cap'), ['global', *cap_key], cap_x, [{'x': cap_x, 'y': mkt_caps.iloc[cap_rows]}], build_cap)
+    fig_vol, vol_state = figure_update(chart_state.get('vol'), ['global', *vol_key], vol_x, [{'x': vol_x, 'y': volumes.iloc[vol_rows]}], build_vol)
+    dom_x = times.iloc[-90:]; shares = rows[-90:, :len(ROLLUP_GROUPS)] / mkt_caps.iloc[-90:].to_numpy()[:, None] * 100
+    fig_dom, dom_state = figure_update(chart_state.get('dom'), ['dominance'], dom_x, [{'x': dom_x, 'y': pd.Series(np.round(col, 2))} for col in shares.T], build_dom)
+    hist = [format_compact(c) if c is not None else "-" for c in (cap_ago(86400), cap_ago(7 * 86400), cap_ago(30 * 86400), cap_ago(365 * 86400))]
+    return format_compact(current_cap), html.Span(f"{change:+.2f}% (24h)", style={'color': color, 'fontSize': '1.2rem'}), fig_cap, fig_vol, fig_dom, *hist, format_compact(mkt_caps.max()), format_compact(mkt_caps.min()), {'cap': cap_state, 'vol': vol_state, 'dom': dom_state}
+
+@app.callback([Output('pi-cycle-chart', 'figure'), Output('rainbow-chart', 'figure'), Output('puell-chart', 'figure'), Output('puell-val-text', 'children'), Output('puell-knob', 'style'), Output('top-val-text', 'children'), Output('top-knob', 'style'), Output('cycle-status-text', 'children'), Output('cycle-desc', 'children'), Output('analytics-chart-state', 'data')], [Input('analytics-interval', 'n_intervals'), Input('analysis-coin-dropdown', 'value'), Input('main-tabs', 'value'), Input('pi-cycle-chart', 'relayoutData'), Input('rainbow-chart', 'relayoutData'), Input('puell-chart', 'relayoutData')], [State('analytics-chart-state', 'data'), State('chart-widths', 'data')])
+@timed
+def update_analytics(n, selected_symbol, active_tab, pi_view, rain_view, puell_view, chart_state, widths):
+    require_tab(active_tab, 'analysis')
+    if not selected_symbol: return go.Figure(), go.Figure(), go.Figure(), "", {}, "", {}, "", "", None
+    df, current_puell, puell_meter_val, top_score, dma_200 = market_hub.cycle_indicators(selected_symbol, '1d', ANALYTICS_HISTORY); chart_state = chart_state or {}
+    if df is None: return go.Figure(), go.Figure(), go.Figure(), "N/A", {}, "N/A", {}, "No Data", "Select BTC/ETH", None
+    colors = ['#6a0dad', '#2962ff', '#00CC96', '#FFD700', '#FF8C00', '#FF4136']; multipliers = [0.5, 0.75, 1.0, 1.25, 1.5, 1.75]; x = df['timestamp']
+    def build_pi(v):
+        fig_pi = go.Figure(); fig_pi.add_trace(go.Scatter(x=v[0]['x'], y=v[0]['y'], mode='lines', name='Price', line=dict(color='rgba(255,255,255,0.8)', width=1))); fig_pi.add_trace(go.Scatter(x=v[1]['x'], y=v[1]['y'], mode='lines', name='111 DMA', line=dict(color='#00CC96', width=2))); fig_pi.add_trace(go.Scatter(x=v[2]['x'], y=v[2]['y'], mode='lines', name='350 DMA x2', line=dict(color='#FF4136', width=2))); fig_pi.update_layout(template='plotly_dark', uirevision='zoom', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=30, r=10, t=10, b=30), legend=dict(orientation="h", y=1.1), yaxis=dict(gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
+        return fig_pi
+    def build_rain(v):
+        fig_rain = go.Figure()
+        for i, mult in enumerate(multipliers): fig_rain.add_trace(go.Scatter(x=v[i]['x'], y=v[i]['y'], mode='lines', line=dict(width=0), showlegend=False, fill='tonexty' if i>0 else 'none', fillcolor=colors[i], opacity=0.3))
+        fig_rain.add_trace(go.Scatter(x=v[-1]['x'], y=v[-1]['y'], mode='lines', name='Price', line=dict(color='white', width=2))); fig_rain.update_layout(template='plotly_dark', uirevision='zoom', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=30, r=10, t=10, b=30), showlegend=False, yaxis_type="log", yaxis=dict(gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
+        return fig_rain
+    def build_puell(v):
+        fig_puell = go.Figure(); fig_puell.add_hrect(y0=4, y1=10, fillcolor="rgba(255, 65, 54, 0.2)", line_width=0); fig_puell.add_hrect(y0=0, y1=0.5, fillcolor="rgba(0, 204, 150, 0.2)", line_width=0); fig_puell.add_trace(go.Scatter(x=v[0]['x'], y=v[0]['y'], mode='lines', name='Puell Multiple', line=dict(color='#2962ff', width=2))); fig_puell.update_layout(template='plotly_dark', uirevision='zoom', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=30, r=10, t=10, b=30), yaxis_title="Multiple", yaxis=dict(gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
+        return fig_puell
+    key = [selected_symbol]; ts = timestamps_ms(x); close = df['close'].to_numpy()
+    pi_rows, pi_key = downsample(ts, point_budget(widths, 'pi-cycle-chart'), view_window(pi_view), line=close); pi = df.iloc[pi_rows]
+    rain_rows, rain_key = downsample(ts, point_budget(widths, 'rainbow-chart'), view_window(rain_view), line=close); rain = df.iloc[rain_rows]
+    puell_rows, puell_key = downsample(ts, point_budget(widths, 'puell-chart'), view_window(puell_view), line=df['Puell'].to_numpy()); puell = df.iloc[puell_rows]
+    fig_pi, pi_state = figure_update(chart_state.get('pi'), key + pi_key, pi['timestamp'], [{'x': pi['timestamp'], 'y': pi['close']}, {'x': pi['timestamp'], 'y': pi['111DMA']}, {'x': pi['timestamp'], 'y': pi['350DMA']}], build_pi)
+    fig_rain, rain_state = figure_update(chart_state.get('rain'), key + rain_key, rain['timestamp'], [{'x': rain['timestamp'], 'y': rain['Rainbow_Base'] * mult} for mult in multipliers] + [{'x': rain['timestamp'], 'y': rain['close']}], build_rain)
+    fig_puell, puell_state = figure_update(chart_state.get('puell'), key + puell_key, puell['timestamp'], [{'x': puell['timestamp'], 'y': puell['Puell']}], build_puell)
+    puell_text = f"{current_puell:.2f}"; puell_style = {'left': f'{puell_meter_val}%'}; top_text = f"{top_score:.1f}%"; top_style = {'left': f'{top_score}%'}; val_score = 50; 
     if dma_200 > 0: val_score = min(max((df['close'].iloc[-1] / dma_200 - 0.5) / 1.9 * 100, 0), 100)
     status = "NEUTRAL"; desc = "Market is currently within expected ranges."; 
     if val_score > 80: status = "OVERHEATED (SELL)"; desc = "Prices are extended. Caution advised."
     elif val_score < 20: status = "ACCUMULATION (BUY)"; desc = "Historical buy zone detected."
-    return fig_pi, fig_rain, fig_puell, puell_text, puell_style, top_text, top_style, status, desc
-
-@app.callback([Output('timeframe-store', 'data'), Output({'type': 'tf-btn', 'index': ALL}, 'className'), Output('interval-component', 'interval')], [Input({'type': 'tf-btn', 'index': ALL}, 'n_clicks')], [State('timeframe-store', 'data')])
-def update_controls(n_clicks, current_tf_data):
-    ctx_msg = ctx.triggered_id; tf_data = current_tf_data; interval_speed = 2000 
-    if ctx_msg and ctx_msg['type'] == 'tf-btn':
-        selected_tf = ctx_msg['index']
-        if selected_tf == 'LIVE': tf_data = {'tf': '1m', 'limit': 50}; interval_speed = 2000
-        elif selected_tf == '24H': tf_data = {'tf': '15m', 'limit': 96}; interval_speed = 60000
-        elif selected_tf == '7D': tf_data = {'tf': '1h', 'limit': 168}; interval_speed = 60000
-        elif selected_tf == '1M': tf_data = {'tf': '4h', 'limit': 180}; interval_speed = 60000
-        elif selected_tf == '1Y': tf_data = {'tf': '1d', 'limit': 365}; interval_speed = 60000
-        elif selected_tf == '5Y': tf_data = {'tf': '1w', 'limit': 260}; interval_speed = 60000
-    active_tf_label = 'LIVE' 
-    if tf_data['limit'] == 96: active_tf_label = '24H'
-    elif tf_data['limit'] == 168: active_tf_label = '7D'
-    elif tf_data['limit'] == 180: active_tf_label = '1M'
-    elif tf_data['limit'] == 365: active_tf_label = '1Y'
-    elif tf_data['limit'] == 260: active_tf_label = '5Y'
-    styles = ['control-btn live-btn active' if i['id']['index'] == 'LIVE' and active_tf_label == 'LIVE' else ('control-btn active' if i['id']['index'] == active_tf_label else ('control-btn live-btn' if i['id']['index'] == 'LIVE' else 'control-btn')) for i in ctx.inputs_list[0]]
-    return tf_data, styles, interval_speed
-
-@app.callback([Output('live-candlestick-chart', 'figure'), Output('live-price-display', 'children'), Output('key-metrics-panel', 'children'), Output('bar-chart-24h', 'figure'), Output('chart-title', 'children'), Output('tradingview-iframe', 'srcDoc')], [Input('interval-component', 'n_intervals'), Input('coin-select-dropdown', 'value'), Input('timeframe-store', 'data')])
-def update_overview(n, selected_symbol, tf_data):
-    if not selected_symbol: return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
-    tv_html = get_tradingview_html(selected_symbol); tickers = {}; 
-    try: tickers = exchange.fetch_tickers(TRACKER_SYMBOLS) if exchange else {}; selected_ticker = tickers.get(selected_symbol, {})
-    except: tickers = {}; selected_ticker = {}
-    df = fetch_chart_data(selected_symbol, tf_data['tf'], tf_data['limit'])
-    if df is None: return go.Figure(), "Loading...", "Loading...", go.Figure(), "Loading...", tv_html
+    return fig_pi, fig_rain, fig_puell, puell_text, puell_style, top_text, top_style, status, desc, {'pi': pi_state, 'rain': rain_state, 'puell': puell_state}
+
+app.clientside_callback('''function(clicks, current, config) {
+    const c = dash_clientside.callback_context, presets = config.presets, fired = c.triggered.find(t => t.value);
+    const clicked = fired ? JSON.parse(fired.prop_id.slice(0, fired.prop_id.lastIndexOf('.'))).index : null;
+    const tf = presets[clicked] || current;
+    const active = Object.keys(presets).find(label => presets[label].tf === tf.tf && presets[label].limit === tf.limit) || 'LIVE';
+    const classes = c.inputs_list[0].map(i => 'control-btn' + (i.id.index === 'LIVE' ? ' live-btn' : '') + (i.id.index === active ? ' active' : ''));
+    return [tf === current ? dash_clientside.no_update : tf, classes, config.chart_intervals[active]];
+}''', [Output('timeframe-store', 'data'), Output({'type': 'tf-btn', 'index': ALL}, 'className'), Output('interval-component', 'interval')], [Input({'type': 'tf-btn', 'index': ALL}, 'n_clicks')], [State('timeframe-store', 'data'), State('ui-config', 'data')])
+
+@app.callback([Output('live-candlestick-chart', 'figure'), Output('live-price-display', 'children'), Output('key-metrics-panel', 'children'), Output('bar-chart-24h', 'figure'), Output('chart-title', 'children'), Output('tradingview-iframe', 'srcDoc'), Output('overview-chart-state', 'data')], [Input('interval-component', 'n_intervals'), Input('coin-select-dropdown', 'value'), Input('timeframe-store', 'data'), Input('main-tabs', 'value')], [State('overview-chart-state', 'data'), State('chart-widths', 'data')])
+@timed
+def update_overview(n, selected_symbol, tf_data, active_tab, chart_state, widths):
+    require_tab(active_tab, 'overview')
+    if not selected_symbol: return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    chart_state = chart_state or {}; tv_html = get_tradingview_html(selected_symbol) if chart_state.get('symbol') != selected_symbol else no_update; tickers = market_hub.tickers(); selected_ticker = tickers.get(selected_symbol, {})
+    df = market_hub.chart(selected_symbol, tf_data['tf'], tf_data['limit'])
+    if df is None: return go.Figure(), "Loading...", "Loading...", go.Figure(), "Loading...", get_tradingview_html(selected_symbol), None
     latest_price = selected_ticker.get('last', df['close'].iloc[-1]) * USD_TO_INR_RATE; pct_change = selected_ticker.get('percentage', 0); volume = selected_ticker.get('quoteVolume', 0) * USD_TO_INR_RATE; color = '#00CC96' if pct_change >= 0 else '#FF4136'; full_name = SYMBOL_MAP.get(selected_symbol, selected_symbol)
     supply = COIN_PARAMS.get(selected_symbol, {'supply': 0, 'max': 0, 'symbol': 'Crypto'}); market_cap = latest_price * supply['supply']; fdv = latest_price * supply['max'] if supply['max'] else market_cap
     metrics_html = [html.Div(className='market-cap-card', children=[html.Div("MARKET CAP", className='metric-title'), html.Div(format_compact(market_cap), className='metric-value-large', style={'fontSize':'1.8rem'}), html.Div(f"{pct_change:+.2f}%", style={'color': color, 'fontSize': '1rem', 'marginTop': '5px', 'fontWeight': 'bold'})]), html.Div(className='metric-grid', children=[html.Div(className='metric-box', children=[html.Div("Volume (24h)", className='metric-title'), html.Div(format_compact(volume), className='metric-value')]), html.Div(className='metric-box', children=[html.Div("FDV", className='metric-title'), html.Div(format_compact(fdv), className='metric-value')]), html.Div(className='metric-box', children=[html.Div("Vol/Mkt Cap", className='metric-title'), html.Div(f"{(volume/market_cap*100):.2f}%" if market_cap > 0 else "N/A", className='metric-value')]), html.Div(className='metric-box', children=[html.Div("Total Supply", className='metric-title'), html.Div(f"{format_compact(supply['supply']).replace('₹ ', '')}", className='metric-value')]), html.Div(className='metric-box', children=[html.Div("Max Supply", className='metric-title'), html.Div(f"{format_compact(supply['max']).replace('₹ ', '')}" if supply['max'] else "∞", className='metric-value')]), html.Div(className='metric-box', children=[html.Div("Circulating", className='metric-title'), html.Div(f"{format_compact(supply['supply']).replace('₹ ', '')}", className='metric-value')])])]
-    fig_candle = go.Figure(go.Candlestick(x=df['timestamp'], open=df['open'], high=df['high'], low=df['low'], close=df['close'], increasing_line_color='#00CC96', decreasing_line_color='#FF4136', name='Price')); df['SMA'] = df['close'].rolling(5).mean(); fig_candle.add_trace(go.Scatter(x=df['timestamp'], y=df['SMA'], line=dict(color='#2962ff', width=1.5), name='Trend')); fig_candle.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis_rangeslider_visible=False, margin=dict(l=0, r=50, t=10, b=30), yaxis=dict(gridcolor='rgba(255,255,255,0.05)', showgrid=True), xaxis=dict(gridcolor='rgba(255,255,255,0.05)', showgrid=False), hovermode='x unified', hoverlabel=dict(bgcolor="#1e1e1e", font_size=12, font_color="white", bordercolor="#333"))
+    df['SMA'] = df['close'].rolling(CHART_SMA_WINDOW).mean()
+    rows, sample_key = downsample(timestamps_ms(df['timestamp']), point_budget(widths, 'live-candlestick-chart'), low=df['low'].to_numpy(), high=df['high'].to_numpy()); df = df.iloc[rows] if len(rows) < len(df) else df; x = df['timestamp']
+    def build_candle(v):
+        fig_candle = go.Figure(go.Candlestick(**v[0], increasing_line_color='#00CC96', decreasing_line_color='#FF4136', name='Price')); fig_candle.add_trace(go.Scatter(x=v[1]['x'], y=v[1]['y'], line=dict(color='#2962ff', width=1.5), name='Trend')); fig_candle.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis_rangeslider_visible=False, meta={'topic': f"candles:{selected_symbol}:{tf_data['tf']}"}, margin=dict(l=0, r=50, t=10, b=30), yaxis=dict(gridcolor='rgba(255,255,255,0.05)', showgrid=True), xaxis=dict(gridcolor='rgba(255,255,255,0.05)', showgrid=False), hovermode='x unified', hoverlabel=dict(bgcolor="#1e1e1e", font_size=12, font_color="white", bordercolor="#333"))
+        return fig_candle
+    fig_candle, candle_state = figure_update(chart_state.get('candle'), [selected_symbol, tf_data['tf'], tf_data['limit'], *sample_key], x, [{'x': x, 'open': df['open'], 'high': df['high'], 'low': df['low'], 'close': df['close']}, {'x': x, 'y': df['SMA']}], build_candle)
     price_html = html.Span(f"{format_currency(latest_price)}", style={'color': color, 'textShadow': f'0 0 15px {color}80'})
     bar_x, bar_y, bar_colors = [], [], []
     for s in TRACKER_SYMBOLS:
         if s in tickers: t = tickers[s]; bar_x.append(SYMBOL_MAP.get(s, s)); bar_y.append(t['percentage']); bar_colors.append('#00CC96' if t['percentage'] >= 0 else '#FF4136')
     sorted_bars = sorted(zip(bar_x, bar_y, bar_colors), key=lambda x: x[1], reverse=True); 
     if sorted_bars: bar_x, bar_y, bar_colors = zip(*sorted_bars)
-    fig_bar = go.Figure(go.Bar(x=bar_x, y=bar_y, marker_color=bar_colors, text=[f"{y:.2f}%" for y in bar_y], textposition='auto')); fig_bar.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=20, t=10, b=40), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
+    bar_state = [list(bar_x), [round(y, 4) for y in bar_y]]; fig_bar = no_update
+    if chart_state.get('bar') != bar_state: fig_bar = go.Figure(go.Bar(x=bar_x, y=bar_y, marker_color=bar_colors, text=[f"{y:.2f}%" for y in bar_y], textposition='auto')); fig_bar.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=30, r=20, t=10, b=40), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'), xaxis=dict(showgrid=False))
     title_suffix = "LIVE VIEW"; 
     if tf_data['tf'] == '15m': title_suffix = "24H VIEW"
     elif tf_data['tf'] == '1w': title_suffix = "LONG TERM"
-    return fig_candle, price_html, metrics_html, fig_bar, f"{full_name} // {title_suffix}", tv_html
-
-@app.callback([Output('markets-table-content', 'children'), Output('trending-content', 'children'), Output('news-content', 'children'), Output('dexscan-content', 'children'), Output('current-page-store', 'data'), Output('page-display', 'children'), Output('prev-btn', 'disabled'), Output('next-btn', 'disabled')], [Input('market-interval', 'n_intervals'), Input('prev-btn', 'n_clicks'), Input('next-btn', 'n_clicks')], [State('current-page-store', 'data')])
-def update_market_trending_news_dex(n, prev_clicks, next_clicks, current_page):
-    market_data = fetch_market_data(); ctx_id = ctx.triggered_id; 
-    if ctx_id == 'prev-btn' and current_page > 1: current_page -= 1
-    if ctx_id == 'next-btn' and current_page < 10: current_page += 1
-    if not market_data: return html.Div("Loading..."), html.Div("Loading..."), html.Div("Loading..."), html.Div("Loading..."), current_page, f"Page {current_page} of 10", True, True
+    return fig_candle, price_html, metrics_html, fig_bar, f"{full_name} // {title_suffix}", tv_html, {'symbol': selected_symbol, 'candle': candle_state, 'bar': bar_state}
+
+def heat_rows(heat):
+    heat = heat.astype('float64').round(4)
+    return np.where(np.isnan(heat), None, heat).tolist()
+
+@app.callback([Output('depth-chart', 'figure'), Output('depth-heatmap', 'figure'), Output('depth-chart-state', 'data')], [Input('depth-interval', 'n_intervals'), Input('coin-select-dropdown', 'value'), Input('main-tabs', 'value')], [State('depth-chart-state', 'data')])
+@timed
+def update_depth(n, selected_symbol, active_tab, chart_state):
+    # the depth curve is redrawn when the book changed; heatmap columns are appended to the grid the browser already has
+    require_tab(active_tab, 'overview')
+    if not selected_symbol: raise PreventUpdate
+    chart_state = chart_state if (chart_state or {}).get('symbol') == selected_symbol else {}
+    view = order_books.get(selected_symbol).view(chart_state.get('first'))
+    if view is None: raise PreventUpdate
+    fig_depth = no_update; (bid_x, bid_y), (ask_x, ask_y) = view['bids'], view['asks']
+    if chart_state.get('version') is not None and chart_state['version'] != view['version']:
+        fig_depth = Patch()
+        for i, (x, y) in enumerate([(bid_x, bid_y), (ask_x, ask_y)]): fig_depth['data'][i]['x'] = (x * USD_TO_INR_RATE).round(4).tolist(); fig_depth['data'][i]['y'] = y.round(6).tolist()
+    elif chart_state.get('version') is None:
+        fig_depth = go.Figure([go.Scatter(x=bid_x * USD_TO_INR_RATE, y=bid_y, fill='tozeroy', line=dict(color='#00CC96', shape='hv', width=1.5), fillcolor='rgba(0,204,150,0.2)', name='Bids'), go.Scatter(x=ask_x * USD_TO_INR_RATE, y=ask_y, fill='tozeroy', line=dict(color='#FF4136', shape='hv', width=1.5), fillcolor='rgba(255,65,54,0.2)', name='Asks')])
+        fig_depth.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=0, r=10, t=10, b=30), showlegend=False, yaxis=dict(gridcolor='rgba(255,255,255,0.05)', title=COIN_PARAMS.get(selected_symbol, {}).get('symbol')), xaxis=dict(showgrid=False, tickformat=',.0f' if view['mid'] * USD_TO_INR_RATE > 1000 else ''), hovermode='x', hoverlabel=dict(bgcolor="#1e1e1e", font_size=12, font_color="white", bordercolor="#333"))
+    times, heat = view['times'], view['heat']; fig_heat = no_update
+    added = int(len(times) - np.searchsorted(times, chart_state.get('last', 0), side='right'))
+    if chart_state.get('first') != view['first'] or not chart_state.get('n') or added > DEPTH_HEATMAP_COLUMNS // 4:
+        y = (view['first'] + np.arange(2 * DEPTH_BINS) + 0.5) * view['step'] * USD_TO_INR_RATE
+        fig_heat = go.Figure(go.Heatmap(x=[], y=y.tolist(), z=[], transpose=True, colorscale='Viridis', hoverongaps=False, showscale=False, hovertemplate='%{y:,.2f}<br>%{z:.4f}<extra></extra>'))
+        fig_heat.update_layout(template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=0, r=10, t=10, b=30), yaxis=dict(showgrid=False, tickformat=',.0f'), xaxis=dict(showgrid=False))
+        fig_heat = fig_heat.to_dict(); fig_heat['data'][0]['x'] = plot_values(pd.Series(pd.to_datetime(times, unit='ms', utc=True).tz_convert('Asia/Kolkata'))); fig_heat['data'][0]['z'] = heat_rows(heat); count = len(times)
+    elif added:
+        fig_heat = Patch(); x, z = fig_heat['data'][0]['x'], fig_heat['data'][0]['z']; count = chart_state['n'] + added
+        x.extend(plot_values(pd.Series(pd.to_datetime(times[-added:], unit='ms', utc=True).tz_convert('Asia/Kolkata')))); z.extend(heat_rows(heat[-added:]))
+        for _ in range(max(count - DEPTH_HEATMAP_COLUMNS, 0)): del x[0]; del z[0]
+        count = min(count, DEPTH_HEATMAP_COLUMNS)
+    else: count = chart_state['n']
+    return fig_depth, fig_heat, {'symbol': selected_symbol, 'version': view['version'], 'first': view['first'], 'last': int(times[-1]) if len(times) else 0, 'n': count}
+
+app.clientside_callback('''function(activeTab, config) {
+    const live = config.tabs[activeTab] || [];
+    return config.intervals.map(i => !live.includes(i));
+}''', [Output(i, 'disabled') for i in PANEL_INTERVALS], Input('main-tabs', 'value'), State('ui-config', 'data'))
+
+app.clientside_callback('''function(symbol, tf, activeTab, config) {
+    const topics = !config.push ? [] : activeTab === 'overview' && symbol && tf ? ['candles:' + symbol + ':' + tf.tf, 'ticker:' + symbol] : activeTab === 'screeners' ? ['market'] : [];
+    window.livePush.subscribe(topics); window.chartWidths.later();
+    return topics;
+}''', Output('push-topics', 'data'), [Input('coin-select-dropdown', 'value'), Input('timeframe-store', 'data'), Input('main-tabs', 'value')], State('ui-config', 'data'))
+
+@app.callback([Output('markets-table-content', 'children'), Output('current-page-store', 'data'), Output('page-display', 'children'), Output('prev-btn', 'disabled'), Output('next-btn', 'disabled')], [Input('market-interval', 'n_intervals'), Input('prev-btn', 'n_clicks'), Input('next-btn', 'n_clicks'), Input('page-size-dropdown', 'value'), Input('main-tabs', 'value')], [State('current-page-store', 'data')])
+@timed
+def update_screener(n, prev_clicks, next_clicks, page_size, active_tab, current_page):
+    require_tab(active_tab, 'screeners')
+    market_data = market_hub.market(); ctx_id = ctx.triggered_id; page_size = page_size or PAGE_SIZES[0]
+    if not market_data: return html.Div("Loading..."), current_page, f"Page {current_page}", True, True
+    pages = max(-(-len(market_data) // page_size), 1)
+    if ctx_id == 'prev-btn': current_page -= 1
+    if ctx_id == 'next-btn': current_page += 1
+    current_page = min(max(current_page, 1), pages)
+    start_idx = (current_page - 1) * page_size; end_idx = start_idx + page_size; page_data = market_data.page(start_idx, end_idx); sparklines = market_data.sparklines(start_idx, end_idx)
+    header = html.Tr([html.Th("#"), html.Th("ASSET"), html.Th("PRICE"), html.Th("MARKET CAP"), html.Th("VOLUME (24H)"), html.Th("CHANGE (24H)"), html.Th("7D %"), html.Th("TREND")]); rows = []
+    for coin, spark in zip(page_data, sparklines):
+        col24 = 'positive' if coin['change_24h'] >= 0 else 'negative'; col7d = 'positive' if coin['change_7d'] >= 0 else 'negative'
+        row = html.Tr(**{'data-symbol': coin['symbol']}, children=[html.Td(coin['rank'], className='rank-cell'), html.Td(html.Div(className='coin-cell', children=[html.Img(src=get_icon_url(coin['symbol']), className='coin-icon'), html.Div([html.Div(coin['name'], className='coin-name'), html.Div(coin['symbol'].split('/')[0], className='coin-symbol')])])), html.Td(format_currency(coin['price']), className='price-cell'), html.Td(format_compact(coin['mkt_cap'])), html.Td(format_compact(coin['volume'])), html.Td(f"{coin['change_24h']:.2f}%", className=col24), html.Td(f"{coin['change_7d']:.2f}%", className=col7d), html.Td(html.Img(src=spark, width=SPARK_WIDTH, height=SPARK_HEIGHT), className='spark-cell')]); rows.append(row)
+    table = html.Table([html.Thead(header), html.Tbody(rows)], className='crypto-table')
+    return table, current_page, f"Page {current_page} of {pages}", (current_page == 1), (current_page == pages)
+
+@app.callback(Output('trending-content', 'children'), [Input('market-interval', 'n_intervals'), Input('main-tabs', 'value')])
+@timed
+def update_trending(n, active_tab):
+    require_tab(active_tab, 'trending')
+    market_data = market_hub.market()
+    if not market_data: return html.Div("Loading...")
+    gainers, losers = market_data.movers(5)
+    def create_trend_list(items):
+        rows = []
+        for i, coin in enumerate(items): rows.append(html.Div(className='trending-row', children=[html.Div(className='coin-cell', children=[html.Div(f"{i+1}", className='trending-rank'), html.Img(src=get_icon_url(coin['symbol']), className='coin-icon'), html.Div([html.Div(coin['name'], className='trending-name'), html.Div(format_currency(coin['price']), className='trending-price')])]), html.Div(f"{coin['change_24h']:.2f}%", className='trending-change-up' if coin['change_24h']>=0 else 'trending-change-down')]))
+        return rows
+    trending_html = [html.Div(className='trending-card', children=[html.Div("🔥 TOP GAINERS", className='trending-header trending-change-up'), html.Div(create_trend_list(gainers))]), html.Div(className='trending-card', children=[html.Div("📉 TOP LOSERS", className='trending-header trending-change-down'), html.Div(create_trend_list(losers))])]
+    return trending_html
+
+@app.callback(Output('dexscan-content', 'children'), [Input('market-interval', 'n_intervals'), Input('main-tabs', 'value')])
+@timed
+def update_dexscan(n, active_tab):
+    require_tab(active_tab, 'dexscan')
+    market_data = market_hub.market()
+    if not market_data: return html.Div("Loading...")
     dex_cards = []
     for cat, coins in DEX_CATEGORIES.items():
         rows = []
-        for i, sym in enumerate(coins):
+        for i, coin_data in enumerate(market_data.lookup(coins)):
             try:
-                coin_data = next((c for c in market_data if c['symbol'] == sym), None)
                 if not coin_data: continue
                 vol = coin_data['volume'] * random.uniform(0.1, 0.5); fdv = coin_data['mkt_cap'] * random.uniform(0.8, 1.2); price = coin_data['price']; change = coin_data['change_24h']
-                rows.append(html.Div(className='dex-row', children=[html.Div(className='dex-col-left', children=[html.Div(f"{i+1}", className='dex-rank'), html.Img(src=get_icon_url(sym), className='dex-icon'), html.Div(coin_data['name'], className='dex-name')]), html.Div(className='dex-col-mid', children=[html.Div(f"Vol {format_compact(vol)}"), html.Div(f"FDV {format_compact(fdv)}")]), html.Div(className='dex-col-right', children=[html.Div(format_currency(price), className='dex-price'), html.Div(f"{change:.2f}%", className='dex-change-down' if change >=0 else 'dex-change-up')])]))
+                rows.append(html.Div(className='dex-row', children=[html.Div(className='dex-col-left', children=[html.Div(f"{i+1}", className='dex-rank'), html.Img(src=get_icon_url(coin_data['symbol']), className='dex-icon'), html.Div(coin_data['name'], className='dex-name')]), html.Div(className='dex-col-mid', children=[html.Div(f"Vol {format_compact(vol)}"), html.Div(f"FDV {format_compact(fdv)}")]), html.Div(className='dex-col-right', children=[html.Div(format_currency(price), className='dex-price'), html.Div(f"{change:.2f}%", className='dex-change-down' if change >=0 else 'dex-change-up')])]))
             except: continue
-        dex_cards.append(html.Div(className='dex-card', children=[html.Div(className='dex-header', style={'display':'flex','justifyContent':'space-between','marginBottom':'15px','color':'#fff','fontWeight':'bold'}, children=[html.Span(cat), html.Span(">", style={'color': '#666', 'fontSize': '0.9rem'})]), html.Div(rows)]))
-    start_idx = (current_page - 1) * 10; end_idx = start_idx + 10; page_data = market_data[start_idx:end_idx]
-    header = html.Tr([html.Th("#"), html.Th("ASSET"), html.Th("PRICE"), html.Th("MARKET CAP"), html.Th("VOLUME (24H)"), html.Th("CHANGE (24H)"), html.Th("7D %"), html.Th("TREND")]); rows = []
-    for coin in page_data:
-        col24 = 'positive' if coin['change_24h'] >= 0 else 'negative'; col7d = 'positive' if coin['change_7d'] >= 0 else 'negative'; spark_color = '#00CC96' if coin['change_7d'] >= 0 else '#FF4136'
-        fig_spark = go.Figure(go.Scatter(y=coin['history'], mode='lines', line=dict(color=spark_color, width=2), fill='tozeroy', fillcolor=f"rgba({int(spark_color[1:3],16)}, {int(spark_color[3:5],16)}, {int(spark_color[5:7],16)}, 0.1)")); fig_spark.update_layout(template='plotly_dark', height=40, width=120, margin=dict(l=0, r=0, t=0, b=0), xaxis=dict(visible=False), yaxis=dict(visible=False), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-        row = html.Tr([html.Td(coin['rank'], style={'color':'#666'}), html.Td(html.Div(className='coin-cell', children=[html.Img(src=get_icon_url(coin['symbol']), className='coin-icon'), html.Div([html.Div(coin['name'], style={'fontWeight': '600'}), html.Div(coin['symbol'].split('/')[0], style={'fontSize':'0.75rem', 'color':'#888'})])])), html.Td(format_currency(coin['price']), style={'fontWeight': '600', 'fontFamily':'monospace'}), html.Td(format_compact(coin['mkt_cap'])), html.Td(format_compact(coin['volume'])), html.Td(f"{coin['change_24h']:.2f}%", className=col24), html.Td(f"{coin['change_7d']:.2f}%", className=col7d), html.Td(dcc.Graph(figure=fig_spark, config={'staticPlot': True}), style={'padding':'0'})]); rows.append(row)
-    table = html.Table([html.Thead(header), html.Tbody(rows)], className='crypto-table')
-    gainers = sorted(market_data, key=lambda x: x['change_24h'], reverse=True)[:5]; losers = sorted(market_data, key=lambda x: x['change_24h'])[:5]
-    def create_trend_list(items):
-        rows = []
-        for i, coin in enumerate(items): rows.append(html.Div(className='trending-row', style={'display':'flex','justifyContent':'space-between','padding':'12px 0','borderBottom':'1px solid #222'}, children=[html.Div(className='coin-cell', children=[html.Div(f"{i+1}", style={'color':'#666','width':'20px'}), html.Img(src=get_icon_url(coin['symbol']), className='coin-icon'), html.Div([html.Div(coin['name'], style={'fontWeight': 'bold'}), html.Div(format_currency(coin['price']), style={'fontSize':'0.85rem'})])]), html.Div(f"{coin['change_24h']:.2f}%", style={'color': '#00CC96' if coin['change_24h']>=0 else '#FF4136', 'fontWeight':'bold'})]))
-        return rows
-    trending_html = [html.Div(className='trending-card', children=[html.Div("🔥 TOP GAINERS", className='trending-header', style={'color': '#00CC96','fontWeight':'bold','marginBottom':'20px'}), html.Div(create_trend_list(gainers))]), html.Div(className='trending-card', children=[html.Div("📉 TOP LOSERS", className='trending-header', style={'color': '#FF4136','fontWeight':'bold','marginBottom':'20px'}), html.Div(create_trend_list(losers))])]
+        dex_cards.append(html.Div(className='dex-card', children=[html.Div(className='dex-header', children=[html.Span(cat), html.Span(">", className='dex-more')]), html.Div(rows)]))
+    return dex_cards
+
+@app.callback(Output('news-content', 'children'), [Input('news-interval', 'n_intervals'), Input('main-tabs', 'value')])
+@timed
+def update_news(n, active_tab):
+    require_tab(active_tab, 'news')
     news_items = generate_crypto_news(); news_cards = []
-    for news in news_items: card = html.Div(className='news-card', children=[html.Img(src=news['image'], className='news-img'), html.Div(className='news-content', children=[html.Span(news['source'], style={'backgroundColor':'#2962ff','color':'white','padding':'2px 8px','borderRadius':'4px','fontSize':'0.7rem'}), html.Div(news['title'], style={'fontSize':'1.1rem','fontWeight':'bold','margin':'10px 0','lineHeight':'1.4'}), html.P(news['desc'], style={'color':'#aaa', 'fontSize':'0.9rem'}), html.Div(children=[html.Span(news['time']), html.A("Read More >", href="#", style={'color':'#00CC96', 'textDecoration':'none'})], style={'display':'flex','justifyContent':'space-between','color':'#666','fontSize':'0.8rem','marginTop':'15px'})])]); news_cards.append(card)
-    return table, trending_html, news_cards, dex_cards, current_page, f"Page {current_page} of 10", (current_page == 1), (current_page == 10)
+    for news in news_items: card = html.Div(className='news-card', children=[html.Img(src=news['image'], className='news-img'), html.Div(className='news-content', children=[html.Span(news['source'], className='news-source'), html.Div(news['title'], className='news-title'), html.P(news['desc'], className='news-desc'), html.Div(className='news-footer', children=[html.Span(news['time']), html.A("Read More >", href="#")])])]); news_cards.append(card)
+    return news_cards
+
+def format_alert_value(metric, value):
+    return format_currency(value) if metric == 'price' else (f"{value:.2f}%" if metric == 'change_24h' else f"{value:.2f}")
+
+@app.callback([Output('alerts-active', 'children'), Output('alerts-active-title', 'children'), Output('alerts-fired', 'children'), Output('alert-form-msg', 'children'), Output('alert-symbol', 'options')], [Input('alerts-interval', 'n_intervals'), Input('alert-add-btn', 'n_clicks'), Input({'type': 'alert-remove', 'index': ALL}, 'n_clicks'), Input('main-tabs', 'value')], [State('alert-symbol', 'value'), State('alert-metric', 'value'), State('alert-direction', 'value'), State('alert-threshold', 'value')])
+@timed
+def update_alerts(n, add_clicks, remove_clicks, active_tab, symbol, metric, direction, threshold):
+    require_tab(active_tab, 'alerts')
+    trigger = ctx.triggered_id; clicked = bool(ctx.triggered and ctx.triggered[0]['value']); message = no_update; options = no_update
+    if trigger == 'alert-add-btn' and clicked:
+        if threshold is None or not symbol: message = "Enter a threshold first."
+        else: alert_book.add([{'symbol': symbol, 'metric': metric, 'direction': direction, 'threshold': threshold}]); message = f"Alert set: {symbol} {ALERT_METRICS[metric]} crosses {direction} {format_alert_value(metric, threshold)}"
+    elif isinstance(trigger, dict) and clicked: alert_book.remove([trigger['index']])
+    if trigger == 'main-tabs':
+        snapshot = market_hub.market()
+        options = DROPDOWN_OPTIONS + [{'label': s, 'value': s} for s in (snapshot.frame.index if snapshot is not None else []) if s not in SYMBOL_MAP]
+    active, fired, total = alert_book.view()
+    condition = lambda a: f"{ALERT_METRICS[a['metric']]} crosses {a['direction']}"
+    active_rows = [html.Tr([html.Td(a['symbol']), html.Td(condition(a)), html.Td(format_alert_value(a['metric'], a['threshold']), style={'fontFamily': 'monospace'}), html.Td(html.Button("✕", id={'type': 'alert-remove', 'index': a['id']}, className='page-btn'))]) for a in active]
+    fired_rows = [html.Tr([html.Td(datetime.fromtimestamp(a['fired_at']).strftime('%d %b %H:%M:%S'), style={'color': '#666'}), html.Td(a['symbol']), html.Td(condition(a)), html.Td(format_alert_value(a['metric'], a['threshold'])), html.Td(format_alert_value(a['metric'], a['value']), className='positive' if a['direction'] == 'above' else 'negative')]) for a in fired]
+    active_table = html.Table([html.Thead(html.Tr([html.Th("ASSET"), html.Th("CONDITION"), html.Th("THRESHOLD"), html.Th("")])), html.Tbody(active_rows)], className='crypto-table') if active_rows else "No active alerts"
+    fired_table = html.Table([html.Thead(html.Tr([html.Th("TIME"), html.Th("ASSET"), html.Th("CONDITION"), html.Th("THRESHOLD"), html.Th("VALUE")])), html.Tbody(fired_rows)], className='crypto-table') if fired_rows else "No alerts fired yet"
+    return active_table, f"ACTIVE ({total:,}{', newest ' + str(len(active)) + ' shown' if total > len(active) else ''})", fired_table, message, options
 
 if __name__ == '__main__':
     app.run_server(debug=True)
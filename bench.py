@@ -0,0 +1,656 @@
+"""Benchmarks and load tests for the dashboard, run against a deterministic offline exchange.
+
+Callback latency:         python bench.py callbacks --repeat 20
+Cycle indicators:         python bench.py indicators --sizes 100,365,1000,2000,5000
+Incremental indicators:   python bench.py indicators --verify --sizes 100,365,1000
+Sparklines per page:      python bench.py sparklines --rows 10,50,100
+Load test under gunicorn: python bench.py load --sessions 50 --seconds 60 --workers 4
+Exchange client behaviour: python bench.py resilience
+Cold-start warm-up:       python bench.py warmup --latency 0.1
+Worker startup:           python bench.py startup --repeat 5
+Timeframe switches:       python bench.py timeframes
+Live push vs polling:     python bench.py push --viewers 50,200,500 --seconds 20
+Alert evaluation:         python bench.py alerts --alerts 1000,10000,100000 --symbols 100
+Order book maintenance:   python bench.py depth --diffs 5000 [--fixture depth.jsonl]
+Simulated market:         python bench.py sim --pairs 400,5000
+Bytes per session:        python bench.py traffic --polls 20
+
+The load test serves bench:server, i.e. the dashboard with FakeExchange installed in place of ccxt.
+"""
+import argparse
+import asyncio
+import atexit
+import collections
+import contextlib
+import gzip
+import json
+import multiprocessing
+import os
+import selectors
+import socket
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import quote
+
+import ccxt
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from dash import dcc, html
+from plotly.io.json import to_json_plotly
+
+BENCH_PID = os.getpid()
+os.environ.setdefault('WARMUP', '0')  # the background warm-up would talk to the real exchange
+if 'CANDLE_CACHE_DIR' not in os.environ:
+    os.environ['CANDLE_CACHE_DIR'] = tempfile.mkdtemp(prefix='bench-candles-')
+    atexit.register(lambda: os.getpid() == BENCH_PID and shutil.rmtree(os.environ['CANDLE_CACHE_DIR'], ignore_errors=True))
+if 'ALERTS_DIR' not in os.environ:
+    os.environ['ALERTS_DIR'] = tempfile.mkdtemp(prefix='bench-alerts-')
+    atexit.register(lambda: os.getpid() == BENCH_PID and shutil.rmtree(os.environ['ALERTS_DIR'], ignore_errors=True))
+
+import app
+import stream_replay
+
+
+class FakeExchange:
+    """ccxt-shaped exchange whose prices are a pure function of symbol and time, so runs are reproducible."""
+    id = 'binance'
+
+    def __init__(self, pairs=200, latency=0.0):
+        self.symbols = list(app.SYMBOL_MAP) + [f'SIM{i}/USDT' for i in range(max(pairs - len(app.SYMBOL_MAP), 0))]
+        self.latency = latency
+        self.fail = None  # exception class raised by every call, to simulate throttling or outages
+        self.calls = multiprocessing.Value('q', 0)  # shared with forked gunicorn workers
+        self.thread_calls = collections.Counter()  # per thread of this process, to tell a request's calls from the pollers'
+
+    def _call(self):
+        with self.calls.get_lock(): self.calls.value += 1; self.thread_calls[threading.get_ident()] += 1
+        if self.latency: time.sleep(self.latency)
+        if self.fail is not None: raise self.fail('fake exchange: injected failure')
+
+    def price(self, symbol, ts):
+        seed = zlib.crc32(symbol.encode())
+        base = {'BTC/USDT': 65000.0, 'ETH/USDT': 3200.0}.get(symbol, 1 + seed % 5000 / 10)
+        t = np.asarray(ts, dtype=float)
+        return base * np.exp(0.3 * np.sin(t / 8.64e9 + seed % 97) + 0.02 * np.sin(t / 3.6e6 + seed % 13))
+
+    def load_markets(self, reload=False):
+        self._call()
+        return {s: {'symbol': s, 'base': s.split('/')[0], 'quote': 'USDT'} for s in self.symbols}
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        self._call()
+        step = app.TIMEFRAME_MS[timeframe]; offset = app.BUCKET_OFFSET_MS.get(timeframe, 0); now = int(time.time() * 1000); limit = min(limit or 500, app.OHLCV_PAGE_LIMIT)
+        start = -(-(since - offset) // step) * step + offset if since is not None else (now - offset) // step * step + offset - (limit - 1) * step
+        ts = np.arange(start, min(now, start + (limit - 1) * step) + 1, step, dtype=np.int64)
+        if not len(ts): return []
+        close_at = np.minimum(ts + step - 1, now); o = self.price(symbol, ts); c = self.price(symbol, close_at)
+        rows = np.column_stack([ts, o, np.maximum(o, c) * 1.002, np.minimum(o, c) * 0.998, c, 100 + zlib.crc32(symbol.encode()) % 50 + (ts // step) % 17]).tolist()
+        for row in rows: row[0] = int(row[0])
+        return rows
+
+    def fetch_ticker(self, symbol, params=None):
+        return self.fetch_tickers([symbol])[symbol]
+
+    def fetch_tickers(self, symbols=None, params=None):
+        self._call()
+        now = int(time.time() * 1000); symbols = symbols or self.symbols
+        last = {s: float(self.price(s, now)) for s in symbols}; open_24h = {s: float(self.price(s, now - 86_400_000)) for s in symbols}
+        return {s: {'symbol': s, 'timestamp': now, 'last': last[s], 'open': open_24h[s], 'percentage': (last[s] / open_24h[s] - 1) * 100, 'quoteVolume': 1e6 * (1 + zlib.crc32(s.encode()) % 1000), 'baseVolume': 1e6 / last[s]} for s in symbols}
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        self._call()
+        now = int(time.time() * 1000)
+        return dict(app.simulate_order_book(float(self.price(symbol, now)), limit or 100, np.random.default_rng([zlib.crc32(symbol.encode()), now // 1000])), nonce=now)
+
+
+class AsyncFakeExchange:
+    """ccxt.async_support-shaped view of a FakeExchange: same data, with the latency awaited instead of slept."""
+    def __init__(self, fake, latency):
+        self.fake = fake; self.latency = latency
+
+    async def fetch_ohlcv(self, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self.fake.fetch_ohlcv(*args, **kwargs)
+
+    async def fetch_tickers(self, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self.fake.fetch_tickers(*args, **kwargs)
+
+    async def close(self):
+        pass
+
+
+fake_exchange = FakeExchange()
+app.exchange = app.ExchangeClient(app.InstrumentedExchange(fake_exchange))
+app.markets_loader = None  # keep the real client's background market load off the network
+server = app.server
+
+
+# --- CALLBACKS ---
+# one scenario per tab: the output that identifies the callback and the initial input/state values
+SCENARIOS = {
+    'overview': ('live-candlestick-chart.figure', {'interval-component.n_intervals': 0, 'coin-select-dropdown.value': app.DEFAULT_SYMBOL, 'timeframe-store.data': {'tf': '1m', 'limit': 50}, 'main-tabs.value': 'overview', 'overview-chart-state.data': None}),
+    'analysis': ('pi-cycle-chart.figure', {'analytics-interval.n_intervals': 0, 'analysis-coin-dropdown.value': app.DEFAULT_SYMBOL, 'main-tabs.value': 'analysis', 'analytics-chart-state.data': None}),
+    'global': ('global-mkt-cap.children', {'global-interval.n_intervals': 0, 'main-tabs.value': 'global', 'spot-chart-state.data': None}),
+    'rwa': ('rwa-mkt-chart.figure', {'rwa-interval.n_intervals': 0, 'main-tabs.value': 'rwa', 'rwa-chart-state.data': None}),
+    'screeners': ('markets-table-content.children', {'market-interval.n_intervals': 0, 'prev-btn.n_clicks': None, 'next-btn.n_clicks': None, 'page-size-dropdown.value': 10, 'main-tabs.value': 'screeners', 'current-page-store.data': 1}),
+    'trending': ('trending-content.children', {'market-interval.n_intervals': 0, 'main-tabs.value': 'trending'}),
+    'dexscan': ('dexscan-content.children', {'market-interval.n_intervals': 0, 'main-tabs.value': 'dexscan'}),
+    'news': ('news-content.children', {'news-interval.n_intervals': 0, 'main-tabs.value': 'news'}),
+}
+TAB_INTERVAL_MS = {tab: app.PANEL_INTERVALS[app.TAB_INTERVALS[tab][0]] for tab in SCENARIOS}
+
+
+class Session:
+    """One browser tab polling a panel: builds _dash-update-component bodies and threads returned store data back in."""
+    def __init__(self, tab):
+        self.tab = tab; output, values = SCENARIOS[tab]; self.values = dict(values)
+        self.key, self.callback = next((k, v) for k, v in app.app.callback_map.items() if f'.{output}.' in f'.{k}.')
+        self.outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in self.key.strip('.').split('...')]
+
+    def body(self):
+        inputs = [dict(i, value=self.values.get(f"{i['id']}.{i['property']}")) for i in self.callback['inputs']]
+        state = [dict(s, value=self.values.get(f"{s['id']}.{s['property']}")) for s in self.callback['state']]
+        first = self.callback['inputs'][0]
+        return {'output': self.key, 'outputs': self.outputs if len(self.outputs) > 1 else self.outputs[0], 'inputs': inputs, 'state': state, 'changedPropIds': [f"{first['id']}.{first['property']}"]}
+
+    def absorb(self, status, payload):
+        first = self.callback['inputs'][0]; self.values[f"{first['id']}.{first['property']}"] += 1
+        if status != 200: return
+        for component, props in json.loads(payload).get('response', {}).items():
+            for prop, value in props.items():
+                if f'{component}.{prop}' in self.values: self.values[f'{component}.{prop}'] = value
+
+
+def bench_callbacks(tabs, repeat):
+    client = app.server.test_client()
+    print(f"{'tab':>10} {'cold ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'cold bytes':>11} {'warm bytes':>11} {'exch calls':>11}")
+    for tab in tabs:
+        session = Session(tab); timings = []; sizes = []; calls = fake_exchange.calls.value
+        for _ in range(repeat + 1):
+            started = time.perf_counter(); r = client.post('/_dash-update-component', json=session.body()); timings.append(time.perf_counter() - started)
+            sizes.append(len(r.data)); session.absorb(r.status_code, r.data)
+        warm = 1000 * np.array(timings[1:])
+        print(f'{tab:>10} {1000 * timings[0]:>9.1f} {np.percentile(warm, 50):>8.2f} {np.percentile(warm, 99):>8.2f} {sizes[0]:>11} {int(np.median(sizes[1:])):>11} {fake_exchange.calls.value - calls:>11}')
+
+
+# --- INDICATORS ---
+def bench_indicators(sizes, repeat):
+    print(f"{'rows':>6} {'ms':>8}")
+    for n in sizes:
+        rows = np.array(fake_exchange.fetch_ohlcv(app.DEFAULT_SYMBOL, '1d', limit=n))
+        df = pd.DataFrame(rows[:, 1:], columns=['open', 'high', 'low', 'close', 'volume']); timings = []
+        for _ in range(repeat):
+            frame = df.copy(); started = time.perf_counter(); app.calculate_cycle_indicators(frame); timings.append(time.perf_counter() - started)
+        print(f'{len(df):>6} {1000 * float(np.median(timings)):>8.2f}')
+
+
+INDICATOR_COLUMNS = ['111DMA', '350DMA', 'log_price', 'Rainbow_Base', '365DMA', 'Puell', 'RSI']
+
+
+def verify_indicators(limits, ticks, rtol=1e-8):
+    """Feed a series candle by candle, with ticks on the open candle in between, and check every IndicatorEngine
+    update against calculate_cycle_indicators on the same view: growing while it is shorter than the limit, then sliding."""
+    rng = np.random.default_rng(7); n = max(limits) + 300
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.03, n))); close[n // 3:n // 3 + 20] = close[n // 3]  # a flat stretch: RSI over zero gain and loss
+    rows = np.column_stack([np.arange(n) * app.TIMEFRAME_MS['1d'], close, close * 1.01, close * 0.99, close, rng.uniform(1e3, 1e4, n)])
+    print(f"{'limit':>6} {'growing':>8} {'sliding':>8} {'ticks':>6} {'max rel err':>12}")
+    for limit in limits:
+        series = app.CandleSeries(app.DEFAULT_SYMBOL, '1d'); series.want(limit); engine = app.IndicatorEngine()
+        counts = {'growing': 0, 'sliding': 0, 'ticks': 0}; worst = 0.0
+        for i in range(len(rows)):
+            for tick in range(ticks + 1):
+                row = rows[i].copy()
+                if tick: row[4] *= 1 + rng.normal(0, 0.01); row[2], row[3] = max(row[2], row[4]), min(row[3], row[4])
+                series._put(row[None])
+                if series.size < 20: continue
+                df, *scores = engine.cycle(series, limit)
+                expected, *expected_scores = app.calculate_cycle_indicators(series.frame(limit))
+                for name in INDICATOR_COLUMNS:
+                    actual, reference = df[name].to_numpy(), expected[name].to_numpy()
+                    np.testing.assert_allclose(actual, reference, rtol=rtol, equal_nan=True, err_msg=f'{name} at limit {limit}, row {i}, tick {tick}')
+                    both = np.isfinite(reference) & (reference != 0)
+                    if both.any(): worst = max(worst, float(np.max(np.abs(actual[both] / reference[both] - 1))))
+                np.testing.assert_allclose(scores[:3], expected_scores, rtol=rtol, err_msg=f'scores at limit {limit}, row {i}, tick {tick}')
+                counts['ticks' if tick else 'growing' if series.size <= limit else 'sliding'] += 1
+        print(f"{limit:>6} {counts['growing']:>8} {counts['sliding']:>8} {counts['ticks']:>6} {worst:>12.1e}")
+    print(f'IndicatorEngine matches calculate_cycle_indicators within rtol {rtol:g}')
+
+
+# --- SPARKLINES ---
+
+
+def synthetic_snapshot(n, seed=7):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(1, 5_000_000, n); change_24h = rng.uniform(-9, 9, n)
+    snapshot = app.build_market_snapshot([f'C{i}/USDT' for i in range(n)], [f'C{i}' for i in range(n)], price, rng.uniform(1e6, 1e9, n), change_24h, change_24h * 3.2)
+    snapshot.history = price[:, None] * np.cumprod(1 + rng.normal(0, 0.01, (n, app.SPARK_POINTS)), axis=1)
+    return snapshot
+
+
+def plotly_sparklines(snapshot, rows):
+    cells = []
+    for coin in snapshot.page(0, rows):
+        spark_color = '#00CC96' if coin['change_7d'] >= 0 else '#FF4136'
+        fig_spark = go.Figure(go.Scatter(y=coin['history'], mode='lines', line=dict(color=spark_color, width=2), fill='tozeroy', fillcolor=f"rgba({int(spark_color[1:3],16)}, {int(spark_color[3:5],16)}, {int(spark_color[5:7],16)}, 0.1)")); fig_spark.update_layout(template='plotly_dark', height=40, width=120, margin=dict(l=0, r=0, t=0, b=0), xaxis=dict(visible=False), yaxis=dict(visible=False), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+        cells.append(html.Td(dcc.Graph(figure=fig_spark, config={'staticPlot': True}), style={'padding': '0'}))
+    return cells
+
+
+def svg_sparklines(snapshot, rows):
+    return [html.Td(html.Img(src=spark, width=app.SPARK_WIDTH, height=app.SPARK_HEIGHT, style={'display': 'block'}), style={'padding': '0'}) for spark in snapshot.sparklines(0, rows)]
+
+
+def measure(render, snapshot, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter(); payload = to_json_plotly(render(snapshot, rows)).encode(); timings.append(time.perf_counter() - started)
+    return len(payload), len(gzip.compress(payload)), 1000 * float(np.median(timings))
+
+
+def bench_sparklines(rows, repeat):
+    snapshot = synthetic_snapshot(max(rows))
+    print(f"{'rows':>5} {'renderer':>8} {'bytes':>9} {'gzip':>8} {'ms':>8}")
+    for n in rows:
+        for name, render in (('plotly', plotly_sparklines), ('svg', svg_sparklines)):
+            size, packed, ms = measure(render, snapshot, n, repeat)
+            print(f'{n:>5} {name:>8} {size:>9} {packed:>8} {ms:>8.2f}')
+
+
+# --- RESILIENCE ---
+def bench_resilience(sessions):
+    fake = FakeExchange(latency=0.2); client = app.ExchangeClient(fake, backoff=0.01)
+
+    def burst(call):
+        errors = []; threads = [threading.Thread(target=lambda: errors.append(None) if call() else errors.append('empty')) for _ in range(sessions)]
+        started = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        return time.perf_counter() - started
+
+    calls = fake.calls.value; elapsed = burst(lambda: client.fetch_ohlcv('BTC/USDT', '1m', limit=50))
+    print(f'single-flight: {sessions} concurrent identical fetch_ohlcv -> {fake.calls.value - calls} exchange call(s) in {elapsed:.2f}s')
+    fake.latency = 0; budget_dir = tempfile.mkdtemp(dir=app.CANDLE_CACHE_DIR)
+    budget = app.ExchangeClient(fake, weight_per_minute=600, budget_path=os.path.join(budget_dir, 'solo.bin'), queue_seconds=0.5); calls = fake.calls.value; started = time.perf_counter()
+    for i in range(120): budget.fetch_tickers()
+    print(f'weight budget: 600/min, 120 fetch_tickers (weight 80) -> {fake.calls.value - calls} reached the exchange, the rest served stale, in {time.perf_counter() - started:.2f}s')
+    workers, seconds, path = 4, 3.0, os.path.join(budget_dir, 'shared.bin')
+
+    def spend():
+        client = app.ExchangeClient(fake, budget_path=path, queue_seconds=0.1); deadline = time.time() + seconds
+        while time.time() < deadline:
+            try: client.fetch_tickers(['BTC/USDT'] * 101)  # weight 80
+            except app.ExchangeThrottled: pass  # nothing cached yet to serve stale
+    calls = fake.calls.value; procs = [multiprocessing.get_context('fork').Process(target=spend) for _ in range(workers)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    allowed = (app.EXCHANGE_WEIGHT_BURST + app.EXCHANGE_WEIGHT_PER_MINUTE / 60 * seconds) / 80
+    print(f'shared budget: {workers} processes for {seconds:.0f}s at weight 80 -> {fake.calls.value - calls} calls, host budget allows {allowed:.1f}')
+    fake.fail = ccxt.RateLimitExceeded
+    try: stale = client.fetch_ohlcv('BTC/USDT', '1m', limit=50); print(f'HTTP 429: served {len(stale)} stale candles, cooling down for {client.blocked_until - time.time():.0f}s')
+    except ccxt.BaseError as e: print(f'HTTP 429 with nothing cached: {type(e).__name__}')
+    calls = fake.calls.value; client.fetch_ohlcv('BTC/USDT', '1m', limit=50)
+    print(f'during cooldown: {fake.calls.value - calls} exchange call(s)')
+    fake.fail = ccxt.RequestTimeout; client.blocked_until = 0; calls = fake.calls.value
+    try: client.fetch_ticker('ETH/USDT')
+    except ccxt.RequestTimeout: print(f'timeouts: gave up after {fake.calls.value - calls} attempts with jittered backoff')
+
+
+# --- WARM-UP ---
+def bench_warmup(latency, concurrency):
+    windows = app.warmup_windows(); fake = FakeExchange(latency=latency); started = time.perf_counter()
+    for symbol in app.TRACKER_SYMBOLS:
+        for timeframe, limit in windows.items():
+            for since, page in app.ohlcv_pages(timeframe, limit): fake.fetch_ohlcv(symbol, timeframe, since=since, limit=page)
+    fake.fetch_tickers()
+    print(f'serial:          {fake.calls.value} requests in {time.perf_counter() - started:.2f}s')
+    for label in ('async, cold', 'async, disk warm'):
+        if label.endswith('cold'): shutil.rmtree(app.CANDLE_CACHE_DIR, ignore_errors=True)
+        app.candle_store = app.CandleStore(); fake = FakeExchange(); started = time.perf_counter()
+        app.warm_up(client=AsyncFakeExchange(fake, latency), concurrency=concurrency)
+        ready = sum(app.candle_store.series(s, tf).size > 0 for s in app.TRACKER_SYMBOLS for tf in windows)
+        print(f'{label + ":":<16} {fake.calls.value} requests in {time.perf_counter() - started:.2f}s, {ready}/{len(app.TRACKER_SYMBOLS) * len(windows)} series ready')
+
+
+# --- TIMEFRAMES ---
+def bench_timeframes(symbol, repeat):
+    app.warm_up(symbols=[symbol], client=AsyncFakeExchange(fake_exchange, 0))
+    print(f"{'preset':>7} {'tf':>4} {'source':>7} {'exch calls':>11} {'switch ms':>10} {'resample us':>12}")
+    for label, preset in app.TIMEFRAME_PRESETS.items():
+        calls = fake_exchange.thread_calls[threading.get_ident()]; started = time.perf_counter()
+        app.market_hub.chart(symbol, preset['tf'], preset['limit']); switch = time.perf_counter() - started
+        series = app.market_hub.series(symbol, preset['tf'], preset['limit']); timings = []
+        for _ in range(repeat if series.base is not None else 0):
+            series.base.version += 1; started = time.perf_counter(); series.resample(); timings.append(time.perf_counter() - started)
+        source = series.base.timeframe if series.base is not None else 'native'
+        print(f"{label:>7} {preset['tf']:>4} {source:>7} {fake_exchange.thread_calls[threading.get_ident()] - calls:>11} {1000 * switch:>10.2f} {(1e6 * float(np.median(timings)) if timings else float('nan')):>12.0f}")
+
+
+# --- STARTUP ---
+STARTUP_PROBE = """
+import time; started = time.perf_counter()
+import app
+imported = time.perf_counter(); client = app.server.test_client(); client.get('/'); client.get('/_dash-layout')
+print(imported - started, time.perf_counter() - started, app.exchange is not None)
+"""
+
+
+def bench_startup(repeat):
+    """Import-to-first-response of a fresh interpreter, with and without the on-disk markets copy."""
+    markets_path = os.path.join(tempfile.mkdtemp(prefix='bench-markets-'), 'markets.json')
+    env = dict(os.environ, MARKETS_CACHE_PATH=markets_path, WARMUP='0', PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'markets cache':>14} {'import ms':>10} {'first response ms':>18} {'live client':>12}")
+    try:
+        for label in ('absent', 'present'):
+            if label == 'present':
+                with open(markets_path, 'w') as f: json.dump({'at': time.time(), 'markets': {s: {'id': s.replace('/', ''), 'symbol': s, 'base': s.split('/')[0], 'quote': 'USDT', 'baseId': s.split('/')[0], 'quoteId': 'USDT', 'type': 'spot', 'spot': True, 'precision': {}, 'limits': {}, 'info': {}} for s in fake_exchange.symbols}}, f)
+            runs = [subprocess.run([sys.executable, '-c', STARTUP_PROBE], env=env, capture_output=True, text=True, check=True).stdout.split() for _ in range(repeat)]
+            imported, responded = (1000 * float(np.median([float(r[i]) for r in runs])) for i in (0, 1))
+            print(f'{label:>14} {imported:>10.0f} {responded:>18.0f} {runs[-1][2]:>12}')
+    finally:
+        shutil.rmtree(os.path.dirname(markets_path), ignore_errors=True)
+
+
+# --- LOAD ---
+@server.route('/_bench/exchange-calls')
+def exchange_calls():
+    return {'calls': fake_exchange.calls.value}
+
+
+def load_session(base_url, tab, speedup, deadline, results):
+    import requests
+    http = requests.Session(); session = Session(tab); interval = TAB_INTERVAL_MS[tab] / 1000 / speedup
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            r = http.post(f'{base_url}/_dash-update-component', json=session.body(), timeout=30); status, payload = r.status_code, r.content
+        except requests.RequestException: status, payload = 0, b''
+        elapsed = time.perf_counter() - started; results.append((tab, elapsed, status, len(payload))); session.absorb(status, payload or b'{}')
+        time.sleep(max(min(interval - elapsed, deadline - time.time()), 0))
+
+
+@contextlib.contextmanager
+def gunicorn(port, workers, threads, **env):
+    """bench:server under gunicorn --preload; yields the base URL and master pid once it answers."""
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)), **env)
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--preload', '-w', str(workers), '--threads', str(threads), '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'bench:server'], env=env)
+    import requests
+    try:
+        for _ in range(300):
+            try:
+                requests.get(f'{base_url}/_bench/exchange-calls', timeout=1); break
+            except requests.RequestException: time.sleep(0.1)
+        else: raise RuntimeError('gunicorn did not come up')
+        yield base_url, proc.pid
+    finally:
+        proc.terminate(); proc.wait()
+
+
+def bench_load(sessions, seconds, workers, threads, tabs, speedup, port):
+    import requests
+    with gunicorn(port, workers, threads) as (base_url, _):
+        calls_before = requests.get(f'{base_url}/_bench/exchange-calls', timeout=5).json()['calls']
+        results = []; started = time.time(); deadline = started + seconds
+        pool = [threading.Thread(target=load_session, args=(base_url, tabs[i % len(tabs)], speedup, deadline, results), daemon=True) for i in range(sessions)]
+        for t in pool: t.start()
+        for t in pool: t.join()
+        wall = time.time() - started; calls = requests.get(f'{base_url}/_bench/exchange-calls', timeout=5).json()['calls'] - calls_before
+    print(f"{'tab':>10} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for tab in tabs + ['all']:
+        rows = [r for r in results if tab in ('all', r[0])]
+        if not rows: continue
+        latency = 1000 * np.array([r[1] for r in rows])
+        print(f"{tab:>10} {len(rows):>9} {sum(r[2] != 200 for r in rows):>7} {np.percentile(latency, 50):>8.1f} {np.percentile(latency, 99):>8.1f}")
+    print(f'{sessions} sessions, {len(results) / wall:.1f} req/s, {calls / wall:.2f} exchange calls/s over {wall:.1f}s')
+
+
+# --- PUSH ---
+# viewers spread over four symbols and two presets, i.e. eight topic groups
+PUSH_TOPICS = [[f"candles:{s}:{p['tf']}", f'ticker:{s}'] for s in app.TRACKER_SYMBOLS[:4] for p in list(app.TIMEFRAME_PRESETS.values())[:2]]
+POLL_BASELINE_MS = 2000  # the overview refresh every session polled at before /push
+
+
+def cpu_seconds(pid):
+    """User plus system time of a process and its direct children, i.e. the gunicorn master and workers."""
+    ticks = 0
+    for entry in filter(str.isdigit, os.listdir('/proc')):
+        try:
+            with open(f'/proc/{entry}/stat') as f: fields = f.read().rsplit(')', 1)[1].split()
+        except OSError: continue
+        if pid in (int(entry), int(fields[1])): ticks += int(fields[11]) + int(fields[12])
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+
+def push_viewers(port, viewers, seconds):
+    """Holds /push connections open on non-blocking sockets and counts the events and bytes each one receives."""
+    selector = selectors.DefaultSelector(); events = np.zeros(viewers, dtype=int); received = 0
+    for i in range(viewers):
+        query = '&'.join(f"topic={quote(t, safe='')}" for t in PUSH_TOPICS[i % len(PUSH_TOPICS)])
+        sock = socket.create_connection(('127.0.0.1', port)); sock.sendall(f'GET /push?{query} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n'.encode())
+        sock.setblocking(False); selector.register(sock, selectors.EVENT_READ, i)
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        for key, _ in selector.select(timeout=0.5):
+            data = key.fileobj.recv(65536)
+            if not data: selector.unregister(key.fileobj); key.fileobj.close(); continue
+            events[key.data] += data.count(b'event: '); received += len(data)
+    for key in list(selector.get_map().values()): key.fileobj.close()
+    return events, received
+
+
+def bench_push(viewers, seconds, workers, threads, port):
+    print(f"{'mode':>5} {'viewers':>8} {'msgs/s':>8} {'per viewer':>11} {'server cpu %':>13} {'KB/s out':>9} {'errors':>7}")
+    for n in viewers:
+        with gunicorn(port, workers, n + 8) as (_, pid):  # gthread holds one thread per open stream, and workers accept unevenly
+            cpu = cpu_seconds(pid); started = time.time(); events, received = push_viewers(port, n, seconds); wall = time.time() - started; cpu = cpu_seconds(pid) - cpu
+            print(f"{'push':>5} {n:>8} {events.sum() / wall:>8.1f} {events.mean() / wall:>11.2f} {100 * cpu / wall:>13.1f} {received / wall / 1e3:>9.1f} {int((events == 0).sum()):>7}")
+        with gunicorn(port, workers, threads, LIVE_PUSH='0') as (base_url, pid):
+            results = []; cpu = cpu_seconds(pid); started = time.time(); deadline = started + seconds
+            pool = [threading.Thread(target=load_session, args=(base_url, 'overview', TAB_INTERVAL_MS['overview'] / POLL_BASELINE_MS, deadline, results), daemon=True) for _ in range(n)]
+            for t in pool: t.start()
+            for t in pool: t.join()
+            wall = time.time() - started; cpu = cpu_seconds(pid) - cpu
+            print(f"{'poll':>5} {n:>8} {len(results) / wall:>8.1f} {len(results) / n / wall:>11.2f} {100 * cpu / wall:>13.1f} {sum(r[3] for r in results) / wall / 1e3:>9.1f} {sum(r[2] != 200 for r in results):>7}")
+
+
+# --- ALERTS ---
+def bench_alerts(sizes, symbols, ticks, seed=7):
+    rng = np.random.default_rng(seed); names = [f'SIM{i}/USDT' for i in range(symbols)]; base = rng.uniform(1, 5000, symbols)
+    print(f"{'alerts':>8} {'add s':>7} {'tick ms':>8} {'us/symbol':>10} {'fired':>7}")
+    for n in sizes:
+        book = app.AlertBook(tempfile.mkdtemp(dir=app.ALERTS_DIR)); owner = rng.integers(0, symbols, n)
+        specs = [{'symbol': names[i], 'metric': 'price', 'direction': 'above' if up else 'below', 'threshold': base[i] * (1 + (0.05 if up else -0.05) * u)} for i, up, u in zip(owner, rng.random(n) < 0.5, rng.random(n))]
+        started = time.perf_counter(); book.add(specs); added = time.perf_counter() - started
+        prices = base.copy(); book.update('price', names, prices); timings = []; fired = 0
+        for _ in range(ticks):
+            prices = prices * np.exp(rng.normal(0, 0.002, symbols))
+            started = time.perf_counter(); fired += len(book.update('price', names, prices)); timings.append(time.perf_counter() - started)
+        tick = 1000 * np.median(timings)
+        print(f'{n:>8} {added:>7.2f} {tick:>8.3f} {1000 * tick / symbols:>10.2f} {fired:>7}')
+
+
+# --- ORDER BOOK ---
+BINANCE_DIFFS_PER_SECOND = 10  # <symbol>@depth@100ms
+
+def depth_fixture(path, symbol, diffs, seed=7):
+    # (REST snapshot, depthUpdate payloads) from a stream_replay.py recording, or synthesized; the synthetic snapshot is
+    # taken a few diffs into the stream, so the book has to drop the diffs it already covers
+    if path:
+        with open(path) as f: records = [json.loads(line) for line in f if line.strip()]
+        return next(r['snapshot'] for r in records if 'snapshot' in r), [r['data'] for r in records if r.get('data', {}).get('e') == 'depthUpdate']
+    feed = stream_replay.SyntheticFeed(seed); stream = f'{app.to_stream_id(symbol)}@depth@100ms'
+    head = [feed.message(stream)['data'] for _ in range(5)]; snapshot = feed.depth_snapshot(app.to_stream_id(symbol))
+    return snapshot, head + [feed.message(stream)['data'] for _ in range(diffs)]
+
+
+def reference_book(snapshot, diffs):
+    # the dict-of-floats book, applied the same way, to check the array book against
+    sides = {'b': {float(p): float(q) for p, q in snapshot['bids'] if float(q)}, 'a': {float(p): float(q) for p, q in snapshot['asks'] if float(q)}}; last = snapshot['lastUpdateId']
+    for diff in diffs:
+        if diff['u'] <= last: continue
+        for side in ('b', 'a'):
+            for p, q in diff[side]:
+                if float(q): sides[side][float(p)] = float(q)
+                else: sides[side].pop(float(p), None)
+        last = diff['u']
+    return sorted(sides['b'].items(), reverse=True), sorted(sides['a'].items())
+
+
+def bench_depth(path, symbol, diffs, repeat):
+    snapshot, stream = depth_fixture(path, symbol, diffs); loaded = {'bids': snapshot['bids'], 'asks': snapshot['asks'], 'nonce': snapshot['lastUpdateId']}
+    changes = sum(len(d['b']) + len(d['a']) for d in stream) / len(stream)
+    print(f"{len(stream)} diffs, {changes:.0f} level changes per diff, {len(snapshot['bids'])}+{len(snapshot['asks'])} snapshot levels")
+    book = app.OrderBook(symbol); book.load(loaded); timings = []
+    for diff in stream:
+        started = time.perf_counter(); ok = book.apply(diff); timings.append(time.perf_counter() - started)
+        if not ok: sys.exit(f"sequence gap at U={diff['U']}")
+    us = 1e6 * np.array(timings); rate = len(us) / us.sum() * 1e6
+    print(f"{'us/diff p50':>12} {'p99':>8} {'diffs/s':>9} {'levels/s':>10} {'x binance':>10}")
+    print(f'{np.percentile(us, 50):>12.1f} {np.percentile(us, 99):>8.1f} {rate:>9.0f} {rate * changes:>10.0f} {rate / BINANCE_DIFFS_PER_SECOND:>10.0f}')
+    bids, asks = reference_book(snapshot, stream); floor = book.mid() * (1 - app.DEPTH_BAND_PCT / 100)
+    same = np.array_equal(-book.bids.keys, [p for p, _ in bids]) and np.array_equal(book.bids.sizes, [q for _, q in bids]) and np.array_equal(book.asks.keys, [p for p, _ in asks]) and np.array_equal(book.asks.sizes, [q for _, q in asks])
+    print(f'matches dict book: {same}, bid depth in band {book.bids.within([floor])[0]:.4f} vs {sum(q for p, q in bids if p >= floor):.4f}')
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter(); book.view(); timings.append(time.perf_counter() - started)
+    print(f'view: {1000 * np.median(timings):.2f} ms with {len(book.samples)} heatmap columns')
+    gap = app.OrderBook(symbol); gap.load(loaded); applied = [gap.apply(d) for i, d in enumerate(stream[:20]) if i != 10]
+    print(f'dropped diff: resync requested {not all(applied)}, book waiting for a snapshot {not gap.loaded}')
+
+
+# --- TRAFFIC ---
+LOGIN_BODY = {'output': '..page-content.children...login-error.children..', 'outputs': [{'id': 'page-content', 'property': 'children'}, {'id': 'login-error', 'property': 'children'}], 'inputs': [{'id': 'login-button', 'property': 'n_clicks', 'value': 1}], 'state': [{'id': 'username-box', 'property': 'value', 'value': 'admin'}, {'id': 'password-box', 'property': 'value', 'value': 'admin'}, {'id': 'login-state', 'property': 'data', 'value': False}], 'changedPropIds': ['login-button.n_clicks']}
+
+
+def decode_body(r):
+    encoding = r.headers.get('Content-Encoding')
+    if encoding == 'gzip': return gzip.decompress(r.data)
+    if encoding == 'br': return __import__('brotli').decompress(r.data)
+    return r.data
+
+
+def bench_traffic(tabs, polls, encodings):
+    # wire bytes of the login response and of one polling session per tab, for each Accept-Encoding
+    client = app.server.test_client()
+    print(f"{'request':>10} {'encoding':>9} {'ms p50':>7} {'bytes':>9} {'wire':>9} {'wire/min':>10}")
+    for encoding in encodings:
+        timings, sizes = [], []
+        for _ in range(polls):
+            started = time.perf_counter(); r = client.post('/_dash-update-component', json=LOGIN_BODY, headers={'Accept-Encoding': encoding}); timings.append(time.perf_counter() - started)
+            sizes.append((len(decode_body(r)), len(r.data)))
+        print(f"{'login':>10} {encoding:>9} {1000 * np.median(timings[1:]):>7.2f} {sizes[-1][0]:>9} {sizes[-1][1]:>9} {'':>10}")
+    for tab in tabs:
+        for encoding in encodings:
+            session = Session(tab); timings, raw, wire = [], [], []
+            for i in range(polls + 1):
+                started = time.perf_counter(); r = client.post('/_dash-update-component', json=session.body(), headers={'Accept-Encoding': encoding}); elapsed = time.perf_counter() - started
+                body = decode_body(r); session.absorb(r.status_code, body)
+                if i: timings.append(elapsed); raw.append(len(body)); wire.append(len(r.data))
+            per_minute = np.mean(wire) * 60_000 / TAB_INTERVAL_MS[tab]
+            print(f'{tab:>10} {encoding:>9} {1000 * np.median(timings):>7.2f} {np.mean(raw):>9.0f} {np.mean(wire):>9.0f} {per_minute:>10.0f}')
+
+
+# --- SIMULATION ---
+def bench_sim(pairs, symbol, repeat):
+    print(f"{'pairs':>6} {'tickers cold ms':>16} {'warm ms':>8}")
+    for n in pairs:
+        sim = app.SimExchange(n); started = time.perf_counter(); sim.fetch_tickers(); cold = time.perf_counter() - started; timings = []
+        for _ in range(repeat):
+            started = time.perf_counter(); sim.fetch_tickers(); timings.append(time.perf_counter() - started)
+        print(f'{n:>6} {1000 * cold:>16.1f} {1000 * np.median(timings):>8.2f}')
+    sim = app.SimExchange(); candles = {}
+    print(f"{'timeframe':>9} {'candles':>8} {'cold ms':>8} {'warm ms':>8} {'high/low ok':>12} {'closed stable':>14}")
+    for tf in app.TIMEFRAME_MS:
+        started = time.perf_counter(); rows = sim.fetch_ohlcv(symbol, tf, limit=1000); cold = time.perf_counter() - started
+        started = time.perf_counter(); again = sim.fetch_ohlcv(symbol, tf, limit=1000); warm = time.perf_counter() - started
+        ok = all(h >= max(o, c) and l <= min(o, c) for _, o, h, l, c, _ in rows); candles[tf] = rows
+        print(f'{tf:>9} {len(rows):>8} {1000 * cold:>8.1f} {1000 * warm:>8.2f} {str(ok):>12} {str(rows[:-1] == again[:len(rows) - 1]):>14}')
+    closes = {tf: {r[0]: r[4] for r in rows} for tf, rows in candles.items()}
+    for fine, coarse in (('1m', '1h'), ('1h', '1d')):
+        shared = [t for t in closes[coarse] if t + app.TIMEFRAME_MS[coarse] - app.TIMEFRAME_MS[fine] in closes[fine]][:-1]
+        same = all(np.isclose(closes[coarse][t], closes[fine][t + app.TIMEFRAME_MS[coarse] - app.TIMEFRAME_MS[fine]]) for t in shared)
+        print(f'{coarse} closes equal the last {fine} close: {same} over {len(shared)} candles')
+    ticks = []
+    for _ in range(3):
+        ticks.append(sim.fetch_ticker(symbol)['last']); time.sleep(1.0)
+    print(f'{symbol} over 3s: ' + ', '.join(f'{p:.2f}' for p in ticks) + f', cache {sim.cached / 2 ** 20:.1f} MiB in {len(sim.cache)} blocks')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    callbacks = sub.add_parser('callbacks', help='time each tab callback through the Dash test client')
+    callbacks.add_argument('--tabs', default=','.join(SCENARIOS))
+    callbacks.add_argument('--repeat', type=int, default=20)
+    indicators = sub.add_parser('indicators', help='time calculate_cycle_indicators across history sizes')
+    indicators.add_argument('--sizes', default='100,365,1000,2000,5000')
+    indicators.add_argument('--repeat', type=int, default=10)
+    indicators.add_argument('--verify', action='store_true', help='instead check the incremental IndicatorEngine against it, per column, at each of --sizes as the view limit')
+    indicators.add_argument('--ticks', type=int, default=3, help='open-candle ticks between closed candles when verifying')
+    spark = sub.add_parser('sparklines', help='plotly figure vs inline SVG sparklines per Screeners page')
+    spark.add_argument('--rows', default='10,50,100')
+    spark.add_argument('--repeat', type=int, default=5)
+    resilience = sub.add_parser('resilience', help='single-flight, weight budget and stale fallback of ExchangeClient on the fake exchange')
+    resilience.add_argument('--sessions', type=int, default=10)
+    warmup = sub.add_parser('warmup', help='serial fetches vs the async warm-up for every tracked symbol and chart window')
+    warmup.add_argument('--latency', type=float, default=0.1, help='simulated round trip per request, seconds')
+    warmup.add_argument('--concurrency', type=int, default=app.WARMUP_CONCURRENCY)
+    timeframes = sub.add_parser('timeframes', help='timeframe switches served from resampled base series after warm-up')
+    timeframes.add_argument('--symbol', default=app.DEFAULT_SYMBOL)
+    timeframes.add_argument('--repeat', type=int, default=100)
+    startup = sub.add_parser('startup', help='import-to-first-response time of a fresh worker process')
+    startup.add_argument('--repeat', type=int, default=5)
+    load = sub.add_parser('load', help='drive _dash-update-component under gunicorn from many polling sessions')
+    load.add_argument('--sessions', type=int, default=20)
+    load.add_argument('--seconds', type=float, default=30)
+    load.add_argument('--workers', type=int, default=2)
+    load.add_argument('--threads', type=int, default=4)
+    load.add_argument('--tabs', default='overview,analysis,global,screeners')
+    load.add_argument('--speedup', type=float, default=1.0, help='divide each panel refresh interval by this factor')
+    load.add_argument('--port', type=int, default=8051)
+    push = sub.add_parser('push', help='server cost of /push viewers vs the same viewers polling the overview every 2s')
+    push.add_argument('--viewers', default='50,200')
+    push.add_argument('--seconds', type=float, default=20)
+    push.add_argument('--workers', type=int, default=2)
+    push.add_argument('--threads', type=int, default=8, help='threads per worker for the polling run; push gets one per viewer in each worker')
+    push.add_argument('--port', type=int, default=8051)
+    alerts = sub.add_parser('alerts', help='evaluate price ticks against large alert books')
+    alerts.add_argument('--alerts', default='1000,10000,100000')
+    alerts.add_argument('--symbols', type=int, default=100)
+    alerts.add_argument('--ticks', type=int, default=200)
+    depth = sub.add_parser('depth', help='apply a diff-depth stream to the array order book and check it against a dict book')
+    depth.add_argument('--fixture', help='stream_replay.py --record output with a depth stream; synthetic when omitted')
+    depth.add_argument('--symbol', default=app.DEFAULT_SYMBOL)
+    depth.add_argument('--diffs', type=int, default=5000)
+    depth.add_argument('--repeat', type=int, default=50)
+    sim = sub.add_parser('sim', help='ticker and candle latency of the simulated exchange, and candle consistency across timeframes')
+    sim.add_argument('--pairs', default='400,5000')
+    sim.add_argument('--symbol', default=app.DEFAULT_SYMBOL)
+    sim.add_argument('--repeat', type=int, default=10)
+    traffic = sub.add_parser('traffic', help='login and per-tab polling bytes on the wire, per session per minute, for each Accept-Encoding')
+    traffic.add_argument('--tabs', default=','.join(SCENARIOS))
+    traffic.add_argument('--polls', type=int, default=20)
+    traffic.add_argument('--encodings', default='identity,gzip,br')
+    args = parser.parse_args()
+    if args.command == 'callbacks': bench_callbacks(args.tabs.split(','), args.repeat)
+    elif args.command == 'indicators' and args.verify: verify_indicators([int(n) for n in args.sizes.split(',')], args.ticks)
+    elif args.command == 'indicators': bench_indicators([int(n) for n in args.sizes.split(',')], args.repeat)
+    elif args.command == 'sparklines': bench_sparklines([int(r) for r in args.rows.split(',')], args.repeat)
+    elif args.command == 'resilience': bench_resilience(args.sessions)
+    elif args.command == 'warmup': bench_warmup(args.latency, args.concurrency)
+    elif args.command == 'timeframes': bench_timeframes(args.symbol, args.repeat)
+    elif args.command == 'startup': bench_startup(args.repeat)
+    elif args.command == 'push': bench_push([int(n) for n in args.viewers.split(',')], args.seconds, args.workers, args.threads, args.port)
+    elif args.command == 'alerts': bench_alerts([int(n) for n in args.alerts.split(',')], args.symbols, args.ticks)
+    elif args.command == 'depth': bench_depth(args.fixture, args.symbol, args.diffs, args.repeat)
+    elif args.command == 'sim': bench_sim([int(n) for n in args.pairs.split(',')], args.symbol, args.repeat)
+    elif args.command == 'traffic': bench_traffic(args.tabs.split(','), args.polls, args.encodings.split(','))
+    elif args.command == 'load': bench_load(args.sessions, args.seconds, args.workers, args.threads, args.tabs.split(','), args.speedup, args.port)
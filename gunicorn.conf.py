@@ -0,0 +1,24 @@
+"""gunicorn settings for the dashboard: gunicorn app:server (picked up from this directory).
+
+/push holds one request open per live viewer, so workers must be threaded: a sync worker would spend itself on a single
+EventSource and be killed by the worker timeout every 30 s. Each viewer occupies one gthread thread; the push cap is
+set below the thread count so callbacks always have threads left.
+"""
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:' + os.environ.get('PORT', '8050'))
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 64))
+timeout = 60
+graceful_timeout = 10
+preload_app = True
+PUSH_THREAD_RESERVE = 8  # threads per worker kept for callbacks and page loads
+
+
+def post_worker_init(worker):
+    import sys
+    dashboard = sys.modules.get('app')
+    if dashboard is None or 'PUSH_MAX_SUBSCRIBERS' in os.environ: return
+    if worker.cfg.worker_class_str not in ('gthread', 'gevent', 'eventlet'): dashboard.PUSH_MAX_SUBSCRIBERS = 0  # a sync worker cannot hold a stream
+    elif worker.cfg.worker_class_str == 'gthread': dashboard.PUSH_MAX_SUBSCRIBERS = max(worker.cfg.threads - PUSH_THREAD_RESERVE, 1)
@@ -0,0 +1,226 @@
+"""Offline stand-in for the Binance combined-stream endpoint.
+
+Serve a recording:    python stream_replay.py --file recording.jsonl --port 8765
+Serve synthetic data: python stream_replay.py --port 8765
+Record live streams:  python stream_replay.py --record recording.jsonl --streams btcusdt@ticker,btcusdt@kline_1m --seconds 60
+Record a depth fixture: python stream_replay.py --record depth.jsonl --streams btcusdt@depth@100ms --seconds 60
+
+Depth recordings also hold the REST snapshot taken after the stream opened, as a {"stream": ..., "snapshot": ...} line;
+bench.py depth --fixture replays them through the dashboard's order book.
+
+Then run the dashboard with STREAM_MODE=ws MARKET_STREAM_URL=ws://127.0.0.1:8765/stream
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socketserver
+import struct
+import threading
+import time
+import urllib.request
+from urllib.parse import parse_qs, urlparse
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+TIMEFRAME_MS = {'1m': 60_000, '15m': 900_000, '1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000, '1w': 604_800_000}
+BASE_PRICES = {'btcusdt': 65000.0, 'ethusdt': 3200.0, 'bnbusdt': 580.0, 'solusdt': 150.0, 'xrpusdt': 0.55}
+DEPTH_LEVELS = 1000  # per side in a synthetic book
+DEPTH_CHANGES = 60  # level changes per side in each synthetic diff, about what BTCUSDT@depth@100ms carries
+DEPTH_SNAPSHOT_URL = 'https://api.binance.com/api/v3/depth?symbol={symbol}&limit=1000'
+
+
+def read_exact(sock, n):
+    buf = b''
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk: raise ConnectionError('client closed')
+        buf += chunk
+    return buf
+
+
+def read_frame(sock):
+    b1, b2 = read_exact(sock, 2)
+    opcode, length = b1 & 0x0F, b2 & 0x7F
+    if length == 126: length = struct.unpack('>H', read_exact(sock, 2))[0]
+    elif length == 127: length = struct.unpack('>Q', read_exact(sock, 8))[0]
+    mask = read_exact(sock, 4) if b2 & 0x80 else b'\0\0\0\0'
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(read_exact(sock, length)))
+    return opcode, payload
+
+
+def write_frame(sock, payload, opcode=0x1):
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126: header += bytes([len(payload)])
+    elif len(payload) < 65536: header += bytes([126]) + struct.pack('>H', len(payload))
+    else: header += bytes([127]) + struct.pack('>Q', len(payload))
+    sock.sendall(header + payload)
+
+
+class SyntheticFeed:
+    def __init__(self, seed=7):
+        self.rng = random.Random(seed)
+        self.prices = {}
+        self.opens = {}
+        self.klines = {}
+        self.books = {}
+
+    def book(self, sym, price):
+        # price levels as integer multiples of the tick, so a level's string is the same every time it is sent
+        book = self.books.get(sym)
+        if book is None:
+            tick = 10 ** (len(str(int(price))) - 5); mid = round(price / tick)
+            book = self.books[sym] = {'tick': tick, 'u': 1000, 'b': {mid - i: round(self.rng.expovariate(2), 4) or 0.0001 for i in range(1, DEPTH_LEVELS + 1)}, 'a': {mid + i: round(self.rng.expovariate(2), 4) or 0.0001 for i in range(1, DEPTH_LEVELS + 1)}}
+        return book
+
+    def depth_snapshot(self, sym, limit=DEPTH_LEVELS):
+        # the REST /api/v3/depth answer for the synthetic book
+        book = self.book(sym, self.prices.get(sym) or BASE_PRICES.get(sym, 100.0)); tick = book['tick']
+        side = lambda levels, reverse: [[f'{g * tick:.8f}', f'{levels[g]:.8f}'] for g in sorted(levels, reverse=reverse)[:limit]]
+        return {'lastUpdateId': book['u'], 'bids': side(book['b'], True), 'asks': side(book['a'], False)}
+
+    def depth(self, sym, price):
+        book = self.book(sym, price); tick = book['tick']; mid = round(price / tick); changes = {'b': [], 'a': []}
+        for side, sign in (('b', -1), ('a', 1)):
+            levels = book[side]
+            for g in [g for g in levels if sign * (g - mid) <= 0]: del levels[g]; changes[side].append([f'{g * tick:.8f}', '0.00000000'])  # crossed by the move
+            for _ in range(DEPTH_CHANGES):
+                g = mid + sign * (1 + int(self.rng.expovariate(1 / 40)))
+                size = 0.0 if g in levels and self.rng.random() < 0.2 else round(self.rng.expovariate(2), 4)
+                if size: levels[g] = size
+                else: levels.pop(g, None)
+                changes[side].append([f'{g * tick:.8f}', f'{size:.8f}'])
+        first = book['u'] + 1; book['u'] += self.rng.randint(1, 5)
+        return {'e': 'depthUpdate', 'E': int(time.time() * 1000), 's': sym.upper(), 'U': first, 'u': book['u'], 'b': changes['b'], 'a': changes['a']}
+
+    def message(self, stream):
+        sym, _, kind = stream.partition('@')
+        price = self.prices.get(sym) or BASE_PRICES.get(sym, self.rng.uniform(1, 500))
+        price *= 1 + self.rng.gauss(0, 0.0005)
+        self.prices[sym] = price
+        open_24h = self.opens.setdefault(sym, price)
+        now = int(time.time() * 1000)
+        if kind == 'ticker':
+            data = {'e': '24hrTicker', 'E': now, 's': sym.upper(), 'c': f'{price:.8f}', 'o': f'{open_24h:.8f}', 'h': f'{max(open_24h, price):.8f}', 'l': f'{min(open_24h, price):.8f}', 'P': f'{(price / open_24h - 1) * 100:.3f}', 'v': '1000.0', 'q': f'{1000 * price:.2f}'}
+        elif kind.startswith('kline_'):
+            tf = kind[len('kline_'):]
+            start = now - now % TIMEFRAME_MS.get(tf, 60_000)
+            k = self.klines.get(stream)
+            if k is None or k['t'] != start: k = self.klines[stream] = {'t': start, 'i': tf, 'o': price, 'h': price, 'l': price, 'v': 0.0}
+            k['h'], k['l'], k['v'] = max(k['h'], price), min(k['l'], price), k['v'] + self.rng.uniform(0.1, 5)
+            data = {'e': 'kline', 'E': now, 's': sym.upper(), 'k': {'t': k['t'], 'i': tf, 's': sym.upper(), 'o': f"{k['o']:.8f}", 'h': f"{k['h']:.8f}", 'l': f"{k['l']:.8f}", 'c': f'{price:.8f}', 'v': f"{k['v']:.4f}", 'x': False}}
+        elif kind.startswith('depth'):
+            data = self.depth(sym, price)
+        else:
+            return None
+        return {'stream': stream, 'data': data}
+
+
+class ReplayHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = self.request.recv(4096)
+            if not chunk: return
+            request += chunk
+        lines = request.decode('latin-1').split('\r\n')
+        headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(':') for line in lines[1:] if line)}
+        accept = base64.b64encode(hashlib.sha1((headers.get('sec-websocket-key', '') + WS_GUID).encode()).digest()).decode()
+        self.request.sendall(f'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n'.encode())
+        query = parse_qs(urlparse(lines[0].split(' ')[1]).query)
+        self.streams = set(filter(None, query.get('streams', [''])[0].split('/')))
+        self.closed = threading.Event()
+        self.send_lock = threading.Lock()
+        threading.Thread(target=self.read_loop, daemon=True).start()
+        try: self.server.source(self)
+        except (ConnectionError, OSError): pass
+        finally: self.closed.set()
+
+    def read_loop(self):
+        try:
+            while not self.closed.is_set():
+                opcode, payload = read_frame(self.request)
+                if opcode == 0x8: break
+                if opcode == 0x9: self.send(payload, 0xA)
+                elif opcode == 0x1:
+                    message = json.loads(payload)
+                    if message.get('method') == 'SUBSCRIBE': self.streams.update(message.get('params', []))
+                    elif message.get('method') == 'UNSUBSCRIBE': self.streams.difference_update(message.get('params', []))
+                    self.send(json.dumps({'result': None, 'id': message.get('id')}).encode())
+        except (ConnectionError, OSError, ValueError): pass
+        self.closed.set()
+
+    def send(self, payload, opcode=0x1):
+        with self.send_lock: write_frame(self.request, payload, opcode)
+
+
+def replay_source(path, speed, loop):
+    with open(path) as f: records = [json.loads(line) for line in f if line.strip()]
+
+    def source(handler):
+        while not handler.closed.is_set():
+            started = time.time()
+            for record in records:
+                delay = record.get('at', 0) / speed - (time.time() - started)
+                if delay > 0: time.sleep(delay)
+                if handler.closed.is_set(): return
+                if 'data' in record and record['stream'] in handler.streams: handler.send(json.dumps({'stream': record['stream'], 'data': record['data']}).encode())
+            if not loop: return
+    return source
+
+
+def synthetic_source(rate):
+    def source(handler):
+        feed = SyntheticFeed()
+        while not handler.closed.is_set():
+            for stream in sorted(handler.streams):
+                message = feed.message(stream)
+                if message: handler.send(json.dumps(message).encode())
+            time.sleep(1 / rate)
+    return source
+
+
+def record(path, url, streams, seconds):
+    import websocket
+    ws = websocket.create_connection(f"{url}?streams={'/'.join(streams)}", timeout=10)
+    started = time.time()
+    with open(path, 'w') as f:
+        for stream in streams:
+            if '@depth' in stream:  # the snapshot the recorded diffs continue from
+                with urllib.request.urlopen(DEPTH_SNAPSHOT_URL.format(symbol=stream.split('@')[0].upper()), timeout=10) as r: snapshot = json.loads(r.read())
+                f.write(json.dumps({'at': round(time.time() - started, 3), 'stream': stream, 'snapshot': snapshot}) + '\n')
+        while time.time() - started < seconds:
+            payload = json.loads(ws.recv())
+            f.write(json.dumps({'at': round(time.time() - started, 3), 'stream': payload['stream'], 'data': payload['data']}) + '\n')
+    ws.close()
+
+
+class ReplayServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(port, source, host='127.0.0.1'):
+    server = ReplayServer((host, port), ReplayHandler)
+    server.source = source
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--file', help='JSONL recording to replay; synthetic data when omitted')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed multiplier')
+    parser.add_argument('--rate', type=float, default=4.0, help='synthetic updates per second per stream')
+    parser.add_argument('--no-loop', action='store_true')
+    parser.add_argument('--record', metavar='PATH', help='record live streams to PATH instead of serving')
+    parser.add_argument('--url', default='wss://stream.binance.com:9443/stream')
+    parser.add_argument('--streams', default='btcusdt@ticker,btcusdt@kline_1m')
+    parser.add_argument('--seconds', type=float, default=60)
+    args = parser.parse_args()
+    if args.record:
+        record(args.record, args.url, args.streams.split(','), args.seconds)
+    else:
+        source = replay_source(args.file, args.speed, not args.no_loop) if args.file else synthetic_source(args.rate)
+        print(f'Serving market streams on ws://127.0.0.1:{args.port}/stream')
+        serve(args.port, source).serve_forever()